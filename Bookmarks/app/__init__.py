@@ -1,17 +1,31 @@
-# src/__init__.py
+# app/__init__.py
 
 """
-Pacote principal do sistema de análise de caminhos.
+Pacote principal da aplicação de análise de caminhos.
 
-Este pacote serve como ponto de inicialização para o módulo `src`, facilitando o acesso
-aos módulos essenciais como `controllers`, `models` e `views`.
-
-A estrutura deste pacote permite uma organização clara e uma fácil manutenção do código.
+Os subpacotes (`models`, `routes`, `services`, `views`) são importados
+diretamente por quem os usa. `create_app` é carregado sob demanda, para que
+importar `app` (por exemplo, num processo de trabalho recém-criado) não
+importe o Flask nem execute nada.
 """
 
-# O pacote `src` inicializa e expõe os módulos principais.
-from .controllers import ControladorDeCaminhos
-from ..src.models import CaminhoBase
-from ..src.views import exibir_resultados
+from importlib import import_module
+
+_EXPORTS = {
+    "create_app": ".main",
+}
+
+__all__ = ["create_app"]
+
+
+def __getattr__(nome: str):
+    """Importa o módulo que define `nome` no primeiro acesso."""
+    if nome not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(import_module(_EXPORTS[nome], __name__), nome)
+    globals()[nome] = valor
+    return valor
+
 
-__all__ = ["ControladorDeCaminhos", "CaminhoBase", "exibir_resultados"]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
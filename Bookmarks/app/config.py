@@ -14,6 +14,38 @@ class Config:
     DEBUG = False
     TESTING = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # `stat` simultâneos de `/analysis/analyze_paths`: threads no modo NDJSON
+    # (0 ou 1 = em série); no modo assíncrono, 0 = `ANALYSIS_ASYNC_CONCURRENCY`
+    ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", "0"))
+    # Threads compartilhadas pelas views assíncronas para os `stat`/varreduras
+    ANALYSIS_ASYNC_THREADS = int(os.environ.get("ANALYSIS_ASYNC_THREADS", "32"))
+    # Máximo de operações em andamento por requisição assíncrona
+    ANALYSIS_ASYNC_CONCURRENCY = int(os.environ.get("ANALYSIS_ASYNC_CONCURRENCY", "16"))
+    # Tarefas de varredura em segundo plano: threads, spool e tarefas mantidas
+    ANALYSIS_JOB_WORKERS = int(os.environ.get("ANALYSIS_JOB_WORKERS", "2"))
+    ANALYSIS_JOB_SPOOL_DIR = os.environ.get("ANALYSIS_JOB_SPOOL_DIR")
+    ANALYSIS_JOB_MAX_FINISHED = int(os.environ.get("ANALYSIS_JOB_MAX_FINISHED", "100"))
+    # Instantâneos das árvores: diretório (padrão: temporário) e quantos manter
+    ANALYSIS_SNAPSHOT_DIR = os.environ.get("ANALYSIS_SNAPSHOT_DIR")
+    ANALYSIS_SNAPSHOT_MAX = int(os.environ.get("ANALYSIS_SNAPSHOT_MAX", "100"))
+    # Cache dos resultados de análise: tempo de vida em segundos (0 = desligado)
+    ANALYSIS_CACHE_TTL = float(os.environ.get("ANALYSIS_CACHE_TTL", "0"))
+    ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get("ANALYSIS_CACHE_MAX_ENTRIES", "256"))
+    ANALYSIS_CACHE_MAX_BYTES = int(os.environ.get("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # Descarta entradas do cache quando o mtime de alguma raiz analisada muda
+    ANALYSIS_CACHE_VALIDATE_MTIME = os.environ.get("ANALYSIS_CACHE_VALIDATE_MTIME", "0") == "1"
+    # Índice incremental de metadados (URI `sqlite://...`; vazio = desligado)
+    ANALYSIS_INDEX_URI = os.environ.get("ANALYSIS_INDEX_URI")
+    # Raízes mantidas em memória (separadas por `os.pathsep`; vazio = desligado),
+    # backend (`auto`, `inotify` ou `polling`) e intervalo do polling em segundos
+    ANALYSIS_WATCH_ROOTS = [
+        raiz for raiz in os.environ.get("ANALYSIS_WATCH_ROOTS", "").split(os.pathsep) if raiz
+    ]
+    ANALYSIS_WATCH_BACKEND = os.environ.get("ANALYSIS_WATCH_BACKEND", "auto")
+    ANALYSIS_WATCH_INTERVAL = float(os.environ.get("ANALYSIS_WATCH_INTERVAL", "2"))
+    # Compressão das respostas (gzip/zstd) e menor corpo pronto comprimido, em bytes
+    ANALYSIS_COMPRESS = os.environ.get("ANALYSIS_COMPRESS", "1") == "1"
+    ANALYSIS_COMPRESS_MIN_BYTES = int(os.environ.get("ANALYSIS_COMPRESS_MIN_BYTES", "1024"))
 
     @classmethod
     def get_config(cls, key):
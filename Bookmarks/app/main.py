@@ -2,11 +2,19 @@
 
 # pylint: disable=C
 
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
 from flask import Flask
 from app.config import (
     DevelopmentConfig,
 )  # Configuração de ambiente para desenvolvimento
+from app.models.indice import IndiceMetadados
+from app.models.observador import ObservadorArvores
 from app.routes.analysis_routes import bp as analysis_bp
+from app.services.cache import ResultCache
+from app.services.jobs import JobManager
+from app.services.snapshots import SnapshotStore
 
 
 def create_app(config_class=DevelopmentConfig):
@@ -16,12 +24,82 @@ def create_app(config_class=DevelopmentConfig):
     # Carregar configurações da classe fornecida
     flask_app.config.from_object(config_class)
 
+    # Cache compartilhado pelas rotas de análise
+    flask_app.extensions["analysis_cache"] = ResultCache(
+        ttl=flask_app.config["ANALYSIS_CACHE_TTL"],
+        max_entries=flask_app.config["ANALYSIS_CACHE_MAX_ENTRIES"],
+        max_bytes=flask_app.config["ANALYSIS_CACHE_MAX_BYTES"],
+        validate_mtime=flask_app.config["ANALYSIS_CACHE_VALIDATE_MTIME"],
+    )
+
+    # Executor limitado usado pelas views assíncronas: o número de threads
+    # bloqueadas em `stat` não cresce com o número de requisições
+    flask_app.extensions["analysis_executor"] = ThreadPoolExecutor(
+        max_workers=flask_app.config["ANALYSIS_ASYNC_THREADS"],
+        thread_name_prefix="analysis",
+    )
+
+    # Fila local das varreduras longas, com resultados gravados em disco
+    flask_app.extensions["analysis_jobs"] = JobManager(
+        spool_dir=flask_app.config["ANALYSIS_JOB_SPOOL_DIR"],
+        max_workers=flask_app.config["ANALYSIS_JOB_WORKERS"],
+        max_finished=flask_app.config["ANALYSIS_JOB_MAX_FINISHED"],
+    )
+
+    # Instantâneos gravados em disco, comparados sob demanda
+    flask_app.extensions["analysis_snapshots"] = SnapshotStore(
+        directory=flask_app.config["ANALYSIS_SNAPSHOT_DIR"],
+        max_snapshots=flask_app.config["ANALYSIS_SNAPSHOT_MAX"],
+    )
+
+    # Índice de metadados: diretórios inalterados não são listados de novo
+    if flask_app.config["ANALYSIS_INDEX_URI"]:
+        flask_app.extensions["analysis_index"] = IndiceMetadados.de_uri(
+            flask_app.config["ANALYSIS_INDEX_URI"]
+        )
+
+    # Árvores das raízes observadas, mantidas em memória por uma thread
+    if flask_app.config["ANALYSIS_WATCH_ROOTS"]:
+        watcher = ObservadorArvores(
+            flask_app.config["ANALYSIS_WATCH_ROOTS"],
+            backend=flask_app.config["ANALYSIS_WATCH_BACKEND"],
+            intervalo=flask_app.config["ANALYSIS_WATCH_INTERVAL"],
+        )
+        watcher.iniciar()
+        flask_app.extensions["analysis_watcher"] = watcher
+
+    # Encerra as threads, os pools e o inotify em `close_app`, quando o
+    # aplicativo é descartado ou, no máximo, na saída do processo
+    flask_app.extensions["analysis_close"] = weakref.finalize(
+        flask_app, _close_extensions, flask_app.extensions
+    )
+
     # Registrar blueprints
     flask_app.register_blueprint(analysis_bp, url_prefix="/analysis")
 
     return flask_app
 
 
+def close_app(flask_app):
+    """
+    Encerra os recursos criados por `create_app`: o observador, as tarefas
+    (canceladas, sem deixar resultados parciais), o executor das views
+    assíncronas e a conexão do índice. Chamadas repetidas não fazem nada.
+    """
+    flask_app.extensions["analysis_close"]()
+
+
+def _close_extensions(extensions):
+    watcher = extensions.pop("analysis_watcher", None)
+    if watcher is not None:
+        watcher.parar()
+    extensions["analysis_jobs"].shutdown()
+    extensions["analysis_executor"].shutdown(wait=True)
+    index = extensions.pop("analysis_index", None)
+    if index is not None:
+        index.fechar()
+
+
 # Código para rodar a aplicação quando executada diretamente
 if __name__ == "__main__":
     app = (
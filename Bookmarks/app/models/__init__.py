@@ -2,11 +2,29 @@
 
 """
 Este módulo implementa o modelo PathModel para gerenciar e analisar.
-"""
 
+Os nomes exportados são carregados sob demanda (`__getattr__`): importar o
+pacote não importa os submódulos nem executa nada.
+"""
 
-from .json_do_frontend import json_frontend
-from .path_model import AnalisadorCaminhos
+from importlib import import_module
 
+_EXPORTS = {
+    "json_frontend": ".json_do_frontend",
+    "AnalisadorCaminhos": ".path_model",
+}
 
 __all__ = ["json_frontend", "AnalisadorCaminhos"]
+
+
+def __getattr__(nome: str):
+    """Importa o submódulo que define `nome` no primeiro acesso."""
+    if nome not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(import_module(_EXPORTS[nome], __name__), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,244 @@
+# app/models/agregacao.py
+
+"""
+Agregação do uso de disco (como o `du`) durante a varredura.
+
+O `AgregadorUso` recebe os nós de uma varredura em pré-ordem e soma o
+tamanho e as contagens de cada diretório quando ele é fechado, isto é,
+quando a varredura sai da sua subárvore. Só ficam na memória a pilha dos
+diretórios abertos, os `top_n` maiores arquivos e diretórios (em heaps) e os
+histogramas por extensão e por idade. O tamanho do relatório depende de
+`top_n` e das faixas, e não do tamanho da árvore.
+"""
+
+import bisect
+import heapq
+import itertools
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.services.metrics import timed
+
+from .path_model import _contar_varredura, _extensao
+from .varredura import EntradaVarredura, NoVarredura
+
+# Limites das faixas de idade (dias desde a última modificação)
+FAIXAS_IDADE = (1, 7, 30, 90, 365)
+OUTRAS_EXTENSOES = "(outras)"
+_DIA = 24 * 60 * 60
+
+
+class _Maiores:
+    """Os `n` itens de maior tamanho, num heap mínimo."""
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self._heap: List[Tuple[int, int, Dict]] = []
+        self._ordem = itertools.count()
+
+    def adicionar(self, tamanho: int, criar_item) -> None:
+        """Considera um item; `criar_item()` só é chamado se ele entrar."""
+        if self.n <= 0:
+            return
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, (tamanho, next(self._ordem), criar_item()))
+        elif tamanho > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (tamanho, next(self._ordem), criar_item()))
+
+    def itens(self) -> List[Dict]:
+        """Itens do maior para o menor (empates na ordem da varredura)."""
+        return [item for _, _, item in sorted(self._heap, key=lambda par: (-par[0], par[1]))]
+
+
+class AgregadorUso:
+    """
+    Acumula o relatório de uso de disco de um diretório a partir dos nós da
+    varredura (`adicionar`), na ordem em que ela os produz.
+
+    O histograma de extensões guarda no máximo `2 * max_extensoes` chaves:
+    ao passar disso, as menores (em bytes) são somadas em `OUTRAS_EXTENSOES`.
+
+    Como no `du`, um arquivo com vários links (`st_nlink > 1`) só é contado no
+    primeiro link encontrado; os demais são ignorados. Só as chaves
+    (`st_dev`, `st_ino`) desses arquivos ficam guardadas.
+
+    :param caminho: diretório varrido
+    :param top_n: maiores arquivos, diretórios e extensões no relatório
+    :param faixas_idade: limites das faixas de idade, em dias, crescentes
+    :param max_extensoes: extensões mantidas no histograma antes da poda
+    :param agora: referência das idades (padrão: `time.time()`)
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        top_n: int = 20,
+        faixas_idade: Sequence[float] = FAIXAS_IDADE,
+        max_extensoes: int = 1000,
+        agora: Optional[float] = None,
+    ) -> None:
+        self.caminho = str(caminho)
+        self.top_n = top_n
+        self.faixas_idade = tuple(faixas_idade)
+        self.max_extensoes = max_extensoes
+        self.agora = time.time() if agora is None else agora
+        self.erros = 0
+        # Diretórios abertos: [caminho, tamanho, arquivos, diretórios]
+        self._pilha: List[List] = [[self.caminho, 0, 0, 0]]
+        self._arquivos = _Maiores(top_n)
+        self._diretorios = _Maiores(top_n)
+        self._extensoes: Dict[str, List[int]] = {}
+        self._idades = [[0, 0] for _ in range(len(self.faixas_idade) + 1)]
+        self._links: Set[Tuple[int, int]] = set()
+        self._resumo: Optional[List] = None
+
+    def _fechar(self, profundidade: int) -> None:
+        """Fecha os diretórios abertos abaixo de `profundidade`, somando-os ao pai."""
+        pilha = self._pilha
+        while len(pilha) > profundidade:
+            caminho, tamanho, arquivos, diretorios = fechado = pilha.pop()
+            self._diretorios.adicionar(
+                tamanho,
+                lambda: {
+                    "caminho": caminho,
+                    "tamanho_total": tamanho,
+                    "total_arquivos": arquivos,
+                    "total_diretorios": diretorios,
+                },
+            )
+            if pilha:
+                pai = pilha[-1]
+                pai[1] += tamanho
+                pai[2] += arquivos
+                pai[3] += diretorios + 1
+            else:
+                self._resumo = fechado
+
+    def _podar_extensoes(self) -> None:
+        """Soma as extensões menores em `OUTRAS_EXTENSOES`."""
+        outras = self._extensoes.pop(OUTRAS_EXTENSOES, [0, 0])
+        ordenadas = sorted(self._extensoes.items(), key=lambda par: par[1][1], reverse=True)
+        self._extensoes = dict(ordenadas[: self.max_extensoes])
+        for _, (arquivos, tamanho) in ordenadas[self.max_extensoes:]:
+            outras[0] += arquivos
+            outras[1] += tamanho
+        self._extensoes[OUTRAS_EXTENSOES] = outras
+
+    def adicionar(self, no: NoVarredura) -> None:
+        """Soma um nó da varredura (pré-ordem, profundidade a partir de 1)."""
+        self._fechar(no.profundidade)
+        entrada = no.entrada
+        if not entrada.e_arquivo:
+            if no.erro is not None:
+                self.erros += 1
+            self._pilha.append([entrada.caminho, 0, 0, 0])
+            return
+        info = entrada.info
+        if info.st_nlink > 1:
+            chave = (info.st_dev, info.st_ino)
+            if chave in self._links:
+                return
+            self._links.add(chave)
+        tamanho = info.st_size
+        pai = self._pilha[-1]
+        pai[1] += tamanho
+        pai[2] += 1
+        self._arquivos.adicionar(
+            tamanho, lambda: {"caminho": entrada.caminho, "tamanho": tamanho}
+        )
+        extensao = _extensao(entrada.nome).lower()
+        contagem = self._extensoes.get(extensao)
+        if contagem is None:
+            contagem = self._extensoes[extensao] = [0, 0]
+        contagem[0] += 1
+        contagem[1] += tamanho
+        if len(self._extensoes) > 2 * self.max_extensoes:
+            self._podar_extensoes()
+        idade = (self.agora - info.st_mtime) / _DIA
+        faixa = self._idades[bisect.bisect_left(self.faixas_idade, idade)]
+        faixa[0] += 1
+        faixa[1] += tamanho
+
+    def adicionar_todos(self, nos: Iterable[NoVarredura]) -> "AgregadorUso":
+        """Soma todos os nós da varredura; retorna o próprio agregador."""
+        for no in nos:
+            self.adicionar(no)
+        return self
+
+    def _relatorio_extensoes(self) -> List[Dict]:
+        ordenadas = sorted(
+            (
+                (extensao, contagem)
+                for extensao, contagem in self._extensoes.items()
+                if extensao != OUTRAS_EXTENSOES
+            ),
+            key=lambda par: (-par[1][1], par[0]),
+        )
+        outras = list(self._extensoes.get(OUTRAS_EXTENSOES, [0, 0]))
+        for _, (arquivos, tamanho) in ordenadas[self.top_n:]:
+            outras[0] += arquivos
+            outras[1] += tamanho
+        relatorio = [
+            {"extensao": extensao, "arquivos": arquivos, "tamanho": tamanho}
+            for extensao, (arquivos, tamanho) in ordenadas[: self.top_n]
+        ]
+        if outras[0]:
+            relatorio.append(
+                {"extensao": OUTRAS_EXTENSOES, "arquivos": outras[0], "tamanho": outras[1]}
+            )
+        return relatorio
+
+    def resultado(self) -> Dict:
+        """
+        Fecha os diretórios ainda abertos e monta o relatório: totais,
+        `maiores_arquivos`, `maiores_diretorios` (com a própria raiz),
+        `extensoes` (sem ponto = `""`) e `idades` (`ate_dias` `None` = mais
+        antigos que a última faixa).
+        """
+        self._fechar(0)
+        _, tamanho, arquivos, diretorios = self._resumo
+        limites = list(self.faixas_idade) + [None]
+        return {
+            "caminho": self.caminho,
+            "tamanho_total": tamanho,
+            "total_arquivos": arquivos,
+            "total_diretorios": diretorios,
+            "erros": self.erros,
+            "maiores_arquivos": self._arquivos.itens(),
+            "maiores_diretorios": self._diretorios.itens(),
+            "extensoes": self._relatorio_extensoes(),
+            "idades": [
+                {"ate_dias": limite, "arquivos": contagem[0], "tamanho": contagem[1]}
+                for limite, contagem in zip(limites, self._idades)
+            ],
+        }
+
+
+@timed(
+    "aggregate",
+    count=lambda relatorio, _caminho, varredura, **_: _contar_varredura(
+        varredura, relatorio["tamanho_total"]
+    ),
+)
+def agregar_varredura(caminho: str, varredura: Iterable[NoVarredura], **opcoes) -> Dict:
+    """
+    Relatório de um diretório a partir da sua varredura (qualquer uma que
+    produza `NoVarredura` em pré-ordem). As `opcoes` vão para o
+    `AgregadorUso`. Se a varredura for truncada por um limite, os totais
+    cobrem só o que foi varrido, e o relatório recebe `truncado`.
+    """
+    relatorio = AgregadorUso(caminho, **opcoes).adicionar_todos(varredura).resultado()
+    if getattr(varredura, "truncado", False):
+        relatorio.update({"truncado": True, "motivo_truncamento": varredura.motivo_truncamento})
+    return relatorio
+
+
+def agregar_arquivo(caminho: str, info: os.stat_result, **opcoes) -> Dict:
+    """Relatório de um caminho de entrada que é um arquivo."""
+    agregador = AgregadorUso(os.path.dirname(caminho), **opcoes)
+    entrada = EntradaVarredura(caminho, os.path.basename(caminho), info)
+    agregador.adicionar(NoVarredura(entrada, 1))
+    relatorio = agregador.resultado()
+    relatorio.update({"caminho": caminho, "maiores_diretorios": []})
+    return relatorio
@@ -0,0 +1,204 @@
+# app/models/colunar.py
+
+"""
+Representação compacta (colunar) de uma árvore varrida.
+
+Em vez de um objeto `Arquivo`/`Diretorio` por entrada, cada atributo fica numa
+coluna paralela: `array` para tamanhos e datas, `bytearray` para o tipo e uma
+lista de nomes internados (`sys.intern`), com o índice do pai de cada entrada.
+Os caminhos completos não são guardados; eles e o JSON são reconstruídos sob
+demanda por `para_json` e `iterar_json`.
+"""
+
+import os
+import stat
+import sys
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
+
+from .path_model import _conteudo_vazio, _extensao
+from .varredura import Varredura, obter_info
+
+if TYPE_CHECKING:
+    from .consulta import Consulta
+
+
+class ArvoreColunar:
+    """
+    Árvore de um diretório guardada em colunas, na ordem da varredura
+    (pré-ordem, irmãos na ordem do `scandir`). O índice 0 é a própria raiz.
+
+    Aceita os mesmos limites e a mesma `consulta` de `Diretorio`
+    (`max_profundidade`, `max_entradas`) e produz o mesmo JSON de `Diretorio.para_json`.
+    """
+
+    __slots__ = (
+        "caminho",
+        "nomes",
+        "pais",
+        "diretorios",
+        "tamanhos",
+        "datas_criacao",
+        "datas_modificacao",
+        "ciclos",
+        "erros",
+        "truncado",
+        "motivo_truncamento",
+    )
+
+    def __init__(
+        self,
+        caminho: Path,
+        info: Optional[os.stat_result] = None,
+        max_profundidade: Optional[int] = None,
+        max_entradas: Optional[int] = None,
+        consulta: Optional["Consulta"] = None,
+    ) -> None:
+        if info is None:
+            info = obter_info(caminho)
+        if info is None or not stat.S_ISDIR(info.st_mode):
+            raise ValueError(f"O caminho {caminho} não é um diretório válido.")
+        self.caminho = str(caminho)
+        self.nomes: List[str] = []
+        self.pais = array("l")
+        self.diretorios = bytearray()
+        self.tamanhos = array("q")
+        self.datas_criacao = array("d")
+        self.datas_modificacao = array("d")
+        self.ciclos: Set[int] = set()
+        self.erros: Dict[int, str] = {}
+        self._adicionar(-1, Path(caminho).name, info, True)
+
+        varredura = Varredura(caminho, info, max_profundidade, max_entradas, consulta=consulta)
+        pilha = [0]
+        for no in varredura:
+            del pilha[no.profundidade:]
+            e_diretorio = not no.entrada.e_arquivo
+            indice = self._adicionar(pilha[-1], no.entrada.nome, no.entrada.info, e_diretorio)
+            if no.ciclo:
+                self.ciclos.add(indice)
+            if no.erro is not None:
+                self.erros[indice] = no.erro
+            if e_diretorio:
+                pilha.append(indice)
+        self.truncado = varredura.truncado
+        self.motivo_truncamento = varredura.motivo_truncamento
+
+    def _adicionar(self, pai: int, nome: str, info: os.stat_result, e_diretorio: bool) -> int:
+        """Acrescenta uma entrada ao fim das colunas e retorna seu índice."""
+        self.nomes.append(sys.intern(nome))
+        self.pais.append(pai)
+        self.diretorios.append(e_diretorio)
+        self.tamanhos.append(info.st_size)
+        self.datas_criacao.append(info.st_ctime)
+        self.datas_modificacao.append(info.st_mtime)
+        return len(self.nomes) - 1
+
+    def __len__(self) -> int:
+        return len(self.nomes)
+
+    def _percorrer(self) -> Iterator[Tuple[int, str, int]]:
+        """
+        Emite `(índice, caminho, profundidade)` de cada entrada após a raiz,
+        reconstruindo o caminho a partir da pilha de diretórios abertos.
+        """
+        pilha = [(0, self.caminho)]
+        pais, nomes, diretorios = self.pais, self.nomes, self.diretorios
+        for indice in range(1, len(nomes)):
+            pai = pais[indice]
+            while pilha[-1][0] != pai:
+                pilha.pop()
+            caminho = os.path.join(pilha[-1][1], nomes[indice])
+            yield indice, caminho, len(pilha)
+            if diretorios[indice]:
+                pilha.append((indice, caminho))
+
+    def _json_entrada(self, indice: int, caminho: str, com_conteudo: bool = False) -> Dict:
+        """
+        JSON de uma entrada; com `com_conteudo=True` os diretórios recebem as
+        listas de filhos (vazias), na mesma ordem de chaves de `_json_no`.
+        """
+        dados = {
+            "caminho": caminho,
+            "nome": self.nomes[indice],
+            "data_criacao": self.datas_criacao[indice],
+            "data_modificacao": self.datas_modificacao[indice],
+        }
+        if not self.diretorios[indice]:
+            dados.update({
+                "extensao": _extensao(self.nomes[indice]),
+                "tamanho": self.tamanhos[indice],
+            })
+            return dados
+        if com_conteudo:
+            dados.update(_conteudo_vazio())
+        if indice in self.ciclos:
+            dados["ciclo"] = True
+        if indice in self.erros:
+            dados["erro"] = self.erros[indice]
+        return dados
+
+    def para_json(self) -> Dict:
+        """
+        Reconstrói o JSON aninhado da árvore, igual ao de `Diretorio.para_json`.
+        Os totais de cada diretório são somados do fim para o início das
+        colunas: na pré-ordem, todo filho vem depois do seu pai.
+        """
+        raiz = self._json_entrada(0, self.caminho, com_conteudo=True)
+        abertos = {0: raiz}
+        for indice, caminho, _ in self._percorrer():
+            dados = self._json_entrada(indice, caminho, com_conteudo=True)
+            pai = abertos[self.pais[indice]]
+            if self.diretorios[indice]:
+                pai["sub_pastas"].append(dados)
+                abertos[indice] = dados
+            else:
+                pai["sub_arquivos"].append(dados)
+        for indice in range(len(self.nomes) - 1, 0, -1):
+            pai = abertos[self.pais[indice]]
+            if self.diretorios[indice]:
+                pai["tamanho_total"] += abertos[indice]["tamanho_total"]
+                pai["total_arquivos"] += abertos[indice]["total_arquivos"]
+            else:
+                pai["tamanho_total"] += self.tamanhos[indice]
+                pai["total_arquivos"] += 1
+        if self.truncado:
+            raiz.update({"truncado": True, "motivo_truncamento": self.motivo_truncamento})
+        return raiz
+
+    def iterar_json(self) -> Iterator[Dict]:
+        """
+        Emite os nós em pré-ordem, sem os filhos, no mesmo formato de
+        `iterar_arvore_json`.
+        """
+        raiz = self._json_entrada(0, self.caminho)
+        raiz.update({"tipo": "diretorio", "profundidade": 0})
+        yield raiz
+        for indice, caminho, profundidade in self._percorrer():
+            dados = self._json_entrada(indice, caminho)
+            dados.update({
+                "tipo": "diretorio" if self.diretorios[indice] else "arquivo",
+                "profundidade": profundidade,
+            })
+            yield dados
+        if self.truncado:
+            yield {
+                "caminho": self.caminho,
+                "truncado": True,
+                "motivo_truncamento": self.motivo_truncamento,
+            }
+
+    def memoria_em_bytes(self) -> int:
+        """
+        Estimativa da memória ocupada pelas colunas (cada nome internado é
+        contado uma única vez).
+        """
+        colunas = (
+            self.nomes, self.pais, self.diretorios, self.tamanhos,
+            self.datas_criacao, self.datas_modificacao, self.ciclos, self.erros,
+        )
+        nomes_unicos = {id(nome): nome for nome in self.nomes}
+        return sum(map(sys.getsizeof, colunas)) + sum(
+            map(sys.getsizeof, nomes_unicos.values())
+        )
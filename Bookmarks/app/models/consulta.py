@@ -0,0 +1,159 @@
+# app/models/consulta.py
+
+"""
+Consulta aplicada durante a varredura, antes de cada entrada ser descrita.
+
+Os critérios que dependem só do nome (extensões, glob, regex e diretórios a
+podar) são avaliados antes do `stat`: arquivos recusados nunca têm o `stat`
+feito, e diretórios podados não são abertos nem aparecem no resultado. Os
+critérios de tamanho e data de modificação são avaliados logo depois do
+`stat` de cada arquivo. Diretórios que não foram podados continuam sendo
+percorridos, pois podem conter arquivos aceitos.
+"""
+
+import fnmatch
+import os
+import re
+from typing import FrozenSet, Iterable, Optional, Pattern, Tuple
+
+from .varredura import EntradaVarredura
+
+
+def _normalizar_extensao(extensao: str) -> str:
+    """Extensão em minúsculas e com o ponto inicial (`"TXT"` -> `".txt"`)."""
+    extensao = extensao.strip().lower()
+    return extensao if extensao.startswith(".") else f".{extensao}"
+
+
+def _compilar_globs(padroes: Iterable[str]) -> Optional[Pattern[str]]:
+    """Junta os padrões glob numa única regex (ou `None` se não houver padrões)."""
+    padroes = [padrao for padrao in padroes if padrao]
+    if not padroes:
+        return None
+    return re.compile("|".join(fnmatch.translate(padrao) for padrao in padroes))
+
+
+class Consulta:
+    """
+    Critérios de seleção de uma varredura. Todos são opcionais; sem nenhum
+    critério, a consulta aceita tudo.
+
+    - `extensoes`: extensões aceitas para arquivos (sem diferenciar maiúsculas);
+    - `nomes`: padrões glob que o nome do arquivo deve casar (qualquer um);
+    - `regex`: expressão regular buscada no nome do arquivo;
+    - `tamanho_min`/`tamanho_max`: faixa de tamanho, em bytes, inclusiva;
+    - `modificado_desde`/`modificado_ate`: faixa de `st_mtime`, inclusiva;
+    - `podar`: padrões glob de nomes de diretórios que não são percorridos
+      (por exemplo `.git` e `node_modules`).
+
+    Levanta `ValueError` se `regex` não for uma expressão regular válida.
+    """
+
+    __slots__ = (
+        "extensoes",
+        "nomes",
+        "regex",
+        "tamanho_min",
+        "tamanho_max",
+        "modificado_desde",
+        "modificado_ate",
+        "podar",
+        "_nomes",
+        "_podar",
+    )
+
+    def __init__(
+        self,
+        extensoes: Iterable[str] = (),
+        nomes: Iterable[str] = (),
+        regex: Optional[str] = None,
+        tamanho_min: Optional[int] = None,
+        tamanho_max: Optional[int] = None,
+        modificado_desde: Optional[float] = None,
+        modificado_ate: Optional[float] = None,
+        podar: Iterable[str] = (),
+    ) -> None:
+        self.extensoes: FrozenSet[str] = frozenset(map(_normalizar_extensao, extensoes))
+        self.nomes: Tuple[str, ...] = tuple(nomes)
+        try:
+            self.regex: Optional[Pattern[str]] = re.compile(regex) if regex else None
+        except re.error as erro:
+            raise ValueError(f"Expressão regular inválida: {erro}") from erro
+        self.tamanho_min = tamanho_min
+        self.tamanho_max = tamanho_max
+        self.modificado_desde = modificado_desde
+        self.modificado_ate = modificado_ate
+        self.podar: Tuple[str, ...] = tuple(podar)
+        self._nomes = _compilar_globs(self.nomes)
+        self._podar = _compilar_globs(self.podar)
+
+    def __getstate__(self) -> Tuple:
+        return self.chave()
+
+    def __setstate__(self, estado: Tuple) -> None:
+        extensoes, nomes, regex, *demais, podar = estado
+        self.__init__(extensoes, nomes, regex, *demais, podar)
+
+    def chave(self) -> Tuple:
+        """Identificação da consulta (para chaves de cache e envio a processos)."""
+        return (
+            tuple(sorted(self.extensoes)),
+            self.nomes,
+            self.regex.pattern if self.regex else None,
+            self.tamanho_min,
+            self.tamanho_max,
+            self.modificado_desde,
+            self.modificado_ate,
+            self.podar,
+        )
+
+    @property
+    def filtra_nome(self) -> bool:
+        """Indica se algum critério depende do nome do arquivo."""
+        return bool(self.extensoes) or self._nomes is not None or self.regex is not None
+
+    def nome_aceito(self, nome: str) -> bool:
+        """Aplica extensões, globs e regex ao nome de um arquivo."""
+        if self.extensoes:
+            indice = nome.rfind(".")
+            extensao = nome[indice:].lower() if 0 < indice < len(nome) - 1 else ""
+            if extensao not in self.extensoes:
+                return False
+        if self._nomes is not None and not self._nomes.match(nome):
+            return False
+        return self.regex is None or self.regex.search(nome) is not None
+
+    def aceita_antes_do_stat(self, entrada: "os.DirEntry[str]") -> bool:
+        """
+        Decide pelo nome, sem `stat` (o tipo vem do `d_type` do diretório; só
+        links simbólicos precisam do `stat`, que fica guardado na entrada).
+        """
+        if self._podar is None and not self.filtra_nome:
+            return True
+        if entrada.is_dir():
+            return self._podar is None or not self._podar.match(entrada.name)
+        return not self.filtra_nome or self.nome_aceito(entrada.name)
+
+    def aceita_entrada(self, entrada: EntradaVarredura) -> bool:
+        """
+        Aplica todos os critérios a uma entrada já descrita (por exemplo, vinda
+        de uma árvore em memória), com o mesmo resultado de `listar_entradas`.
+        """
+        if entrada.e_diretorio:
+            return self._podar is None or not self._podar.match(entrada.nome)
+        if self.filtra_nome and not self.nome_aceito(entrada.nome):
+            return False
+        return self.aceita(entrada)
+
+    def aceita(self, entrada: EntradaVarredura) -> bool:
+        """Aplica os critérios que dependem do `stat` (somente a arquivos)."""
+        if not entrada.e_arquivo:
+            return True
+        info = entrada.info
+        if self.tamanho_min is not None and info.st_size < self.tamanho_min:
+            return False
+        if self.tamanho_max is not None and info.st_size > self.tamanho_max:
+            return False
+        if self.modificado_desde is not None and info.st_mtime < self.modificado_desde:
+            return False
+        return self.modificado_ate is None or info.st_mtime <= self.modificado_ate
@@ -0,0 +1,269 @@
+# app/models/duplicados.py
+
+"""
+Busca de arquivos duplicados a partir de uma varredura.
+
+As etapas descartam candidatos do mais barato ao mais caro:
+
+1. agrupa os arquivos por tamanho (só o `stat` da varredura, sem abrir nada);
+2. nos grupos com mais de um arquivo, calcula o hash do primeiro e do último
+   bloco de cada um;
+3. só os que empatam também nesse hash parcial têm o conteúdo inteiro lido,
+   em blocos (ou via `mmap` para arquivos grandes).
+
+As etapas 2 e 3 rodam em paralelo num pool de threads (`hashlib` libera o
+GIL ao processar blocos grandes). Com um `IndiceMetadados`, os hashes
+calculados são guardados no índice e reaproveitados enquanto o arquivo não
+mudar (o parcial, só com o mesmo `bloco`), e a varredura dos diretórios é a
+incremental.
+
+Links físicos (mesmo `st_dev`/`st_ino`) não ocupam espaço extra e contam como
+um único arquivo; arquivos vazios são ignorados.
+"""
+
+import hashlib
+import mmap
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+)
+
+from .varredura import EntradaVarredura, Varredura, obter_info
+
+if TYPE_CHECKING:
+    from .consulta import Consulta
+    from .indice import IndiceMetadados
+
+Arquivo = Tuple[str, os.stat_result]
+
+# Etapas de hash (posição do hash guardado no índice)
+PARCIAL = 0
+COMPLETO = 1
+
+
+class GrupoDuplicados(NamedTuple):
+    """Arquivos com o mesmo conteúdo."""
+
+    tamanho: int
+    hash: str
+    caminhos: List[str]
+
+    @property
+    def desperdicio(self) -> int:
+        """Bytes que seriam liberados mantendo uma única cópia."""
+        return self.tamanho * (len(self.caminhos) - 1)
+
+    def para_json(self) -> Dict:
+        """Representação JSON do grupo."""
+        return {
+            "tamanho": self.tamanho,
+            "hash": self.hash,
+            "caminhos": self.caminhos,
+            "desperdicio": self.desperdicio,
+        }
+
+
+def _novo_hash() -> "hashlib.blake2b":
+    """Hash usado nas duas etapas (BLAKE2b de 160 bits)."""
+    return hashlib.blake2b(digest_size=20)
+
+
+def hash_parcial(caminho: str, tamanho: int, bloco: int) -> str:
+    """
+    Hash do primeiro e do último bloco do arquivo. Arquivos de até dois
+    blocos são lidos por inteiro, uma única vez (o hash equivale ao completo).
+    """
+    resumo = _novo_hash()
+    with open(caminho, "rb") as arquivo:
+        resumo.update(arquivo.read(bloco))
+        if tamanho > bloco:
+            arquivo.seek(max(tamanho - bloco, bloco))
+            resumo.update(arquivo.read(bloco))
+    return resumo.hexdigest()
+
+
+def hash_completo(caminho: str, tamanho: int, bloco: int, limiar_mmap: int) -> str:
+    """Hash do conteúdo inteiro, lido em blocos ou mapeado com `mmap`."""
+    resumo = _novo_hash()
+    with open(caminho, "rb") as arquivo:
+        if tamanho >= limiar_mmap:
+            with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                resumo.update(mapa)
+        else:
+            for dados in iter(lambda: arquivo.read(bloco), b""):
+                resumo.update(dados)
+    return resumo.hexdigest()
+
+
+class LocalizadorDuplicados:
+    """
+    Encontra grupos de arquivos com conteúdo idêntico.
+
+    - `indice`: `IndiceMetadados` usado para guardar e reaproveitar hashes;
+    - `trabalhadores`: threads usadas para calcular os hashes;
+    - `bloco`: tamanho dos blocos do hash parcial e das leituras;
+    - `limiar_mmap`: arquivos a partir deste tamanho são lidos com `mmap`.
+    """
+
+    def __init__(
+        self,
+        indice: Optional["IndiceMetadados"] = None,
+        trabalhadores: int = 4,
+        bloco: int = 64 * 1024,
+        limiar_mmap: int = 8 * 1024 * 1024,
+    ) -> None:
+        self.indice = indice
+        self.trabalhadores = trabalhadores
+        self.bloco = bloco
+        self.limiar_mmap = limiar_mmap
+        self.hashes_calculados = 0
+        self.hashes_reaproveitados = 0
+
+    def _arquivos_da_raiz(
+        self, raiz: Union[str, "os.PathLike[str]"], consulta: Optional["Consulta"]
+    ) -> Iterable[Arquivo]:
+        """Arquivos regulares da raiz (ou a própria raiz, se for um arquivo)."""
+        info = obter_info(raiz)
+        if info is None:
+            return
+        if not stat.S_ISDIR(info.st_mode):
+            if stat.S_ISREG(info.st_mode):
+                yield os.fspath(raiz), info
+            return
+        if self.indice is not None and consulta is None:
+            varredura = self.indice.varredura(raiz, info)
+        else:
+            varredura = Varredura(raiz, info, consulta=consulta)
+        for no in varredura:
+            if no.entrada.e_arquivo:
+                yield no.entrada.caminho, no.entrada.info
+
+    def encontrar(
+        self,
+        raizes: Iterable[Union[str, "os.PathLike[str]"]],
+        consulta: Optional["Consulta"] = None,
+    ) -> List[GrupoDuplicados]:
+        """
+        Varre as raízes e retorna os grupos de duplicados, do maior
+        desperdício para o menor.
+        """
+        arquivos: List[Arquivo] = []
+        for raiz in raizes:
+            arquivos.extend(self._arquivos_da_raiz(raiz, consulta))
+        return self.agrupar(arquivos)
+
+    def agrupar(
+        self, arquivos: Iterable[Union[Arquivo, EntradaVarredura]]
+    ) -> List[GrupoDuplicados]:
+        """
+        Retorna os grupos de duplicados entre arquivos já varridos, como pares
+        (caminho, `stat`) ou `EntradaVarredura`.
+        """
+        por_tamanho: Dict[int, List[Arquivo]] = {}
+        inodes = set()
+        for item in arquivos:
+            if isinstance(item, EntradaVarredura):
+                item = (item.caminho, item.info)
+            caminho, info = item
+            chave_inode = (info.st_dev, info.st_ino)
+            if info.st_size == 0 or chave_inode in inodes:
+                continue
+            inodes.add(chave_inode)
+            por_tamanho.setdefault(info.st_size, []).append((caminho, info))
+        candidatos = [item for grupo in por_tamanho.values() if len(grupo) > 1 for item in grupo]
+        if not candidatos:
+            return []
+
+        guardados = (
+            self.indice.hashes_guardados(candidatos, self.bloco) if self.indice is not None else {}
+        )
+        novos: Dict[str, List] = {}
+        with ThreadPoolExecutor(max_workers=max(self.trabalhadores, 1)) as executor:
+            parciais = self._etapa(executor, candidatos, guardados, novos, PARCIAL)
+            restantes = [item for grupo in _agrupar(candidatos, parciais) for item in grupo]
+            completos = self._etapa(executor, restantes, guardados, novos, COMPLETO, parciais)
+        if self.indice is not None and novos:
+            self.indice.guardar_hashes(
+                [
+                    (caminho, info, parcial, completo)
+                    for caminho, (info, parcial, completo) in novos.items()
+                ],
+                self.bloco,
+            )
+
+        grupos = [
+            GrupoDuplicados(
+                grupo[0][1].st_size,
+                completos[grupo[0][0]],
+                sorted(caminho for caminho, _ in grupo),
+            )
+            for grupo in _agrupar(restantes, completos)
+        ]
+        grupos.sort(key=lambda grupo: (-grupo.desperdicio, grupo.caminhos[0]))
+        return grupos
+
+    def _etapa(
+        self,
+        executor: ThreadPoolExecutor,
+        arquivos: Sequence[Arquivo],
+        guardados: Dict[str, Tuple[Optional[str], Optional[str]]],
+        novos: Dict[str, List],
+        etapa: int,
+        parciais: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, str]:
+        """
+        Calcula o hash da `etapa` (`PARCIAL` ou `COMPLETO`) de cada arquivo,
+        reaproveitando os guardados no índice. Em arquivos de até dois blocos
+        os dois hashes são iguais, então um substitui o outro. Arquivos que
+        não puderam ser lidos ficam de fora do resultado.
+        """
+        hashes: Dict[str, str] = {}
+        pendentes: List[Arquivo] = []
+        for caminho, info in arquivos:
+            parcial, completo = guardados.get(caminho, (None, None))
+            pequeno = info.st_size <= 2 * self.bloco
+            if etapa == PARCIAL:
+                guardado = parcial or (completo if pequeno else None)
+            else:
+                guardado = completo
+                if guardado is None and pequeno and parciais is not None:
+                    hashes[caminho] = parciais[caminho]
+                    continue
+            if guardado is not None:
+                hashes[caminho] = guardado
+                self.hashes_reaproveitados += 1
+            else:
+                pendentes.append((caminho, info))
+
+        for (caminho, info), resultado in zip(
+            pendentes, executor.map(lambda item: self._calcular(item, etapa), pendentes)
+        ):
+            if resultado is not None:
+                hashes[caminho] = resultado
+                novos.setdefault(caminho, [info, None, None])[1 + etapa] = resultado
+                self.hashes_calculados += 1
+        return hashes
+
+    def _calcular(self, arquivo: Arquivo, etapa: int) -> Optional[str]:
+        """Hash da etapa, ou `None` se o arquivo não puder ser lido."""
+        caminho, info = arquivo
+        try:
+            if etapa == PARCIAL:
+                return hash_parcial(caminho, info.st_size, self.bloco)
+            return hash_completo(caminho, info.st_size, self.bloco, self.limiar_mmap)
+        except (OSError, ValueError):
+            return None
+
+
+def _agrupar(arquivos: Sequence[Arquivo], hashes: Dict[str, str]) -> List[List[Arquivo]]:
+    """
+    Agrupa os arquivos por tamanho e hash, mantendo só os grupos com mais de
+    um arquivo (os que ficaram sem hash são descartados).
+    """
+    grupos: Dict[Tuple[int, str], List[Arquivo]] = {}
+    for caminho, info in arquivos:
+        if caminho in hashes:
+            grupos.setdefault((info.st_size, hashes[caminho]), []).append((caminho, info))
+    return [grupo for grupo in grupos.values() if len(grupo) > 1]
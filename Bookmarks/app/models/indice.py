@@ -0,0 +1,393 @@
+# app/models/indice.py
+
+"""
+Índice persistente de metadados (SQLite) com nova varredura incremental.
+
+O índice guarda, para cada entrada, o caminho, o tamanho, as datas de criação
+e modificação e a posição na listagem do diretório pai. Em uma nova varredura,
+um diretório só é listado outra vez (`scandir`) se o seu `mtime`/`ctime`
+mudou desde a última listagem; caso contrário, os filhos vêm do índice.
+
+Garantia: com `verificar_arquivos=True` (padrão), a árvore produzida pela
+varredura incremental é igual à de uma varredura completa (`Varredura`),
+inclusive nos metadados dos arquivos. Isso vale porque:
+
+- criar, remover ou renomear uma entrada sempre altera o `mtime` e o `ctime`
+  do diretório que a contém, então a lista de nomes de um diretório com
+  `mtime`/`ctime` inalterados é a mesma da última listagem;
+- subdiretórios e (com `verificar_arquivos=True`) arquivos continuam tendo o
+  seu `stat` refeito, pois alterações internas não mudam o diretório pai;
+- diretórios listados no mesmo intervalo de resolução do relógio em que foram
+  modificados (`JANELA_RACY_NS`) são considerados alterados e listados de novo.
+
+A ordem dos irmãos é a da última listagem do diretório, que é a mesma de uma
+varredura completa em sistemas de arquivos com ordem de `readdir` estável.
+Com `verificar_arquivos=False` os arquivos de diretórios inalterados não têm
+o `stat` refeito: alterações de conteúdo feitas no próprio arquivo (sem criar
+ou renomear entradas) só aparecem quando o diretório for listado de novo.
+
+A tabela `hashes` guarda os hashes de conteúdo calculados pela busca de
+duplicados (`app.models.duplicados`), válidos enquanto o tamanho, o inode, o
+`mtime` e o `ctime` do arquivo não mudarem. O hash parcial depende do tamanho
+de bloco usado no cálculo, guardado junto com ele (`bloco`); um hash parcial
+de outro tamanho de bloco é ignorado.
+"""
+
+import os
+import sqlite3
+import stat
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from .varredura import Chave, EntradaVarredura, NoVarredura, listar_entradas, obter_info
+
+# Sistemas de arquivos com datas de baixa resolução (FAT: 2 s) podem registrar
+# uma alteração com o mesmo `mtime` da listagem; esses diretórios são relistados.
+JANELA_RACY_NS = 2_000_000_000
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS entradas (
+    caminho TEXT PRIMARY KEY,
+    pai TEXT,
+    ordem INTEGER NOT NULL,
+    nome TEXT NOT NULL,
+    modo INTEGER NOT NULL,
+    tamanho INTEGER NOT NULL,
+    dispositivo INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    data_criacao REAL NOT NULL,
+    data_modificacao REAL NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    listado_ctime_ns INTEGER,
+    listado_mtime_ns INTEGER,
+    listado_em_ns INTEGER
+);
+CREATE INDEX IF NOT EXISTS entradas_por_pai ON entradas (pai, ordem);
+CREATE TABLE IF NOT EXISTS hashes (
+    caminho TEXT PRIMARY KEY,
+    tamanho INTEGER NOT NULL,
+    dispositivo INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    parcial TEXT,
+    completo TEXT,
+    bloco INTEGER
+);
+"""
+
+_COLUNAS_ENTRADA = (
+    "caminho, pai, ordem, nome, modo, tamanho, dispositivo, inode, "
+    "data_criacao, data_modificacao, ctime_ns, mtime_ns"
+)
+
+
+def caminho_do_sqlite(uri: str) -> str:
+    """
+    Converte uma URI no formato do SQLAlchemy (`sqlite:///dev.db`,
+    `sqlite:////caminho/absoluto.db`) no caminho do arquivo do banco;
+    `sqlite://` corresponde a um banco em memória.
+    """
+    if not uri.startswith("sqlite://"):
+        raise ValueError(f"URI de banco não suportada pelo índice: {uri}")
+    return uri[len("sqlite:///"):] or ":memory:"
+
+
+def _info_armazenada(linha: sqlite3.Row) -> os.stat_result:
+    """Reconstrói um `stat_result` com os campos guardados no índice."""
+    return os.stat_result((
+        linha["modo"], linha["inode"], linha["dispositivo"], 0, 0, 0, linha["tamanho"],
+        0, int(linha["data_modificacao"]), int(linha["data_criacao"]),
+        0.0, linha["data_modificacao"], linha["data_criacao"],
+        0, linha["mtime_ns"], linha["ctime_ns"],
+    ))
+
+
+def _linha_de(
+    caminho: str, pai: Optional[str], ordem: int, nome: str, info: os.stat_result
+) -> Tuple:
+    """Valores das colunas de `_COLUNAS_ENTRADA` para uma entrada."""
+    return (
+        caminho, pai, ordem, nome, info.st_mode, info.st_size, info.st_dev, info.st_ino,
+        info.st_ctime, info.st_mtime, info.st_ctime_ns, info.st_mtime_ns,
+    )
+
+
+def _intervalo_descendentes(caminho: str) -> Tuple[str, str]:
+    """Limites (exclusivos) de comparação de texto que contêm só os descendentes."""
+    prefixo = caminho if caminho.endswith(os.sep) else caminho + os.sep
+    return prefixo, prefixo[:-1] + chr(ord(os.sep) + 1)
+
+
+class IndiceMetadados:
+    """Índice de metadados de arquivos e diretórios guardado em SQLite."""
+
+    def __init__(self, banco: str = ":memory:", verificar_arquivos: bool = True) -> None:
+        self.banco = banco
+        self.verificar_arquivos = verificar_arquivos
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(banco, check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        self._conexao.executescript(_ESQUEMA)
+        self._migrar()
+
+    @classmethod
+    def de_uri(cls, uri: str, verificar_arquivos: bool = True) -> "IndiceMetadados":
+        """Cria o índice a partir de uma URI como `SQLALCHEMY_DATABASE_URI`."""
+        return cls(caminho_do_sqlite(uri), verificar_arquivos)
+
+    def _migrar(self) -> None:
+        """
+        Acrescenta a coluna `bloco` à tabela `hashes` de bancos criados antes
+        dela; os hashes parciais antigos (sem `bloco`) deixam de ser usados.
+        """
+        colunas = {linha["name"] for linha in self._conexao.execute("PRAGMA table_info(hashes)")}
+        if "bloco" not in colunas:
+            with self._conexao:
+                self._conexao.execute("ALTER TABLE hashes ADD COLUMN bloco INTEGER")
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco."""
+        self._conexao.close()
+
+    @contextmanager
+    def transacao(self) -> Iterator[None]:
+        """Serializa o acesso ao banco e confirma (ou desfaz) as alterações ao final."""
+        with self._trava, self._conexao:
+            yield
+
+    def varredura(
+        self, raiz: Union[str, "os.PathLike[str]"], info_raiz: Optional[os.stat_result] = None
+    ) -> "VarreduraIncremental":
+        """Cria uma varredura incremental da raiz, que atualiza o índice ao ser percorrida."""
+        return VarreduraIncremental(self, raiz, info_raiz)
+
+    def _filhos(self, caminho: str) -> List[sqlite3.Row]:
+        return self._conexao.execute(
+            "SELECT * FROM entradas WHERE pai = ? ORDER BY ordem", (caminho,)
+        ).fetchall()
+
+    def _gravar(self, linhas: Sequence[Tuple], preservar_posicao: bool = False) -> None:
+        """
+        Insere ou atualiza entradas, preservando os dados da última listagem
+        (e, com `preservar_posicao`, o pai e a ordem de entradas já conhecidas).
+        """
+        posicao = "" if preservar_posicao else "pai = excluded.pai, ordem = excluded.ordem, "
+        self._conexao.executemany(
+            f"INSERT INTO entradas ({_COLUNAS_ENTRADA}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            f" ON CONFLICT(caminho) DO UPDATE SET {posicao}"
+            "nome = excluded.nome, modo = excluded.modo, tamanho = excluded.tamanho,"
+            " dispositivo = excluded.dispositivo, inode = excluded.inode,"
+            " data_criacao = excluded.data_criacao,"
+            " data_modificacao = excluded.data_modificacao,"
+            " ctime_ns = excluded.ctime_ns, mtime_ns = excluded.mtime_ns",
+            linhas,
+        )
+
+    def _inalterado(self, caminho: str, info: os.stat_result) -> bool:
+        """Indica se o diretório não mudou desde a última listagem registrada."""
+        linha = self._conexao.execute(
+            "SELECT listado_ctime_ns, listado_mtime_ns, listado_em_ns FROM entradas"
+            " WHERE caminho = ?",
+            (caminho,),
+        ).fetchone()
+        return (
+            linha is not None
+            and linha["listado_em_ns"] is not None
+            and linha["listado_mtime_ns"] == info.st_mtime_ns
+            and linha["listado_ctime_ns"] == info.st_ctime_ns
+            and info.st_mtime_ns < linha["listado_em_ns"] - JANELA_RACY_NS
+        )
+
+    def registrar_raiz(self, caminho: str, info: os.stat_result) -> None:
+        """Registra (ou atualiza) a raiz de uma varredura sem tirá-la do seu diretório pai."""
+        self._gravar(
+            [_linha_de(caminho, None, 0, os.path.basename(caminho), info)],
+            preservar_posicao=True,
+        )
+
+    def listar(self, caminho: str, info: os.stat_result) -> List[EntradaVarredura]:
+        """Lista o diretório no disco e sincroniza os filhos guardados no índice."""
+        inicio_ns = time.time_ns()
+        entradas = [
+            entrada for entrada in listar_entradas(caminho)
+            if entrada.e_arquivo or entrada.e_diretorio
+        ]
+        presentes = {entrada.caminho: entrada.e_diretorio for entrada in entradas}
+        for antiga in self._filhos(caminho):
+            if antiga["caminho"] not in presentes:
+                self._conexao.execute(
+                    "DELETE FROM entradas WHERE caminho = ?", (antiga["caminho"],)
+                )
+            if stat.S_ISDIR(antiga["modo"]) and not presentes.get(antiga["caminho"], False):
+                inicio, fim = _intervalo_descendentes(antiga["caminho"])
+                self._conexao.execute(
+                    "DELETE FROM entradas WHERE caminho > ? AND caminho < ?", (inicio, fim)
+                )
+        self._gravar([
+            _linha_de(entrada.caminho, caminho, ordem, entrada.nome, entrada.info)
+            for ordem, entrada in enumerate(entradas)
+        ])
+        self._conexao.execute(
+            "UPDATE entradas SET listado_ctime_ns = ?, listado_mtime_ns = ?, listado_em_ns = ?"
+            " WHERE caminho = ?",
+            (info.st_ctime_ns, info.st_mtime_ns, inicio_ns, caminho),
+        )
+        return entradas
+
+    def hashes_guardados(
+        self, arquivos: Sequence[Tuple[str, os.stat_result]], bloco: int
+    ) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        Hashes (parcial, completo) guardados para os arquivos cujo tamanho,
+        inode, `mtime` e `ctime` não mudaram desde o cálculo. O parcial só é
+        devolvido se foi calculado com o mesmo `bloco`.
+        """
+        guardados = {}
+        with self.transacao():
+            for caminho, info in arquivos:
+                linha = self._conexao.execute(
+                    "SELECT parcial, completo, bloco FROM hashes WHERE caminho = ? AND tamanho = ?"
+                    " AND dispositivo = ? AND inode = ? AND ctime_ns = ? AND mtime_ns = ?",
+                    (
+                        caminho, info.st_size, info.st_dev, info.st_ino,
+                        info.st_ctime_ns, info.st_mtime_ns,
+                    ),
+                ).fetchone()
+                if linha is not None:
+                    parcial = linha["parcial"] if linha["bloco"] == bloco else None
+                    guardados[caminho] = (parcial, linha["completo"])
+        return guardados
+
+    def guardar_hashes(
+        self,
+        hashes: Sequence[Tuple[str, os.stat_result, Optional[str], Optional[str]]],
+        bloco: int,
+    ) -> None:
+        """
+        Guarda (caminho, info, parcial, completo) de cada arquivo, com o
+        `bloco` usado nos hashes parciais; um hash `None` mantém o valor já
+        guardado para o mesmo estado do arquivo (o parcial, com o seu bloco).
+        """
+        with self.transacao():
+            self._conexao.executemany(
+                "INSERT INTO hashes (caminho, tamanho, dispositivo, inode, ctime_ns, mtime_ns,"
+                " parcial, completo, bloco)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(caminho) DO UPDATE SET"
+                " bloco = CASE WHEN hashes.mtime_ns = excluded.mtime_ns"
+                " AND hashes.ctime_ns = excluded.ctime_ns AND hashes.inode = excluded.inode"
+                " AND excluded.parcial IS NULL THEN hashes.bloco ELSE excluded.bloco END,"
+                " parcial = CASE WHEN hashes.mtime_ns = excluded.mtime_ns"
+                " AND hashes.ctime_ns = excluded.ctime_ns AND hashes.inode = excluded.inode"
+                " THEN coalesce(excluded.parcial, hashes.parcial) ELSE excluded.parcial END,"
+                " completo = CASE WHEN hashes.mtime_ns = excluded.mtime_ns"
+                " AND hashes.ctime_ns = excluded.ctime_ns AND hashes.inode = excluded.inode"
+                " THEN coalesce(excluded.completo, hashes.completo) ELSE excluded.completo END,"
+                " tamanho = excluded.tamanho, dispositivo = excluded.dispositivo,"
+                " inode = excluded.inode, ctime_ns = excluded.ctime_ns,"
+                " mtime_ns = excluded.mtime_ns",
+                [
+                    (
+                        caminho, info.st_size, info.st_dev, info.st_ino,
+                        info.st_ctime_ns, info.st_mtime_ns, parcial, completo, bloco,
+                    )
+                    for caminho, info, parcial, completo in hashes
+                ],
+            )
+
+    def conteudo(self, caminho: str, info: os.stat_result) -> Tuple[List[EntradaVarredura], bool]:
+        """
+        Filhos do diretório e se foi preciso listá-lo no disco; diretórios
+        inalterados são montados a partir do índice (ver a garantia do módulo).
+        """
+        if not self._inalterado(caminho, info):
+            return self.listar(caminho, info), True
+
+        entradas = []
+        atualizadas = []
+        for linha in self._filhos(caminho):
+            info_filho = _info_armazenada(linha)
+            if stat.S_ISDIR(linha["modo"]) or self.verificar_arquivos:
+                atual = obter_info(linha["caminho"])
+                if atual is None or stat.S_IFMT(atual.st_mode) != stat.S_IFMT(linha["modo"]):
+                    return self.listar(caminho, info), True
+                if (atual.st_mtime_ns, atual.st_ctime_ns) != (linha["mtime_ns"], linha["ctime_ns"]):
+                    atualizadas.append(
+                        _linha_de(linha["caminho"], caminho, linha["ordem"], linha["nome"], atual)
+                    )
+                info_filho = atual
+            entradas.append(EntradaVarredura(linha["caminho"], linha["nome"], info_filho))
+        self._gravar(atualizadas)
+        return entradas, False
+
+
+class VarreduraIncremental:
+    """
+    Varredura em pré-ordem, com a mesma interface da `Varredura` sem limites,
+    que reaproveita a listagem guardada no índice para diretórios inalterados.
+    """
+
+    def __init__(
+        self,
+        indice: IndiceMetadados,
+        raiz: Union[str, "os.PathLike[str]"],
+        info_raiz: Optional[os.stat_result] = None,
+    ) -> None:
+        self.indice = indice
+        self.raiz = os.fspath(raiz)
+        self.info_raiz = info_raiz
+        self.entradas = 0
+        self.truncado = False
+        self.motivo_truncamento: Optional[str] = None
+        self.diretorios_listados = 0
+        self.diretorios_reaproveitados = 0
+
+    def _conteudo(self, caminho: str, info: os.stat_result) -> List[EntradaVarredura]:
+        with self.indice.transacao():
+            entradas, listado = self.indice.conteudo(caminho, info)
+        if listado:
+            self.diretorios_listados += 1
+        else:
+            self.diretorios_reaproveitados += 1
+        return entradas
+
+    def __iter__(self) -> Iterator[NoVarredura]:
+        # Cada diretório é gravado na sua própria transação, fechada antes do
+        # `yield`: varreduras simultâneas do mesmo índice se intercalam, e um
+        # consumidor que para no meio não fica com a trava.
+        info_raiz = self.info_raiz or os.stat(self.raiz)
+        with self.indice.transacao():
+            self.indice.registrar_raiz(self.raiz, info_raiz)
+        chave_raiz = (info_raiz.st_dev, info_raiz.st_ino)
+        ativos: Set[Chave] = {chave_raiz}
+        pilha: List[Tuple[Iterator[EntradaVarredura], Chave]] = [
+            (iter(self._conteudo(self.raiz, info_raiz)), chave_raiz)
+        ]
+        while pilha:
+            filhos, chave_pai = pilha[-1]
+            entrada = next(filhos, None)
+            if entrada is None:
+                pilha.pop()
+                ativos.discard(chave_pai)
+                continue
+            self.entradas += 1
+            profundidade = len(pilha)
+            if not entrada.e_diretorio:
+                yield NoVarredura(entrada, profundidade)
+                continue
+            chave = (entrada.info.st_dev, entrada.info.st_ino)
+            if chave in ativos:
+                yield NoVarredura(entrada, profundidade, ciclo=True)
+                continue
+            try:
+                conteudo = self._conteudo(entrada.caminho, entrada.info)
+            except OSError as erro:
+                yield NoVarredura(entrada, profundidade, erro=erro.strerror or str(erro))
+                continue
+            yield NoVarredura(entrada, profundidade)
+            ativos.add(chave)
+            pilha.append((iter(conteudo), chave))
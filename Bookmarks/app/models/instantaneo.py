@@ -0,0 +1,348 @@
+# app/models/instantaneo.py
+
+"""
+Instantâneos de árvores num arquivo binário compacto, e a comparação de dois
+instantâneos sem carregá-los na memória.
+
+O instantâneo é gravado durante uma `VarreduraOrdenada`. A varredura produz as
+entradas em pré-ordem com os irmãos em ordem de nome, e essa é também a ordem
+das chaves (os componentes do caminho relativo unidos por `"\\0"`, que vem
+antes de qualquer caractere permitido num nome). Cada registro guarda só o
+sufixo da chave que difere da anterior, as marcas (diretório, ciclo, erro), o
+tamanho, o `mtime` em nanossegundos, o dispositivo e o inode.
+
+Como os dois arquivos já estão ordenados pela chave, `comparar_instantaneos`
+os percorre juntos, como na intercalação do merge sort, e guarda só as
+entradas removidas e adicionadas que ainda podem ser uma movimentação (mesmo
+dispositivo e inode). Essas pendências são limitadas por `max_pendentes`.
+"""
+
+import json
+import os
+import stat
+import struct
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .paginacao import VarreduraOrdenada
+
+if TYPE_CHECKING:
+    from .consulta import Consulta
+
+MAGICO = b"KBSNAP1\n"
+DIRETORIO = 1
+CICLO = 2
+ERRO = 4
+_FIM = 0xFF
+_TAMANHO = struct.Struct("<I")
+_REGISTRO = struct.Struct("<BHH")
+_DADOS = struct.Struct("<qqQQ")
+_TOTAL = struct.Struct("<Q")
+_MAX_PREFIXO = 0xFFFF
+
+Identidade = Tuple[int, int]
+
+
+class RegistroInstantaneo(NamedTuple):
+    """Uma entrada do instantâneo."""
+
+    chave: str
+    marcas: int
+    tamanho: int
+    mtime_ns: int
+    dispositivo: int
+    inode: int
+
+    @property
+    def e_diretorio(self) -> bool:
+        """Indica se a entrada é um diretório."""
+        return bool(self.marcas & DIRETORIO)
+
+    @property
+    def caminho(self) -> str:
+        """Caminho relativo à raiz do instantâneo."""
+        return self.chave.replace("\0", os.sep)
+
+    @property
+    def identidade(self) -> Identidade:
+        """Par (dispositivo, inode), que não muda quando a entrada é movida."""
+        return (self.dispositivo, self.inode)
+
+
+def _codificar(texto: str) -> bytes:
+    return texto.encode("utf-8", "surrogateescape")
+
+
+def _prefixo_comum(anterior: bytes, atual: bytes) -> int:
+    """Bytes iniciais iguais nas duas chaves (até o limite do registro)."""
+    limite = min(len(anterior), len(atual), _MAX_PREFIXO)
+    indice = 0
+    while indice < limite and anterior[indice] == atual[indice]:
+        indice += 1
+    return indice
+
+
+def gravar_instantaneo(
+    raiz: Union[str, "os.PathLike[str]"],
+    destino: Union[str, "os.PathLike[str]"],
+    max_profundidade: Optional[int] = None,
+    consulta: Optional["Consulta"] = None,
+) -> Dict:
+    """
+    Varre a raiz em ordem de nome e grava o instantâneo em `destino`. O
+    arquivo é escrito ao lado (`.part`) e só substitui o destino no final.
+    Levanta `ValueError` se a raiz não for um diretório.
+
+    Retorna o cabeçalho gravado, com o total de `entradas`.
+    """
+    raiz = os.path.abspath(raiz)
+    destino = os.fspath(destino)
+    try:
+        info = os.stat(raiz)
+    except OSError as erro:
+        raise ValueError(f"O caminho {raiz} não é um diretório válido.") from erro
+    if not stat.S_ISDIR(info.st_mode):
+        raise ValueError(f"O caminho {raiz} não é um diretório válido.")
+    cabecalho = {
+        "raiz": raiz,
+        "criado_em": time.time(),
+        "max_profundidade": max_profundidade,
+        "filtrado": consulta is not None,
+    }
+    varredura = VarreduraOrdenada(raiz, info, max_profundidade=max_profundidade, consulta=consulta)
+    temporario = destino + ".part"
+    entradas = 0
+    try:
+        with open(temporario, "wb", buffering=1024 * 1024) as arquivo:
+            dados = json.dumps(cabecalho).encode("utf-8")
+            arquivo.write(MAGICO + _TAMANHO.pack(len(dados)) + dados)
+            anterior = b""
+            for componentes, no in varredura:
+                chave = _codificar("\0".join(componentes))
+                prefixo = _prefixo_comum(anterior, chave)
+                marcas = DIRETORIO if no.entrada.e_diretorio else 0
+                if no.ciclo:
+                    marcas |= CICLO
+                if no.erro is not None:
+                    marcas |= ERRO
+                item = no.entrada.info
+                arquivo.write(_REGISTRO.pack(marcas, prefixo, len(chave) - prefixo))
+                arquivo.write(chave[prefixo:])
+                arquivo.write(
+                    _DADOS.pack(item.st_size, item.st_mtime_ns, item.st_dev, item.st_ino)
+                )
+                anterior = chave
+                entradas += 1
+            arquivo.write(bytes([_FIM]) + _TOTAL.pack(entradas))
+        os.replace(temporario, destino)
+    except BaseException:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        raise
+    cabecalho["entradas"] = entradas
+    return cabecalho
+
+
+def _ler_exato(arquivo, tamanho: int) -> bytes:
+    dados = arquivo.read(tamanho)
+    if len(dados) != tamanho:
+        raise ValueError("Instantâneo incompleto.")
+    return dados
+
+
+class LeitorInstantaneo:
+    """
+    Lê um instantâneo gravado por `gravar_instantaneo`: o `cabecalho` ao ser
+    criado e os registros, em ordem de chave, a cada iteração. Levanta
+    `ValueError` se o arquivo não for um instantâneo ou estiver incompleto.
+    """
+
+    def __init__(self, caminho: Union[str, "os.PathLike[str]"]) -> None:
+        self.caminho = os.fspath(caminho)
+        with open(self.caminho, "rb") as arquivo:
+            self.cabecalho = self._ler_cabecalho(arquivo)
+
+    @staticmethod
+    def _ler_cabecalho(arquivo) -> Dict:
+        if arquivo.read(len(MAGICO)) != MAGICO:
+            raise ValueError("O arquivo não é um instantâneo.")
+        (tamanho,) = _TAMANHO.unpack(_ler_exato(arquivo, _TAMANHO.size))
+        return json.loads(_ler_exato(arquivo, tamanho).decode("utf-8"))
+
+    def __iter__(self) -> Iterator[RegistroInstantaneo]:
+        with open(self.caminho, "rb", buffering=1024 * 1024) as arquivo:
+            self._ler_cabecalho(arquivo)
+            anterior = b""
+            lidos = 0
+            while True:
+                inicio = arquivo.read(1)
+                if not inicio:
+                    raise ValueError("Instantâneo incompleto.")
+                if inicio[0] == _FIM:
+                    (total,) = _TOTAL.unpack(_ler_exato(arquivo, _TOTAL.size))
+                    if total != lidos:
+                        raise ValueError("Instantâneo incompleto.")
+                    return
+                marcas, prefixo, sufixo = _REGISTRO.unpack(
+                    inicio + _ler_exato(arquivo, _REGISTRO.size - 1)
+                )
+                chave = anterior[:prefixo] + _ler_exato(arquivo, sufixo)
+                tamanho, mtime_ns, dispositivo, inode = _DADOS.unpack(
+                    _ler_exato(arquivo, _DADOS.size)
+                )
+                anterior = chave
+                lidos += 1
+                yield RegistroInstantaneo(
+                    chave.decode("utf-8", "surrogateescape"),
+                    marcas,
+                    tamanho,
+                    mtime_ns,
+                    dispositivo,
+                    inode,
+                )
+
+
+def _descrever(mudanca: str, registro: RegistroInstantaneo) -> Dict:
+    dados = {
+        "mudanca": mudanca,
+        "caminho": registro.caminho,
+        "tipo": "diretorio" if registro.e_diretorio else "arquivo",
+        "data_modificacao": registro.mtime_ns / 1e9,
+    }
+    if not registro.e_diretorio:
+        dados["tamanho"] = registro.tamanho
+    return dados
+
+
+def _alterado(antes: RegistroInstantaneo, depois: RegistroInstantaneo) -> bool:
+    """Arquivos com outro tamanho ou `mtime` (diretórios mudam pelos filhos)."""
+    if depois.e_diretorio:
+        return False
+    return antes.tamanho != depois.tamanho or antes.mtime_ns != depois.mtime_ns
+
+
+def _mesma_entrada(antes: RegistroInstantaneo, depois: RegistroInstantaneo) -> bool:
+    """
+    Indica se o par com a mesma identidade é uma movimentação, e não um inode
+    reaproveitado: renomear não muda o `mtime` nem o tamanho de um arquivo.
+    """
+    if antes.e_diretorio or depois.e_diretorio:
+        return antes.e_diretorio == depois.e_diretorio
+    return antes.tamanho == depois.tamanho and antes.mtime_ns == depois.mtime_ns
+
+
+class _Pendencias:
+    """
+    Removidos e adicionados ainda sem par, por identidade, na ordem em que
+    chegaram. Acima de `limite`, os mais antigos saem sem par.
+    """
+
+    def __init__(self, limite: int) -> None:
+        self.limite = max(limite, 0)
+        self.removidos: "OrderedDict[Identidade, RegistroInstantaneo]" = OrderedDict()
+        self.adicionados: "OrderedDict[Identidade, RegistroInstantaneo]" = OrderedDict()
+
+    def _guardar(
+        self,
+        mudanca: str,
+        pendentes: "OrderedDict[Identidade, RegistroInstantaneo]",
+        registro: RegistroInstantaneo,
+    ) -> List[Dict]:
+        saida = []
+        anterior = pendentes.pop(registro.identidade, None)
+        if anterior is not None:
+            saida.append(_descrever(mudanca, anterior))
+        pendentes[registro.identidade] = registro
+        while len(pendentes) > self.limite:
+            _, antigo = pendentes.popitem(last=False)
+            saida.append(_descrever(mudanca, antigo))
+        return saida
+
+    def _parear(
+        self,
+        origem: RegistroInstantaneo,
+        destino: RegistroInstantaneo,
+    ) -> Dict:
+        dados = _descrever("movido", destino)
+        dados["origem"] = origem.caminho
+        return dados
+
+    def removido(self, registro: RegistroInstantaneo) -> List[Dict]:
+        if registro.inode == 0:
+            return [_descrever("removido", registro)]
+        par = self.adicionados.get(registro.identidade)
+        if par is not None and _mesma_entrada(registro, par):
+            del self.adicionados[registro.identidade]
+            return [self._parear(registro, par)]
+        return self._guardar("removido", self.removidos, registro)
+
+    def adicionado(self, registro: RegistroInstantaneo) -> List[Dict]:
+        if registro.inode == 0:
+            return [_descrever("adicionado", registro)]
+        par = self.removidos.get(registro.identidade)
+        if par is not None and _mesma_entrada(par, registro):
+            del self.removidos[registro.identidade]
+            return [self._parear(par, registro)]
+        return self._guardar("adicionado", self.adicionados, registro)
+
+    def esvaziar(self) -> Iterator[Dict]:
+        for registro in self.removidos.values():
+            yield _descrever("removido", registro)
+        for registro in self.adicionados.values():
+            yield _descrever("adicionado", registro)
+        self.removidos.clear()
+        self.adicionados.clear()
+
+
+def comparar_instantaneos(
+    antigo: Union[str, "os.PathLike[str]", LeitorInstantaneo],
+    novo: Union[str, "os.PathLike[str]", LeitorInstantaneo],
+    max_pendentes: int = 100_000,
+) -> Iterator[Dict]:
+    """
+    Compara dois instantâneos e produz as mudanças do antigo para o novo:
+    `adicionado`, `removido`, `modificado` (arquivo com outro tamanho ou
+    `mtime`) e `movido` (mesmo dispositivo e inode em outro caminho, com a
+    `origem`; nos arquivos, também o mesmo tamanho e `mtime`, para não
+    confundir um inode reaproveitado com uma movimentação). Os caminhos são
+    relativos às raízes, então instantâneos de raízes diferentes também
+    podem ser comparados.
+
+    As mudanças na mesma chave saem assim que as duas leituras chegam a
+    ela. Removidos e adicionados esperam pelo par até o fim, ou até
+    passarem de `max_pendentes` de cada lado; nesse caso os mais antigos
+    saem sem par, e uma movimentação muito distante na ordem dos caminhos
+    aparece como remoção e adição. A memória usada depende de
+    `max_pendentes`, e não do tamanho das árvores.
+    """
+    registros_antigos = iter(
+        antigo if isinstance(antigo, LeitorInstantaneo) else LeitorInstantaneo(antigo)
+    )
+    registros_novos = iter(
+        novo if isinstance(novo, LeitorInstantaneo) else LeitorInstantaneo(novo)
+    )
+    pendencias = _Pendencias(max_pendentes)
+    anterior = next(registros_antigos, None)
+    atual = next(registros_novos, None)
+    while anterior is not None or atual is not None:
+        if atual is None or (anterior is not None and anterior.chave < atual.chave):
+            yield from pendencias.removido(anterior)
+            anterior = next(registros_antigos, None)
+        elif anterior is None or atual.chave < anterior.chave:
+            yield from pendencias.adicionado(atual)
+            atual = next(registros_novos, None)
+        else:
+            if anterior.e_diretorio != atual.e_diretorio:
+                yield from pendencias.removido(anterior)
+                yield from pendencias.adicionado(atual)
+            elif _alterado(anterior, atual):
+                dados = _descrever("modificado", atual)
+                dados["tamanho_anterior"] = anterior.tamanho
+                dados["data_modificacao_anterior"] = anterior.mtime_ns / 1e9
+                yield dados
+            anterior = next(registros_antigos, None)
+            atual = next(registros_novos, None)
+    yield from pendencias.esvaziar()
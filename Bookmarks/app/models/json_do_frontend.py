@@ -7,28 +7,54 @@ uma lista de caminhos em um formato JSON adequado.
 
 import json
 import re
-from typing import Dict, List
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from app.services.metrics import timed
+
+# Caracteres de um segmento de caminho.
+_SEGMENTO = r"[\w\s.-]+"
+
+# Os padrões abaixo descrevem as mesmas linguagens da versão original
+# (`(/seg)+/?`, `(seg\\?)+`, `(seg(/|\\)?)+`), mas sem grupos repetidos
+# ambíguos: cada separador é obrigatório entre segmentos, o que evita o
+# retrocesso exponencial em entradas longas que não casam.
+_ALTERNATIVAS = (
+    rf"/{_SEGMENTO}(?:/{_SEGMENTO})*/?"  # Caminhos absolutos Unix/Linux/MacOS
+    rf"|[a-zA-Z]:\\{_SEGMENTO}(?:\\{_SEGMENTO})*\\?"  # Caminhos absolutos Windows
+    rf"|{_SEGMENTO}(?:[/\\]{_SEGMENTO})*[/\\]?"  # Caminhos relativos
+    rf"|\\\\{_SEGMENTO}(?:\\{_SEGMENTO})+"  # Caminhos UNC (rede)
+)
+
+PADRAO_CAMINHO = re.compile(rf"^(?:{_ALTERNATIVAS})$")
+CARACTERES_INVALIDOS = re.compile(r'[<>:"|?*\x00-\x1f]')
+
+# Validação completa de um caminho já sem espaços nas pontas, numa única
+# chamada: o lookahead exige ao menos 2 caracteres e nenhum caractere
+# inválido; em seguida vem o formato.
+_PADRAO_VALIDO = re.compile(
+    rf'(?=[^<>:"|?*\x00-\x1f]{{2,}}\Z)(?:{_ALTERNATIVAS})\Z'
+)
+
+MOTIVO_NAO_TEXTO = "nao_e_texto"
+MOTIVO_VAZIO = "vazio"
+MOTIVO_CURTO = "muito_curto"
+MOTIVO_CARACTERE_INVALIDO = "caractere_invalido"
+MOTIVO_FORMATO_INVALIDO = "formato_invalido"
+
+
+class ResultadoValidacao(NamedTuple):
+    """Resultado da validação de um caminho (`caminho` já sem espaços nas pontas)."""
+
+    caminho: Optional[str]
+    valido: bool
+    motivo: Optional[str] = None
 
 
 def validar_regex_caminho(caminho: str) -> bool:
     """
     Verifica se o caminho atende ao padrão definido pela regex.
     """
-    padrao_caminho = re.compile(
-        r"""
-        ^(
-            (/[\w\s.-]+)+/?$          # Caminhos absolutos Unix/Linux/MacOS
-            |
-            [a-zA-Z]:\\([\w\s.-]+\\?)+$  # Caminhos absolutos Windows
-            |
-            ([\w\s.-]+(/|\\)?)+$         # Caminhos relativos
-            |
-            \\\\[\w\s.-]+(\\[\w\s.-]+)+$ # Caminhos UNC (rede)
-        )$
-        """,
-        re.VERBOSE,
-    )
-    return bool(padrao_caminho.match(caminho))
+    return PADRAO_CAMINHO.match(caminho) is not None
 
 
 def validar_caminho(caminho: str) -> bool:
@@ -37,34 +63,70 @@ def validar_caminho(caminho: str) -> bool:
     - Não deve conter caracteres inválidos.
     - Deve ser maior que 1 caractere.
     """
-    caracteres_invalidos = r'[<>:"|?*\x00-\x1f]'
-    if re.search(caracteres_invalidos, caminho):
+    if CARACTERES_INVALIDOS.search(caminho):
         return False
-    if not caminho.strip() or len(caminho.strip()) < 2:
-        return False
-    return True
+    return len(caminho.strip()) >= 2
+
 
+def _motivo_rejeicao(caminho: str) -> str:
+    """Identifica por que um caminho (sem espaços nas pontas) foi rejeitado."""
+    if not caminho:
+        return MOTIVO_VAZIO
+    if len(caminho) < 2:
+        return MOTIVO_CURTO
+    if CARACTERES_INVALIDOS.search(caminho):
+        return MOTIVO_CARACTERE_INVALIDO
+    return MOTIVO_FORMATO_INVALIDO
 
+
+@timed("validate", count=lambda resultados, *_: {"entries": len(resultados)})
+def validar_lote(caminhos: Iterable[object]) -> List[ResultadoValidacao]:
+    """
+    Valida uma lista de caminhos de uma só vez, na ordem de entrada.
+
+    Cada caminho tem os espaços das pontas removidos uma única vez e é
+    verificado por uma única expressão regular pré-compilada. O motivo da
+    rejeição só é calculado para os caminhos rejeitados. Aceita exatamente
+    os mesmos caminhos que `validar_regex_caminho` e `validar_caminho`
+    aplicados ao caminho sem espaços.
+    """
+    valido = _PADRAO_VALIDO.match
+    resultados = []
+    for caminho in caminhos:
+        if not isinstance(caminho, str):
+            resultados.append(ResultadoValidacao(None, False, MOTIVO_NAO_TEXTO))
+            continue
+        caminho = caminho.strip()
+        if valido(caminho):
+            resultados.append(ResultadoValidacao(caminho, True))
+        else:
+            resultados.append(ResultadoValidacao(caminho, False, _motivo_rejeicao(caminho)))
+    return resultados
+
+
+@timed("validate", count=lambda _, caminhos: {"entries": len(caminhos)})
 def filtrar_caminhos_validos(caminhos: List[str]) -> List[str]:
     """
     Filtra a lista de caminhos, aplicando as validações.
     """
+    valido = _PADRAO_VALIDO.match
     caminhos_validados = []
     for c in caminhos:
-        caminho_strip = c.strip()
-        if isinstance(c, str) and caminho_strip:
-            if validar_regex_caminho(caminho_strip) and validar_caminho(caminho_strip):
+        if isinstance(c, str):
+            caminho_strip = c.strip()
+            if valido(caminho_strip):
                 caminhos_validados.append(caminho_strip)
     return caminhos_validados
 
 
 def formatar_caminhos_para_json(caminhos: List[str]) -> str:
     """
-    Formata uma lista de caminhos válidos em um JSON adequado.
+    Formata uma lista de caminhos válidos em um JSON adequado, numa única
+    linha (sem indentação).
     """
     caminhos_validados = filtrar_caminhos_validos(caminhos)
     dict_caminhos: Dict[str, List[str]] = {"jsonEntrada": caminhos_validados}
-    return json.dumps(dict_caminhos, indent=4, ensure_ascii=False)
+    return json.dumps(dict_caminhos, ensure_ascii=False)
 
 
 # Exemplo de caminhos fornecidos pelo frontend
@@ -91,6 +153,18 @@ caminhos_frontend: List[str] = [
     "relative\\path\\..\\invalid",
 ]
 
-# Formatação de caminhos em JSON
-json_frontend: str = formatar_caminhos_para_json(caminhos_frontend)
-print(json_frontend)
+
+def __getattr__(nome: str) -> str:
+    """
+    Calcula `json_frontend` (o JSON dos caminhos de exemplo) só no primeiro
+    acesso, para que importar o módulo não execute a formatação.
+    """
+    if nome == "json_frontend":
+        valor = formatar_caminhos_para_json(caminhos_frontend)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+if __name__ == "__main__":
+    print(formatar_caminhos_para_json(caminhos_frontend))
@@ -0,0 +1,715 @@
+# app/models/observador.py
+
+"""
+Árvores das raízes observadas, mantidas em memória e atualizadas por
+notificações do sistema de arquivos.
+
+Cada raiz registrada no `ObservadorArvores` é varrida uma única vez para a
+`ArvoreMemoria`, que guarda a listagem de cada diretório (nome ->
+`EntradaVarredura`). Depois disso, só o que muda é relido:
+
+- com inotify (Linux), cada diretório listado recebe uma observação, e cada
+  evento refaz apenas o `stat` da entrada citada (e do diretório que a
+  contém); diretórios novos são varridos ao aparecer e os removidos saem da
+  árvore com toda a subárvore. Eventos perdidos (`IN_Q_OVERFLOW`) fazem a
+  raiz ser varrida de novo;
+- sem inotify, o modo de polling refaz a cada `intervalo` o `stat` dos
+  diretórios (e, com `verificar_arquivos=True`, dos arquivos) e só lista de
+  novo os diretórios cujo `mtime`/`ctime` mudou, com a mesma regra do
+  `IndiceMetadados` (inclusive a `JANELA_RACY_NS`).
+
+A `VarreduraMemoria` percorre a árvore em memória com a mesma interface e o
+mesmo resultado da `Varredura` (limites, consulta e detecção de ciclos),
+sem acessar o disco: o custo de uma resposta é proporcional ao que ela
+contém, e não ao tamanho da raiz. Diretórios fora da árvore (por exemplo,
+os que não puderam ser observados) são lidos do disco.
+
+A árvore reflete os eventos já processados: antes de responder, o
+observador processa os eventos inotify pendentes (`sincronizar`); no modo de
+polling, as alterações aparecem em até `intervalo` segundos. Os irmãos
+seguem a ordem da varredura inicial, e entradas novas vão para o fim da
+listagem do diretório.
+"""
+
+import itertools
+import os
+import select
+import stat
+import struct
+import threading
+import time
+from typing import (
+    TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+)
+
+from .indice import JANELA_RACY_NS
+from .varredura import Chave, EntradaVarredura, Varredura, listar_entradas, obter_info
+
+if TYPE_CHECKING:
+    from .consulta import Consulta
+
+# Máscaras de `<sys/inotify.h>`
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+
+# Eventos que alteram a listagem do diretório observado (e o seu `mtime`)
+_ALTERAM_LISTAGEM = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+_MASCARA = (
+    _ALTERAM_LISTAGEM | IN_MODIFY | IN_ATTRIB | IN_DELETE_SELF | IN_MOVE_SELF
+    | IN_ONLYDIR | IN_EXCL_UNLINK
+)
+
+BACKENDS = ("auto", "inotify", "polling")
+
+
+def _mesmo_estado(antes: os.stat_result, depois: os.stat_result) -> bool:
+    """Compara os campos exibidos e usados na varredura (ignora o `atime`)."""
+    return (
+        antes.st_mode == depois.st_mode
+        and antes.st_ino == depois.st_ino
+        and antes.st_dev == depois.st_dev
+        and antes.st_size == depois.st_size
+        and antes.st_mtime_ns == depois.st_mtime_ns
+        and antes.st_ctime_ns == depois.st_ctime_ns
+    )
+
+
+def _chave(info: os.stat_result) -> Chave:
+    return (info.st_dev, info.st_ino)
+
+
+class Inotify:
+    """
+    Ligação mínima com a API inotify do Linux via `ctypes`, sem dependências.
+    Levanta `OSError` se a API não estiver disponível.
+    """
+
+    _EVENTO = struct.Struct("iIII")
+
+    def __init__(self) -> None:
+        import ctypes  # pylint: disable=C0415
+        import ctypes.util  # pylint: disable=C0415
+
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            iniciar = self._libc.inotify_init1
+        except (OSError, AttributeError) as erro:
+            raise OSError("inotify indisponível") from erro
+        self._ctypes = ctypes
+        self.fd = iniciar(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            self._erro()
+
+    def _erro(self, caminho: Optional[str] = None) -> None:
+        numero = self._ctypes.get_errno()
+        raise OSError(numero, os.strerror(numero), caminho)
+
+    def adicionar(self, caminho: str, mascara: int = _MASCARA) -> int:
+        """Observa o diretório e retorna o descritor da observação."""
+        descritor = self._libc.inotify_add_watch(self.fd, os.fsencode(caminho), mascara)
+        if descritor < 0:
+            self._erro(caminho)
+        return descritor
+
+    def remover(self, descritor: int) -> None:
+        """Remove a observação (ignora descritores que o kernel já removeu)."""
+        self._libc.inotify_rm_watch(self.fd, descritor)
+
+    def esperar(self, espera: Optional[float]) -> bool:
+        """Espera até `espera` segundos por eventos; indica se há eventos para ler."""
+        prontos, _, _ = select.select([self.fd], [], [], espera)
+        return bool(prontos)
+
+    def ler(self) -> List[Tuple[int, int, int, str]]:
+        """Eventos pendentes (descritor, máscara, cookie, nome), sem bloquear."""
+        eventos = []
+        while True:
+            try:
+                dados = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return eventos
+            posicao = 0
+            while posicao < len(dados):
+                descritor, mascara, cookie, tamanho = self._EVENTO.unpack_from(dados, posicao)
+                posicao += self._EVENTO.size
+                nome = dados[posicao:posicao + tamanho].rstrip(b"\0")
+                posicao += tamanho
+                eventos.append((descritor, mascara, cookie, os.fsdecode(nome)))
+
+    def fechar(self) -> None:
+        """Fecha o descritor (remove todas as observações)."""
+        os.close(self.fd)
+
+
+class ArvoreMemoria:
+    """
+    Listagens dos diretórios de uma raiz, guardadas em memória.
+
+    `ao_abrir(caminho)` é chamado antes de cada diretório ser listado; se
+    retornar `False`, o diretório fica fora da árvore (e é lido do disco por
+    quem o percorrer). `ao_descartar(caminho)` é chamado para cada diretório
+    que sai da árvore. `versao` aumenta a cada alteração aplicada; junto com
+    `identidade` (única por instância), identifica o estado das subárvores
+    em que `completo` é verdadeiro.
+    """
+
+    def __init__(
+        self,
+        raiz: Union[str, "os.PathLike[str]"],
+        ao_abrir: Optional[Callable[[str], bool]] = None,
+        ao_descartar: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.raiz = os.path.abspath(raiz)
+        self.ao_abrir = ao_abrir
+        self.ao_descartar = ao_descartar
+        self.info_raiz: Optional[os.stat_result] = None
+        self.identidade = os.urandom(8).hex()
+        self.versao = 0
+        self._filhos: Dict[str, Dict[str, EntradaVarredura]] = {}
+        self._listagens: Dict[str, Tuple[int, int, int]] = {}
+        self._erros: Dict[str, OSError] = {}
+        self._recusados: Set[str] = set()
+        self._trava = threading.RLock()
+
+    def carregar(self) -> None:
+        """(Re)varre a raiz inteira. Levanta `OSError` se a raiz não existir."""
+        info = os.stat(self.raiz)
+        with self._trava:
+            self._descartar(self.raiz)
+            self.info_raiz = info
+            self._carregar(self.raiz, info, ())
+            self.versao += 1
+
+    def esvaziar(self) -> None:
+        """Descarta todas as listagens (e as observações, via `ao_descartar`)."""
+        with self._trava:
+            self._descartar(self.raiz)
+            self.info_raiz = None
+            self.versao += 1
+
+    def _listar(self, caminho: str, info: os.stat_result) -> Optional[Dict[str, EntradaVarredura]]:
+        """Lista o diretório no disco e guarda os filhos (`None` se ficar fora da árvore)."""
+        if self.ao_abrir is not None and not self.ao_abrir(caminho):
+            self._recusados.add(caminho)
+            return None
+        self._recusados.discard(caminho)
+        inicio_ns = time.time_ns()
+        try:
+            filhos = {
+                entrada.nome: entrada for entrada in listar_entradas(caminho)
+                if entrada.e_arquivo or entrada.e_diretorio
+            }
+        except OSError as erro:
+            self._erros[caminho] = erro
+            self._filhos.pop(caminho, None)
+            self._listagens.pop(caminho, None)
+            return None
+        self._erros.pop(caminho, None)
+        self._filhos[caminho] = filhos
+        self._listagens[caminho] = (info.st_mtime_ns, info.st_ctime_ns, inicio_ns)
+        return filhos
+
+    def _carregar(self, caminho: str, info: os.stat_result, ancestrais: Iterable[Chave]) -> None:
+        """Varre a subárvore, sem entrar em diretórios que apontam para um ancestral."""
+        pilha = [(caminho, info, frozenset(ancestrais))]
+        while pilha:
+            atual, info_atual, ativos = pilha.pop()
+            ativos = ativos | {_chave(info_atual)}
+            filhos = self._listar(atual, info_atual)
+            for entrada in (filhos or {}).values():
+                if entrada.e_diretorio and _chave(entrada.info) not in ativos:
+                    pilha.append((entrada.caminho, entrada.info, ativos))
+
+    def _descartar(self, caminho: str) -> None:
+        """Remove o diretório e toda a sua subárvore."""
+        pilha = [caminho]
+        while pilha:
+            atual = pilha.pop()
+            self._erros.pop(atual, None)
+            self._recusados.discard(atual)
+            self._listagens.pop(atual, None)
+            filhos = self._filhos.pop(atual, None)
+            if filhos is None:
+                continue
+            if self.ao_descartar is not None:
+                self.ao_descartar(atual)
+            pilha.extend(entrada.caminho for entrada in filhos.values() if entrada.e_diretorio)
+
+    def _ancestrais(self, caminho: str) -> List[Chave]:
+        """Chaves (`st_dev`, `st_ino`) da raiz até o diretório, inclusive."""
+        chaves = [_chave(self.info_raiz)]
+        relativo = os.path.relpath(caminho, self.raiz)
+        atual = self.raiz
+        for nome in ([] if relativo == "." else relativo.split(os.sep)):
+            entrada = self._filhos.get(atual, {}).get(nome)
+            if entrada is None:
+                break
+            chaves.append(_chave(entrada.info))
+            atual = entrada.caminho
+        return chaves
+
+    def _relistar(self, caminho: str, info: os.stat_result) -> None:
+        """
+        Lista o diretório de novo: subárvores de diretórios removidos saem da
+        árvore, diretórios novos são varridos e os mantidos não são relidos.
+        """
+        antigos = self._filhos.get(caminho, {})
+        novos = self._listar(caminho, info) or {}
+        for nome, antiga in antigos.items():
+            nova = novos.get(nome)
+            if antiga.e_diretorio and (
+                nova is None or not nova.e_diretorio or _chave(nova.info) != _chave(antiga.info)
+            ):
+                self._descartar(antiga.caminho)
+        ancestrais = self._ancestrais(caminho)
+        for nova in novos.values():
+            if (
+                nova.e_diretorio
+                and nova.caminho not in self._filhos
+                and _chave(nova.info) not in ancestrais
+            ):
+                self._carregar(nova.caminho, nova.info, ancestrais)
+
+    def _alterado(self, caminho: str, info: os.stat_result) -> bool:
+        """Indica se a listagem guardada do diretório pode estar desatualizada."""
+        listagem = self._listagens.get(caminho)
+        if listagem is None:
+            return True
+        mtime_ns, ctime_ns, listado_em_ns = listagem
+        return (
+            (info.st_mtime_ns, info.st_ctime_ns) != (mtime_ns, ctime_ns)
+            or info.st_mtime_ns >= listado_em_ns - JANELA_RACY_NS
+        )
+
+    def atualizar(self, caminho: str, relistar: bool = False) -> bool:
+        """
+        Refaz o `stat` de uma entrada da árvore (criada, alterada ou removida).
+        Diretórios novos são varridos; diretórios existentes só são listados
+        de novo com `relistar=True` e se o `mtime`/`ctime` mudou.
+        :return: bool, se a árvore foi alterada
+        """
+        caminho = os.path.abspath(caminho)
+        with self._trava:
+            if caminho == self.raiz:
+                return self._atualizar_raiz(relistar)
+            pai, nome = os.path.split(caminho)
+            filhos = self._filhos.get(pai)
+            if filhos is None:
+                return False
+            antiga = filhos.get(nome)
+            info = obter_info(caminho)
+            if info is None or not (stat.S_ISREG(info.st_mode) or stat.S_ISDIR(info.st_mode)):
+                if antiga is None:
+                    return False
+                del filhos[nome]
+                self._descartar(caminho)
+                self.versao += 1
+                return True
+
+            nova = EntradaVarredura(caminho, nome, info)
+            mesmo_diretorio = (
+                antiga is not None and antiga.e_diretorio and nova.e_diretorio
+                and _chave(antiga.info) == _chave(info)
+            )
+            alterada = antiga is None or not _mesmo_estado(antiga.info, info)
+            filhos[nome] = nova
+            if mesmo_diretorio:
+                if relistar and self.listado(caminho) and self._alterado(caminho, info):
+                    self._relistar(caminho, info)
+                    alterada = True
+            else:
+                if antiga is not None and antiga.e_diretorio:
+                    self._descartar(caminho)
+                if nova.e_diretorio:
+                    ancestrais = self._ancestrais(pai)
+                    if _chave(info) not in ancestrais:
+                        self._carregar(caminho, info, ancestrais)
+            if alterada:
+                self.versao += 1
+            return alterada
+
+    def _atualizar_raiz(self, relistar: bool) -> bool:
+        info = obter_info(self.raiz)
+        if info is None or not stat.S_ISDIR(info.st_mode):
+            if self.info_raiz is None:
+                return False
+            self._descartar(self.raiz)
+            self.info_raiz = None
+        elif self.info_raiz is None or _chave(info) != _chave(self.info_raiz):
+            self._descartar(self.raiz)
+            self.info_raiz = info
+            self._carregar(self.raiz, info, ())
+        elif relistar and self._alterado(self.raiz, info):
+            self.info_raiz = info
+            self._relistar(self.raiz, info)
+        elif not _mesmo_estado(self.info_raiz, info):
+            self.info_raiz = info
+        else:
+            return False
+        self.versao += 1
+        return True
+
+    def verificar(self, verificar_arquivos: bool = True) -> int:
+        """
+        Compara a árvore com o disco (modo de polling): refaz o `stat` dos
+        diretórios (e, com `verificar_arquivos`, dos arquivos) e lista de novo
+        só os diretórios alterados. Cada diretório é verificado com a trava
+        própria, sem bloquear as leituras durante a verificação inteira.
+        :return: int, número de entradas atualizadas
+        """
+        alteracoes = int(self.atualizar(self.raiz, relistar=True))
+        pilha = [self.raiz] if self.info_raiz is not None else []
+        while pilha:
+            caminho = pilha.pop()
+            with self._trava:
+                filhos = list(self._filhos.get(caminho, {}).values())
+            for entrada in filhos:
+                if entrada.e_diretorio or verificar_arquivos:
+                    alteracoes += self.atualizar(entrada.caminho, relistar=True)
+                if entrada.e_diretorio:
+                    pilha.append(entrada.caminho)
+        return alteracoes
+
+    def listado(self, caminho: str) -> bool:
+        """Indica se o diretório está na árvore (ou teve erro ao ser listado)."""
+        with self._trava:
+            return caminho in self._filhos or caminho in self._erros
+
+    def completo(self, caminho: str) -> bool:
+        """
+        Indica se a subárvore do diretório está inteira na árvore: nenhum
+        diretório abaixo dele (inclusive) ficou fora por `ao_abrir` ou por
+        erro ao ser listado. Fora dela, alterações não mudam a `versao`.
+        """
+        prefixo = os.path.join(caminho, "")
+        with self._trava:
+            return not any(
+                incompleto == caminho or incompleto.startswith(prefixo)
+                for incompleto in itertools.chain(self._recusados, self._erros)
+            )
+
+    def info(self, caminho: str) -> Optional[os.stat_result]:
+        """`stat` guardado da entrada (`None` se não estiver na árvore)."""
+        caminho = os.path.abspath(caminho)
+        with self._trava:
+            if caminho == self.raiz:
+                return self.info_raiz
+            pai, nome = os.path.split(caminho)
+            entrada = self._filhos.get(pai, {}).get(nome)
+            return entrada.info if entrada is not None else None
+
+    def filhos(self, caminho: str) -> Optional[List[EntradaVarredura]]:
+        """
+        Cópia da listagem guardada do diretório (`None` se não estiver na
+        árvore). Levanta o `OSError` da última tentativa de listá-lo.
+        """
+        with self._trava:
+            erro = self._erros.get(caminho)
+            if erro is not None:
+                raise OSError(erro.errno, erro.strerror, erro.filename)
+            filhos = self._filhos.get(caminho)
+            return None if filhos is None else list(filhos.values())
+
+    def totais(self) -> Dict[str, int]:
+        """Diretórios listados e entradas guardadas."""
+        with self._trava:
+            return {
+                "diretorios": len(self._filhos),
+                "entradas": sum(len(filhos) for filhos in self._filhos.values()),
+            }
+
+
+class VarreduraMemoria(Varredura):
+    """
+    `Varredura` que lê as listagens da `ArvoreMemoria` em vez do disco;
+    diretórios fora da árvore são listados no disco normalmente.
+
+    `entradas_do_disco` conta as entradas que precisaram de `stat`
+    (usado pelas métricas no lugar de `entradas`).
+    """
+
+    def __init__(
+        self,
+        arvore: ArvoreMemoria,
+        raiz: Union[str, "os.PathLike[str]"],
+        info_raiz: Optional[os.stat_result] = None,
+        max_profundidade: Optional[int] = None,
+        max_entradas: Optional[int] = None,
+        consulta: Optional["Consulta"] = None,
+    ) -> None:
+        super().__init__(raiz, info_raiz, max_profundidade, max_entradas, consulta=consulta)
+        self.arvore = arvore
+        self.entradas_do_disco = 0
+
+    def _listar(self, caminho: str) -> List[EntradaVarredura]:
+        filhos = self.arvore.filhos(caminho)
+        if filhos is None:
+            filhos = super()._listar(caminho)
+            self.entradas_do_disco += len(filhos)
+            return filhos
+        if self.consulta is None:
+            return filhos
+        return [entrada for entrada in filhos if self.consulta.aceita_entrada(entrada)]
+
+    def _tem_conteudo(self, caminho: str) -> bool:  # pylint: disable=W0221
+        try:
+            filhos = self.arvore.filhos(caminho)
+        except OSError:
+            return False
+        return Varredura._tem_conteudo(caminho) if filhos is None else bool(filhos)
+
+
+def _sobrepostas(raiz: str, outra: str) -> bool:
+    """Indica se uma das raízes (já resolvidas) está dentro da outra."""
+    return (
+        raiz.startswith(os.path.join(outra, ""))
+        or outra.startswith(os.path.join(raiz, ""))
+    )
+
+
+class ObservadorArvores:
+    """
+    Mantém uma `ArvoreMemoria` para cada raiz registrada.
+
+    - `backend`: `"inotify"`, `"polling"` ou `"auto"` (inotify quando
+      disponível; senão polling). Com `"inotify"` indisponível, levanta
+      `OSError`;
+    - `intervalo`: segundos entre verificações do polling (e tempo máximo de
+      espera por eventos da thread do inotify);
+    - `verificar_arquivos`: no polling, refaz também o `stat` dos arquivos
+      (sem isso, alterações só de conteúdo não são vistas).
+
+    `iniciar()` cria a thread que aplica as alterações; `parar()` a encerra.
+    As raízes não podem se sobrepor (uma dentro da outra).
+    """
+
+    def __init__(
+        self,
+        raizes: Iterable[Union[str, "os.PathLike[str]"]] = (),
+        backend: str = "auto",
+        intervalo: float = 2.0,
+        verificar_arquivos: bool = True,
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend '{backend}' desconhecido; use um de {BACKENDS}.")
+        self.intervalo = intervalo
+        self.verificar_arquivos = verificar_arquivos
+        self._inotify: Optional[Inotify] = None
+        if backend != "polling":
+            try:
+                self._inotify = Inotify()
+            except OSError:
+                if backend == "inotify":
+                    raise
+        self.backend = "inotify" if self._inotify is not None else "polling"
+        self.falhas_observacao = 0
+        self._arvores: Dict[str, ArvoreMemoria] = {}
+        self._descritores: Dict[int, Set[str]] = {}
+        self._observados: Dict[str, int] = {}
+        self._trava = threading.Lock()
+        self._trava_eventos = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        for raiz in raizes:
+            self.registrar(raiz)
+
+    def registrar(self, raiz: Union[str, "os.PathLike[str]"]) -> ArvoreMemoria:
+        """
+        Varre a raiz (com os links simbólicos resolvidos) e passa a observá-la.
+        Levanta `ValueError` se ela estiver dentro de outra raiz registrada ou
+        contiver uma: cada evento é aplicado a uma única árvore, e a outra
+        ficaria desatualizada.
+        """
+        raiz = os.path.realpath(raiz)
+        with self._trava_eventos:
+            if raiz in self._arvores:
+                return self._arvores[raiz]
+            for outra in self._arvores:
+                if _sobrepostas(raiz, outra):
+                    raise ValueError(f"A raiz {raiz} se sobrepõe à raiz observada {outra}.")
+            if self._inotify is not None:
+                arvore = ArvoreMemoria(raiz, self._observar, self._esquecer)
+            else:
+                arvore = ArvoreMemoria(raiz)
+            arvore.carregar()
+            with self._trava:
+                self._arvores[raiz] = arvore
+        return arvore
+
+    def remover(self, raiz: Union[str, "os.PathLike[str]"]) -> None:
+        """Deixa de observar a raiz e descarta a sua árvore."""
+        raiz = os.path.realpath(raiz)
+        with self._trava_eventos:
+            with self._trava:
+                arvore = self._arvores.pop(raiz, None)
+            if arvore is not None:
+                arvore.esvaziar()
+
+    @property
+    def raizes(self) -> List[str]:
+        """Raízes registradas."""
+        with self._trava:
+            return sorted(self._arvores)
+
+    @property
+    def versao(self) -> int:
+        """Soma das versões das árvores (muda a cada alteração aplicada)."""
+        with self._trava:
+            return sum(arvore.versao for arvore in self._arvores.values())
+
+    def _observar(self, caminho: str) -> bool:
+        """Adiciona a observação inotify do diretório (`False` se não for possível)."""
+        try:
+            descritor = self._inotify.adicionar(caminho)
+        except OSError:
+            self.falhas_observacao += 1
+            return False
+        self._descritores.setdefault(descritor, set()).add(caminho)
+        self._observados[caminho] = descritor
+        return True
+
+    def _esquecer(self, caminho: str) -> None:
+        """Remove a observação do diretório, se nenhum outro caminho a usar."""
+        descritor = self._observados.pop(caminho, None)
+        caminhos = self._descritores.get(descritor)
+        if caminhos is None:
+            return
+        caminhos.discard(caminho)
+        if not caminhos:
+            del self._descritores[descritor]
+            self._inotify.remover(descritor)
+
+    def arvore_de(self, caminho: Union[str, "os.PathLike[str]"]) -> Optional[ArvoreMemoria]:
+        """Árvore da raiz registrada que contém o caminho, se houver."""
+        atual = os.path.abspath(caminho)
+        with self._trava:
+            while True:
+                arvore = self._arvores.get(atual)
+                if arvore is not None:
+                    return arvore
+                pai = os.path.dirname(atual)
+                if pai == atual:
+                    return None
+                atual = pai
+
+    def varredura(
+        self,
+        caminho: Union[str, "os.PathLike[str]"],
+        info: Optional[os.stat_result] = None,
+        max_profundidade: Optional[int] = None,
+        max_entradas: Optional[int] = None,
+        consulta: Optional["Consulta"] = None,
+    ) -> Optional[VarreduraMemoria]:
+        """
+        Varredura do diretório a partir da árvore em memória, depois de
+        processar os eventos pendentes. Retorna `None` se o caminho não for
+        absoluto e normalizado (os caminhos da resposta seriam outros) ou
+        se não estiver em nenhuma árvore observada.
+        """
+        caminho = os.fspath(caminho)
+        if caminho != os.path.abspath(caminho):
+            return None
+        self.sincronizar()
+        arvore = self.arvore_de(caminho)
+        if arvore is None or not arvore.listado(caminho):
+            return None
+        return VarreduraMemoria(
+            arvore, caminho, info or arvore.info(caminho), max_profundidade, max_entradas, consulta
+        )
+
+    def sincronizar(self) -> int:
+        """Aplica os eventos inotify já recebidos, sem esperar por novos."""
+        if self._inotify is None:
+            return 0
+        with self._trava_eventos:
+            return self._aplicar(self._inotify.ler())
+
+    def _aplicar(self, eventos: List[Tuple[int, int, int, str]]) -> int:
+        """Aplica os eventos lidos, refazendo uma vez o `stat` de cada caminho citado."""
+        pendentes: Dict[str, None] = {}
+        for descritor, mascara, _cookie, nome in eventos:
+            if mascara & IN_Q_OVERFLOW:
+                return self._recarregar()
+            for diretorio in list(self._descritores.get(descritor, ())):
+                if nome:
+                    pendentes[os.path.join(diretorio, nome)] = None
+                if not nome or mascara & _ALTERAM_LISTAGEM:
+                    pendentes[diretorio] = None
+            if mascara & IN_IGNORED:
+                for diretorio in self._descritores.pop(descritor, ()):
+                    self._observados.pop(diretorio, None)
+        alteracoes = 0
+        for caminho in pendentes:
+            arvore = self.arvore_de(caminho)
+            if arvore is not None:
+                alteracoes += arvore.atualizar(caminho)
+        return alteracoes
+
+    def _recarregar(self) -> int:
+        """Varre de novo todas as raízes (depois de eventos perdidos)."""
+        with self._trava:
+            arvores = list(self._arvores.values())
+        for arvore in arvores:
+            try:
+                arvore.carregar()
+            except OSError:
+                arvore.atualizar(arvore.raiz)
+        return len(arvores)
+
+    def verificar(self) -> int:
+        """Uma rodada de polling em todas as árvores."""
+        with self._trava:
+            arvores = list(self._arvores.values())
+        return sum(arvore.verificar(self.verificar_arquivos) for arvore in arvores)
+
+    def _executar(self) -> None:
+        while not self._parar.is_set():
+            if self._inotify is None:
+                if self._parar.wait(self.intervalo):
+                    return
+                self.verificar()
+            elif self._inotify.esperar(self.intervalo):
+                self.sincronizar()
+
+    def iniciar(self) -> None:
+        """Inicia a thread que mantém as árvores atualizadas."""
+        if self._thread is None:
+            self._parar.clear()
+            self._thread = threading.Thread(
+                target=self._executar, name="analysis-watcher", daemon=True
+            )
+            self._thread.start()
+
+    def parar(self) -> None:
+        """Encerra a thread e fecha o inotify."""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.fechar()
+            self._inotify = None
+
+    def estado(self) -> Dict:
+        """Backend, versão e totais de cada raiz observada."""
+        with self._trava:
+            arvores = list(self._arvores.values())
+        return {
+            "backend": self.backend,
+            "intervalo": self.intervalo,
+            "falhas_observacao": self.falhas_observacao,
+            "raizes": [
+                {"raiz": arvore.raiz, "versao": arvore.versao, **arvore.totais()}
+                for arvore in arvores
+            ],
+        }
@@ -0,0 +1,192 @@
+# app/models/paginacao.py
+
+"""
+Enumeração paginada de árvores, retomável a partir de um cursor.
+
+A `VarreduraOrdenada` percorre a árvore em pré-ordem com os irmãos em ordem
+de nome. Nessa ordem, cada entrada vem depois de todas as entradas cuja
+tupla de componentes (`("a", "b", "c.txt")`) é menor. Por isso, o cursor só
+precisa guardar os componentes da última entrada enviada. A página seguinte
+desce direto por esses componentes, listando só os diretórios do caminho, e
+continua dos nomes maiores em diante, sem percorrer o que já foi enviado.
+
+Entradas criadas ou removidas entre uma página e outra não fazem o cursor
+repetir nem pular as demais. Cada diretório é lido com `scandir` e ordenado
+pelo nome, e o `stat` só é feito nas entradas que chegam a ser emitidas.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import stat
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .varredura import Chave, EntradaVarredura, NoVarredura
+
+if TYPE_CHECKING:
+    from .consulta import Consulta
+
+Componentes = Tuple[str, ...]
+
+
+def _chave(info: os.stat_result) -> Chave:
+    return (info.st_dev, info.st_ino)
+
+
+class VarreduraOrdenada:
+    """
+    Varredura em pré-ordem com os irmãos ordenados pelo nome, iniciada logo
+    depois da entrada `apos` (componentes relativos à raiz; vazio = logo
+    depois da própria raiz). Produz pares (componentes, `NoVarredura`).
+
+    `max_profundidade` e `consulta` têm o mesmo efeito da `Varredura`, e os
+    ciclos são detectados pelo par (`st_dev`, `st_ino`). Diretórios que
+    aparecem no caminho de `apos` e já não existem são tratados como vazios.
+    """
+
+    def __init__(
+        self,
+        raiz: Union[str, "os.PathLike[str]"],
+        info_raiz: Optional[os.stat_result] = None,
+        apos: Sequence[str] = (),
+        max_profundidade: Optional[int] = None,
+        consulta: Optional["Consulta"] = None,
+    ) -> None:
+        self.raiz = os.fspath(raiz)
+        self.info_raiz = info_raiz
+        self.apos: Componentes = tuple(apos)
+        self.max_profundidade = max_profundidade
+        self.consulta = consulta
+        self.diretorios_listados = 0
+
+    def _listar(self, caminho: str) -> List["os.DirEntry[str]"]:
+        """Entradas do diretório ordenadas pelo nome, sem `stat`."""
+        self.diretorios_listados += 1
+        consulta = self.consulta
+        with os.scandir(caminho) as entradas:
+            if consulta is None:
+                lista = list(entradas)
+            else:
+                lista = [entrada for entrada in entradas if consulta.aceita_antes_do_stat(entrada)]
+        lista.sort(key=lambda entrada: entrada.name)
+        return lista
+
+    def _abre(self, profundidade: int) -> bool:
+        return self.max_profundidade is None or profundidade < self.max_profundidade
+
+    def _retomar(
+        self, info_raiz: os.stat_result
+    ) -> List[Tuple[Componentes, Iterator["os.DirEntry[str]"], Chave]]:
+        """
+        Monta a pilha da varredura descendo pelos componentes de `apos`: em
+        cada diretório do caminho restam só os nomes maiores que o componente.
+        A listagem da raiz propaga `OSError`; as demais falhas encerram a descida.
+        """
+        pilha = []
+        caminho, componentes, info = self.raiz, (), info_raiz
+        for indice in range(len(self.apos) + 1):
+            chave = _chave(info)
+            if not self._abre(indice) or any(chave == ativa for _, _, ativa in pilha):
+                break
+            try:
+                conteudo = self._listar(caminho)
+            except OSError:
+                if indice == 0:
+                    raise
+                break
+            if indice == len(self.apos):
+                pilha.append((componentes, iter(conteudo), chave))
+                break
+            nome = self.apos[indice]
+            pilha.append((componentes, iter([e for e in conteudo if e.name > nome]), chave))
+            seguinte = next((e for e in conteudo if e.name == nome), None)
+            try:
+                info = seguinte.stat() if seguinte is not None else None
+            except OSError:
+                info = None
+            if info is None or not stat.S_ISDIR(info.st_mode):
+                break
+            caminho, componentes = seguinte.path, componentes + (nome,)
+        return pilha
+
+    def __iter__(self) -> Iterator[Tuple[Componentes, NoVarredura]]:
+        info_raiz = self.info_raiz or os.stat(self.raiz)
+        pilha = self._retomar(info_raiz)
+        ativos = {chave for _, _, chave in pilha}
+        while pilha:
+            componentes_pai, filhos, chave_pai = pilha[-1]
+            entrada = next(filhos, None)
+            if entrada is None:
+                pilha.pop()
+                ativos.discard(chave_pai)
+                continue
+            try:
+                info = entrada.stat()
+            except OSError:
+                continue
+            item = EntradaVarredura(entrada.path, entrada.name, info)
+            if not (item.e_arquivo or item.e_diretorio):
+                continue
+            if self.consulta is not None and not self.consulta.aceita(item):
+                continue
+            componentes = componentes_pai + (entrada.name,)
+            profundidade = len(componentes)
+            if not item.e_diretorio:
+                yield componentes, NoVarredura(item, profundidade)
+                continue
+            chave = _chave(info)
+            if chave in ativos:
+                yield componentes, NoVarredura(item, profundidade, ciclo=True)
+                continue
+            if not self._abre(profundidade):
+                yield componentes, NoVarredura(item, profundidade)
+                continue
+            try:
+                conteudo = self._listar(item.caminho)
+            except OSError as erro:
+                yield componentes, NoVarredura(item, profundidade, erro=erro.strerror or str(erro))
+                continue
+            yield componentes, NoVarredura(item, profundidade)
+            ativos.add(chave)
+            pilha.append((componentes, iter(conteudo), chave))
+
+
+def assinatura_paginas(*partes: object) -> str:
+    """Identifica a entrada e as opções de uma sequência de páginas."""
+    dados = json.dumps(partes, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(dados, digest_size=8).hexdigest()
+
+
+def codificar_cursor(
+    assinatura: str, posicao: int, componentes: Optional[Componentes]
+) -> str:
+    """
+    Cursor opaco (base64 URL-safe) da última entrada enviada: a posição do
+    caminho de entrada e os componentes da entrada (`None` = caminho concluído).
+    """
+    dados = json.dumps([assinatura, posicao, componentes])
+    return base64.urlsafe_b64encode(dados.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(
+    cursor: str, assinatura: str
+) -> Tuple[int, Optional[Componentes]]:
+    """
+    Posição e componentes guardados no cursor. Levanta `ValueError` se o
+    cursor for inválido ou de outra entrada/opções.
+    """
+    try:
+        dados = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        dono, posicao, componentes = json.loads(dados.decode("utf-8"))
+        if componentes is not None:
+            componentes = tuple(componentes)
+            if not all(isinstance(nome, str) for nome in componentes):
+                raise ValueError
+        if not isinstance(posicao, int) or posicao < 0:
+            raise ValueError
+    except (ValueError, TypeError, UnicodeDecodeError) as erro:
+        raise ValueError("Cursor inválido.") from erro
+    if dono != assinatura:
+        raise ValueError("Cursor de outra consulta.")
+    return posicao, componentes
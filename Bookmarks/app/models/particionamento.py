@@ -0,0 +1,148 @@
+# app/models/particionamento.py
+
+"""
+Distribui a varredura de várias raízes entre processos.
+
+Cada raiz vira uma tarefa para um `ProcessPoolExecutor`. Quando a subárvore
+de uma tarefa passa de `limiar_divisao` entradas, os diretórios ainda não
+abertos são devolvidos como novas tarefas (fragmentos), que são enxertadas
+na árvore da raiz quando terminam. Os processos devolvem o JSON compacto de
+cada fragmento, em vez de grafos de objetos serializados com `pickle`.
+"""
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from .path_model import montar_arvore_json
+from .varredura import Chave, EntradaVarredura, Varredura
+
+if TYPE_CHECKING:
+    from .consulta import Consulta
+
+Rota = List[int]
+
+
+def varrer_fragmento(
+    caminho: str,
+    max_profundidade: Optional[int],
+    max_entradas: Optional[int],
+    limiar_divisao: int,
+    ancestrais: Sequence[Chave] = (),
+    consulta: Optional["Consulta"] = None,
+) -> str:
+    """
+    Varre uma subárvore no processo de trabalho e devolve um JSON compacto com
+    a árvore (`arvore`) e os diretórios adiados (`adiados`), cada um com sua
+    rota a partir da raiz do fragmento e as chaves dos seus ancestrais.
+    """
+    ancestrais_adiados: List[List[Chave]] = []
+
+    def descer(_entrada: EntradaVarredura, _profundidade: int) -> bool:
+        if varredura.entradas <= limiar_divisao:
+            return True
+        ancestrais_adiados.append(varredura.ancestrais())
+        return False
+
+    raiz = Path(caminho)
+    try:
+        info = os.stat(raiz)
+        varredura = Varredura(
+            raiz, info, max_profundidade, max_entradas, descer, ancestrais, consulta
+        )
+        rotas: List[Rota] = []
+        arvore = montar_arvore_json(raiz, info, varredura, rotas)
+    except OSError as erro:
+        arvore = {"caminho": caminho, "erro": erro.strerror or str(erro)}
+        rotas = []
+    return json.dumps(
+        {"arvore": arvore, "adiados": list(zip(rotas, ancestrais_adiados))},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def _localizar(arvore: Dict, rota: Rota) -> Dict:
+    """Retorna o diretório alcançado seguindo a rota de índices em `sub_pastas`."""
+    no = arvore
+    for indice in rota:
+        no = no["sub_pastas"][indice]
+    return no
+
+
+def _enxertar(arvore: Dict, rota: Rota, fragmento: Dict) -> None:
+    """
+    Substitui o conteúdo do diretório adiado pelo fragmento varrido e soma os
+    totais do fragmento aos de cada ancestral (o adiado tinha totais zerados).
+    """
+    tamanho = fragmento.get("tamanho_total", 0)
+    arquivos = fragmento.get("total_arquivos", 0)
+    no = arvore
+    for indice in rota:
+        no["tamanho_total"] += tamanho
+        no["total_arquivos"] += arquivos
+        no = no["sub_pastas"][indice]
+    for chave in ("tamanho_total", "total_arquivos", "sub_arquivos", "sub_pastas", "erro"):
+        if chave in fragmento:
+            no[chave] = fragmento[chave]
+    if fragmento.get("truncado") and not arvore.get("truncado"):
+        arvore.update({"truncado": True, "motivo_truncamento": fragmento["motivo_truncamento"]})
+
+
+def varrer_em_processos(
+    raizes: Sequence[Path],
+    processos: int,
+    limiar_divisao: int,
+    max_profundidade: Optional[int] = None,
+    max_entradas: Optional[int] = None,
+    consulta: Optional["Consulta"] = None,
+) -> List[Dict]:
+    """
+    Varre as raízes em paralelo e devolve o JSON de cada uma, na ordem de entrada.
+
+    `max_profundidade` continua relativo a cada raiz; `max_entradas` é
+    aplicado a cada fragmento (e não à raiz inteira, por isso o
+    `AnalisadorCaminhos` não usa processos quando há esse limite). A
+    `consulta` é enviada a todos os fragmentos.
+    """
+    resultados: List[Dict] = [{} for _ in raizes]
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        pendentes: Dict[Future, Tuple[int, Rota]] = {}
+
+        def enviar(indice: int, rota: Rota, caminho: str, ancestrais: Sequence[Chave]) -> None:
+            restante = None if max_profundidade is None else max_profundidade - len(rota)
+            futuro = executor.submit(
+                varrer_fragmento,
+                caminho,
+                restante,
+                max_entradas,
+                limiar_divisao,
+                ancestrais,
+                consulta,
+            )
+            pendentes[futuro] = (indice, rota)
+
+        for indice, raiz in enumerate(raizes):
+            enviar(indice, [], str(raiz), ())
+
+        while pendentes:
+            concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                indice, rota = pendentes.pop(futuro)
+                fragmento = json.loads(futuro.result())
+                arvore = fragmento["arvore"]
+                if rota:
+                    _enxertar(resultados[indice], rota, arvore)
+                else:
+                    resultados[indice] = arvore
+                for sub_rota, ancestrais in fragmento["adiados"]:
+                    adiado = _localizar(arvore, sub_rota)
+                    enviar(
+                        indice,
+                        rota + sub_rota,
+                        adiado["caminho"],
+                        [tuple(chave) for chave in ancestrais],
+                    )
+    return resultados
@@ -7,22 +7,224 @@ Módulo para gerenciar caminhos de arquivos e diretórios.
 """
 
 
-import json
+import hashlib
+import os
+import stat
+import sys
 from pathlib import Path
-from typing import Dict, List
-from json_do_frontend import json_frontend
+from typing import TYPE_CHECKING, Awaitable, Dict, Iterator, List, Optional, Tuple, Union
+from .indice import IndiceMetadados, VarreduraIncremental
+from app.services.metrics import timed
+from app.services.serializer import get_serializer
+
+from .observador import VarreduraMemoria
+from .paginacao import (
+    Componentes,
+    VarreduraOrdenada,
+    assinatura_paginas,
+    codificar_cursor,
+    decodificar_cursor,
+)
+from .resolucao import CaminhoResolvido, ResolvedorCaminhos
+from .varredura import NoVarredura, Varredura, obter_info
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from app.services.cache import ResultCache
+
+    from .consulta import Consulta
+    from .observador import ObservadorArvores
+
+
+def _extensao(nome: str) -> str:
+    """Extensão do nome, com a mesma regra de `Path.suffix`."""
+    indice = nome.rfind(".")
+    if 0 < indice < len(nome) - 1:
+        return nome[indice:]
+    return ""
+
+
+def _json_item(caminho: str, nome: str, info: os.stat_result) -> Dict:
+    """Informações básicas de um item, no formato de `ItemSistema.para_json`."""
+    return {
+        "caminho": caminho,
+        "nome": nome,
+        "data_criacao": info.st_ctime,
+        "data_modificacao": info.st_mtime,
+    }
+
+
+def _json_no(no: NoVarredura, com_conteudo: bool = True) -> Dict:
+    """
+    Converte um nó da varredura no formato de `Arquivo`/`Diretorio.para_json`.
+    Com `com_conteudo=False` os diretórios não recebem os totais nem as
+    listas de filhos.
+    """
+    entrada = no.entrada
+    dados = _json_item(entrada.caminho, entrada.nome, entrada.info)
+    if entrada.e_arquivo:
+        dados.update({"extensao": _extensao(entrada.nome), "tamanho": entrada.info.st_size})
+        return dados
+    if com_conteudo:
+        dados.update(_conteudo_vazio())
+    if no.ciclo:
+        dados["ciclo"] = True
+    if no.erro is not None:
+        dados["erro"] = no.erro
+    return dados
+
+
+def _conteudo_vazio() -> Dict:
+    """Totais e listas de filhos de um diretório ainda sem conteúdo."""
+    return {"tamanho_total": 0, "total_arquivos": 0, "sub_arquivos": [], "sub_pastas": []}
+
+
+def _fechar_diretorios(pilha: List[Dict], profundidade: int) -> None:
+    """
+    Desempilha os diretórios abaixo de `profundidade`, somando os totais de
+    cada um aos do seu pai (os filhos são sempre fechados antes do pai).
+    """
+    while len(pilha) > profundidade:
+        filho = pilha.pop()
+        pilha[-1]["tamanho_total"] += filho["tamanho_total"]
+        pilha[-1]["total_arquivos"] += filho["total_arquivos"]
+
+
+def formatar_tamanho(tamanho: float) -> str:
+    """Formata um tamanho em bytes para uma string legível."""
+    for unidade in ["bytes", "KB", "MB", "GB"]:
+        if tamanho < 1024:
+            return f"{tamanho:.2f} {unidade}"
+        tamanho /= 1024
+    return f"{tamanho:.2f} TB"
+
+
+def adicionar_tamanhos_formatados(dados: Dict) -> Dict:
+    """
+    Acrescenta, só na saída, `tamanho_formatado` aos arquivos e
+    `tamanho_total_formatado` aos diretórios de uma árvore (ou de um nó
+    avulso de `iterar_arvore_json`). Os tamanhos numéricos são mantidos.
+    """
+    pilha = [dados]
+    while pilha:
+        no = pilha.pop()
+        if "tamanho" in no:
+            no["tamanho_formatado"] = formatar_tamanho(no["tamanho"])
+        if "tamanho_total" in no:
+            no["tamanho_total_formatado"] = formatar_tamanho(no["tamanho_total"])
+        pilha.extend(no.get("sub_arquivos", ()))
+        pilha.extend(no.get("sub_pastas", ()))
+    return dados
+
+
+def _contar_varredura(
+    varredura: Union[Varredura, VarreduraIncremental], tamanho_total: int
+) -> Dict[str, int]:
+    """
+    Contadores das métricas: um `scandir` por diretório listado e um `stat`
+    por entrada (só as lidas do disco, numa `VarreduraMemoria`).
+    """
+    stats = getattr(varredura, "entradas_do_disco", varredura.entradas)
+    return {
+        "syscalls": varredura.diretorios_listados + stats,
+        "entries": varredura.entradas,
+        "bytes": tamanho_total,
+    }
+
+
+@timed(
+    "scan",
+    count=lambda arvore, _caminho, _info, varredura, *_: _contar_varredura(
+        varredura, arvore["tamanho_total"]
+    ),
+)
+def montar_arvore_json(
+    caminho: Path,
+    info: os.stat_result,
+    varredura: Union[Varredura, VarreduraIncremental],
+    adiados: Optional[List[List[int]]] = None,
+) -> Dict:
+    """
+    Monta o JSON de um diretório diretamente a partir da varredura,
+    sem criar objetos `Arquivo`/`Diretorio` intermediários.
+
+    Cada diretório recebe `tamanho_total` (bytes) e `total_arquivos` de toda
+    a sua subárvore, somados durante a própria varredura; em resultados
+    truncados, os totais cobrem apenas o que foi varrido.
+
+    Se `adiados` for informado, recebe a rota (índices em `sub_pastas` a
+    partir da raiz) de cada diretório que a varredura deixou de abrir.
+    """
+    raiz = _json_item(str(caminho), caminho.name, info)
+    raiz.update(_conteudo_vazio())
+    pilha = [raiz]
+    rotas: List[List[int]] = [[]]
+    for no in varredura:
+        _fechar_diretorios(pilha, no.profundidade)
+        dados = _json_no(no)
+        if no.entrada.e_arquivo:
+            pai = pilha[-1]
+            pai["sub_arquivos"].append(dados)
+            pai["tamanho_total"] += dados["tamanho"]
+            pai["total_arquivos"] += 1
+            continue
+        sub_pastas = pilha[-1]["sub_pastas"]
+        sub_pastas.append(dados)
+        pilha.append(dados)
+        if adiados is not None:
+            del rotas[no.profundidade:]
+            rota = rotas[-1] + [len(sub_pastas) - 1]
+            if no.adiado:
+                adiados.append(rota)
+            else:
+                rotas.append(rota)
+    _fechar_diretorios(pilha, 1)
+    if varredura.truncado:
+        raiz.update({"truncado": True, "motivo_truncamento": varredura.motivo_truncamento})
+    return raiz
+
+
+def iterar_arvore_json(caminho: Path, info: os.stat_result, varredura: Varredura) -> Iterator[Dict]:
+    """
+    Versão em fluxo de `montar_arvore_json`: cada nó é emitido, sem os filhos,
+    assim que é lido, com `tipo` e `profundidade` para reconstruir a árvore.
+    Os totais dos diretórios não são emitidos, pois só seriam conhecidos
+    depois dos filhos. Se a varredura for truncada, o último item traz o
+    marcador `truncado`.
+    """
+    raiz = _json_item(str(caminho), caminho.name, info)
+    raiz.update({"tipo": "diretorio", "profundidade": 0})
+    yield raiz
+    for no in varredura:
+        dados = _json_no(no, com_conteudo=False)
+        dados.update({
+            "tipo": "arquivo" if no.entrada.e_arquivo else "diretorio",
+            "profundidade": no.profundidade,
+        })
+        yield dados
+    if varredura.truncado:
+        yield {
+            "caminho": str(caminho),
+            "truncado": True,
+            "motivo_truncamento": varredura.motivo_truncamento,
+        }
 
 
 class ItemSistema:
     """Representa um item genérico no sistema de arquivos."""
 
-    def __init__(self, caminho: Path) -> None:
-        if not caminho.exists():
+    __slots__ = ("caminho", "nome", "data_criacao", "data_modificacao")
+
+    def __init__(self, caminho: Path, info: Optional[os.stat_result] = None) -> None:
+        if info is None:
+            info = obter_info(caminho)
+        if info is None:
             raise ValueError(f"O caminho {caminho} não existe.")
         self.caminho = caminho
-        self.nome = caminho.name
-        self.data_criacao = caminho.stat().st_ctime
-        self.data_modificacao = caminho.stat().st_mtime
+        self.nome = sys.intern(caminho.name)
+        self.data_criacao = info.st_ctime
+        self.data_modificacao = info.st_mtime
 
     def para_json(self) -> Dict:
         """Retorna as informações básicas do item como um dicionário."""
@@ -37,116 +239,767 @@ class ItemSistema:
 class Arquivo(ItemSistema):
     """Representa um arquivo no sistema de arquivos."""
 
-    def __init__(self, caminho: Path) -> None:
-        if not caminho.is_file():
+    __slots__ = ("extensao", "tamanho")
+
+    def __init__(self, caminho: Path, info: Optional[os.stat_result] = None) -> None:
+        if info is None:
+            info = obter_info(caminho)
+        if info is None or not stat.S_ISREG(info.st_mode):
             raise ValueError(f"O caminho {caminho} não é um arquivo válido.")
-        super().__init__(caminho)
-        self.extensao = caminho.suffix
-        self.tamanho_formatado = self._formatar_tamanho_arquivo(caminho.stat().st_size)
+        super().__init__(caminho, info)
+        self.extensao = sys.intern(caminho.suffix)
+        self.tamanho = info.st_size
+
+    @classmethod
+    def _de_info(cls, caminho: Path, info: os.stat_result) -> "Arquivo":
+        """Cria o arquivo a partir de um `stat` já validado pela varredura."""
+        arquivo = cls.__new__(cls)
+        ItemSistema.__init__(arquivo, caminho, info)
+        arquivo.extensao = sys.intern(caminho.suffix)
+        arquivo.tamanho = info.st_size
+        return arquivo
 
     @staticmethod
     def _formatar_tamanho_arquivo(tamanho_arquivo: int) -> str:
         """Formata o tamanho do arquivo para uma string legível."""
-        for unidade in ["bytes", "KB", "MB", "GB"]:
-            if tamanho_arquivo < 1024:
-                return f"{tamanho_arquivo:.2f} {unidade}"
-            tamanho_arquivo /= 1024
-        return f"{tamanho_arquivo:.2f} TB"
+        return formatar_tamanho(tamanho_arquivo)
+
+    @property
+    def tamanho_formatado(self) -> str:
+        """Tamanho legível, calculado apenas quando pedido."""
+        return formatar_tamanho(self.tamanho)
 
     def para_json(self) -> Dict:
-        """Adiciona informações específicas de arquivo ao JSON."""
+        """Adiciona informações específicas de arquivo ao JSON (tamanho em bytes)."""
         dados = super().para_json()
         dados.update({
             "extensao": self.extensao,
-            "tamanho": self.tamanho_formatado,
+            "tamanho": self.tamanho,
         })
         return dados
 
 
 class Diretorio(ItemSistema):
-    """Representa um diretório no sistema de arquivos."""
+    """
+    Representa um diretório no sistema de arquivos.
+
+    A subárvore é construída iterativamente pela `Varredura`, podendo ser
+    limitada por `max_profundidade` e `max_entradas`; nesse caso `truncado`
+    e `motivo_truncamento` indicam que o conteúdo está incompleto. Com uma
+    `consulta` (ver `app.models.consulta`), só as entradas aceitas fazem
+    parte da árvore e dos totais. Subdiretórios que apontam para um ancestral
+    (`ciclo`) ou que não puderam ser listados (`erro`) ficam sem conteúdo,
+    marcados como em `processar_caminhos`.
+
+    Para árvores muito grandes, `ArvoreColunar` (em `app.models.colunar`)
+    guarda as mesmas informações com bem menos memória por entrada.
+    """
 
-    def __init__(self, caminho: Path) -> None:
-        if not caminho.is_dir():
+    __slots__ = (
+        "_info",
+        "arquivos",
+        "subdiretorios",
+        "max_profundidade",
+        "max_entradas",
+        "consulta",
+        "truncado",
+        "motivo_truncamento",
+        "tamanho_total",
+        "total_arquivos",
+        "ciclo",
+        "erro",
+    )
+
+    def __init__(
+        self,
+        caminho: Path,
+        info: Optional[os.stat_result] = None,
+        max_profundidade: Optional[int] = None,
+        max_entradas: Optional[int] = None,
+        consulta: Optional["Consulta"] = None,
+    ) -> None:
+        if info is None:
+            info = obter_info(caminho)
+        if info is None or not stat.S_ISDIR(info.st_mode):
             raise ValueError(f"O caminho {caminho} não é um diretório válido.")
-        super().__init__(caminho)
+        super().__init__(caminho, info)
+        self._info = info
         self.arquivos: List[Arquivo] = []
         self.subdiretorios: List["Diretorio"] = []
+        self.max_profundidade = max_profundidade
+        self.max_entradas = max_entradas
+        self.consulta = consulta
+        self.truncado = False
+        self.motivo_truncamento: Optional[str] = None
+        self.tamanho_total = 0
+        self.total_arquivos = 0
+        self.ciclo = False
+        self.erro: Optional[str] = None
         self._atualizar_conteudo()
 
-    def _atualizar_conteudo(self) -> None:
-        """Atualiza o conteúdo do diretório."""
+    @classmethod
+    def _de_info(
+        cls,
+        caminho: Path,
+        info: os.stat_result,
+        ciclo: bool = False,
+        erro: Optional[str] = None,
+    ) -> "Diretorio":
+        """Cria um diretório vazio, cujo conteúdo é preenchido pela varredura do ancestral."""
+        diretorio = cls.__new__(cls)
+        ItemSistema.__init__(diretorio, caminho, info)
+        diretorio._info = info
+        diretorio.arquivos = []
+        diretorio.subdiretorios = []
+        diretorio.max_profundidade = None
+        diretorio.max_entradas = None
+        diretorio.consulta = None
+        diretorio.truncado = False
+        diretorio.motivo_truncamento = None
+        diretorio.tamanho_total = 0
+        diretorio.total_arquivos = 0
+        diretorio.ciclo = ciclo
+        diretorio.erro = erro
+        return diretorio
+
+    @timed(
+        "scan",
+        count=lambda varredura, diretorio: _contar_varredura(varredura, diretorio.tamanho_total),
+    )
+    def _atualizar_conteudo(self) -> Varredura:
+        """
+        Atualiza o conteúdo do diretório (um único `stat` por entrada, sem
+        recursão), somando `tamanho_total` e `total_arquivos` na mesma passada.
+        Retorna a varredura usada, com os contadores do trabalho feito.
+        """
         self.arquivos.clear()
         self.subdiretorios.clear()
-        for item in self.caminho.iterdir():
-            if item.is_file():
-                self.arquivos.append(Arquivo(item))
-            elif item.is_dir():
-                self.subdiretorios.append(Diretorio(item))
+        self.tamanho_total = 0
+        self.total_arquivos = 0
+        varredura = Varredura(
+            self.caminho,
+            self._info,
+            self.max_profundidade,
+            self.max_entradas,
+            consulta=self.consulta,
+        )
+        pilha: List[Diretorio] = [self]
+
+        def fechar(profundidade: int) -> None:
+            while len(pilha) > profundidade:
+                filho = pilha.pop()
+                pilha[-1].tamanho_total += filho.tamanho_total
+                pilha[-1].total_arquivos += filho.total_arquivos
 
+        for no in varredura:
+            fechar(no.profundidade)
+            caminho = Path(no.entrada.caminho)
+            if no.entrada.e_arquivo:
+                pilha[-1].arquivos.append(Arquivo._de_info(caminho, no.entrada.info))
+                pilha[-1].tamanho_total += no.entrada.info.st_size
+                pilha[-1].total_arquivos += 1
+            else:
+                subdiretorio = Diretorio._de_info(caminho, no.entrada.info, no.ciclo, no.erro)
+                pilha[-1].subdiretorios.append(subdiretorio)
+                pilha.append(subdiretorio)
+        fechar(1)
+        self.truncado = varredura.truncado
+        self.motivo_truncamento = varredura.motivo_truncamento
+        return varredura
+
+    def _marcar_json(self, dados: Dict) -> None:
+        """Acrescenta `ciclo`/`erro` ao JSON do diretório, como `_json_no`."""
+        if self.ciclo:
+            dados["ciclo"] = True
+        if self.erro is not None:
+            dados["erro"] = self.erro
+
+    @timed("to_json")
     def para_json(self) -> Dict:
-        """Adiciona informações específicas de diretório ao JSON."""
-        dados = super().para_json()
-        dados.update({
-            "sub_arquivos": [arquivo.para_json() for arquivo in self.arquivos],
-            "sub_pastas": [subdiretorio.para_json() for subdiretorio in self.subdiretorios],
-        })
-        return dados
+        """Adiciona informações específicas de diretório ao JSON (sem recursão)."""
+        raiz = ItemSistema.para_json(self)
+        pilha = [(self, raiz)]
+        while pilha:
+            diretorio, dados = pilha.pop()
+            sub_pastas = []
+            for subdiretorio in diretorio.subdiretorios:
+                dados_sub = ItemSistema.para_json(subdiretorio)
+                sub_pastas.append(dados_sub)
+                pilha.append((subdiretorio, dados_sub))
+            dados.update({
+                "tamanho_total": diretorio.tamanho_total,
+                "total_arquivos": diretorio.total_arquivos,
+                "sub_arquivos": [arquivo.para_json() for arquivo in diretorio.arquivos],
+                "sub_pastas": sub_pastas,
+            })
+            diretorio._marcar_json(dados)
+        if self.truncado:
+            raiz.update({"truncado": True, "motivo_truncamento": self.motivo_truncamento})
+        return raiz
+
+    def iterar_json(self) -> Iterator[Dict]:
+        """
+        Versão em fluxo de `para_json`: emite os nós em pré-ordem, sem os filhos,
+        no mesmo formato de `iterar_arvore_json`. Como a árvore já foi varrida,
+        os diretórios também trazem `tamanho_total` e `total_arquivos`.
+        """
+        pilha = [(self, 0)]
+        while pilha:
+            diretorio, profundidade = pilha.pop()
+            dados = ItemSistema.para_json(diretorio)
+            dados.update({
+                "tamanho_total": diretorio.tamanho_total,
+                "total_arquivos": diretorio.total_arquivos,
+                "tipo": "diretorio",
+                "profundidade": profundidade,
+            })
+            diretorio._marcar_json(dados)
+            yield dados
+            for arquivo in diretorio.arquivos:
+                dados = arquivo.para_json()
+                dados.update({"tipo": "arquivo", "profundidade": profundidade + 1})
+                yield dados
+            pilha.extend(
+                (subdiretorio, profundidade + 1)
+                for subdiretorio in reversed(diretorio.subdiretorios)
+            )
+        if self.truncado:
+            yield {
+                "caminho": str(self.caminho),
+                "truncado": True,
+                "motivo_truncamento": self.motivo_truncamento,
+            }
 
 
 class AnalisadorCaminhos:
-    """Classe para analisar caminhos de arquivos e diretórios."""
+    """
+    Classe para analisar caminhos de arquivos e diretórios.
+
+    Com `processos` maior que 1, os diretórios de uma mesma chamada são
+    varridos em paralelo por processos de trabalho, e subárvores com mais de
+    `limiar_divisao` entradas são divididas em fragmentos menores. Com
+    `max_entradas` a varredura continua serial: o limite vale para a árvore
+    inteira, na ordem da varredura, e não pode ser repartido entre fragmentos.
+
+    Com um `indice`, diretórios sem limites de varredura são percorridos de
+    forma incremental (ver `app.models.indice`), no próprio processo.
+
+    Com um `cache` (`app.services.cache.ResultCache`), chamadas repetidas com
+    os mesmos caminhos e opções reaproveitam o resultado anterior.
 
-    def __init__(self, max_tentativas: int = 10) -> None:
+    Com um `observador` (`ObservadorArvores`), diretórios dentro das raízes
+    observadas são percorridos na árvore mantida em memória, sem acessar o
+    disco, com quaisquer limites e consultas.
+    """
+
+    def __init__(
+        self,
+        max_tentativas: int = 10,
+        processos: int = 0,
+        limiar_divisao: int = 10000,
+        indice: Optional[IndiceMetadados] = None,
+        cache: Optional["ResultCache"] = None,
+        observador: Optional["ObservadorArvores"] = None,
+    ) -> None:
         self.max_tentativas = max_tentativas
+        self.processos = processos
+        self.limiar_divisao = limiar_divisao
+        self.indice = indice
+        self.cache = cache
+        self.observador = observador
 
     def _validar_json(self, json_caminhos: Dict) -> bool:
         """Valida a estrutura do JSON de entrada."""
         return "jsonEntrada" in json_caminhos and isinstance(json_caminhos["jsonEntrada"], list)
 
+    def resolver_caminhos(self, lista_caminhos: List[str]) -> List[CaminhoResolvido]:
+        """
+        Resolve os caminhos de entrada em lote, informando o candidato
+        escolhido para cada um (ver `ResolvedorCaminhos`). Caminhos que
+        começam com `../` e não existem são procurados com até
+        `max_tentativas` prefixos `../` a mais.
+        """
+        return ResolvedorCaminhos(self.max_tentativas).resolver_lote(lista_caminhos)
+
     def _ajustar_caminhos(self, lista_caminhos: List[str]) -> List[Path]:
         """Ajusta caminhos relativos e valida a existência."""
-        caminhos_ajustados = []
-        for caminho_str in lista_caminhos:
-            caminho = Path(caminho_str).resolve()
-            if caminho.exists():
-                caminhos_ajustados.append(caminho)
-            elif caminho_str.startswith("../"):
-                for _ in range(self.max_tentativas):
-                    caminho = Path("../") / caminho
-                    if caminho.exists():
-                        caminhos_ajustados.append(caminho.resolve())
-                        break
-        return caminhos_ajustados
-
-    def processar_caminhos(self, json_bruto: str) -> List[Dict]:
-        """Processa os caminhos fornecidos, criando objetos Arquivo ou Diretorio."""
+        return [
+            resolvido.caminho
+            for resolvido in self.resolver_caminhos(lista_caminhos)
+            if resolvido.caminho is not None
+        ]
+
+    def _criar_varredura(
+        self,
+        caminho: Path,
+        info: os.stat_result,
+        max_profundidade: Optional[int],
+        max_entradas: Optional[int],
+        consulta: Optional["Consulta"] = None,
+    ) -> Union[Varredura, VarreduraIncremental]:
+        """
+        Varredura da árvore em memória quando o diretório está numa raiz
+        observada; incremental quando há índice e nenhum limite ou consulta;
+        caso contrário, completa (o índice guarda diretórios inteiros).
+        """
+        if self.observador is not None:
+            varredura = self.observador.varredura(
+                caminho, info, max_profundidade, max_entradas, consulta
+            )
+            if varredura is not None:
+                return varredura
+        if (
+            self.indice is not None
+            and max_profundidade is None
+            and max_entradas is None
+            and consulta is None
+        ):
+            return self.indice.varredura(caminho, info)
+        return Varredura(caminho, info, max_profundidade, max_entradas, consulta=consulta)
+
+    def processar_caminhos(
+        self,
+        json_bruto: Union[str, bytes, Dict],
+        max_profundidade: Optional[int] = None,
+        max_entradas: Optional[int] = None,
+        formatar_tamanhos: bool = False,
+        consulta: Optional["Consulta"] = None,
+    ) -> List[Dict]:
+        """
+        Processa os caminhos fornecidos, descrevendo arquivos e diretórios.
+
+        Diretórios são percorridos iterativamente e convertidos em JSON durante
+        a própria varredura. `max_profundidade` e `max_entradas` limitam cada
+        caminho de entrada; quando um limite é atingido o resultado parcial é
+        retornado com `"truncado": True` e o `"motivo_truncamento"`.
+
+        Os tamanhos são sempre numéricos (bytes); com `formatar_tamanhos=True`
+        cada item também recebe a versão legível (ver
+        `adicionar_tamanhos_formatados`).
+
+        Com uma `consulta`, os filtros são aplicados durante a varredura dos
+        diretórios: entradas recusadas não entram na árvore nem nos totais, e
+        diretórios podados não são abertos. Caminhos de entrada que são
+        arquivos são sempre descritos.
+        """
+        lista_caminhos = self._ler_entrada(json_bruto)
+        chave = self._chave_cache(lista_caminhos, max_profundidade, max_entradas, consulta)
+        resultados = self._buscar_no_cache(chave)
+        if resultados is None:
+            resultados = self._processar_lista(
+                lista_caminhos, max_profundidade, max_entradas, consulta
+            )
+            self._guardar_no_cache(chave, resultados)
+        return self._finalizar(resultados, formatar_tamanhos)
+
+    async def processar_caminhos_async(
+        self,
+        json_bruto: Union[str, bytes, Dict],
+        max_profundidade: Optional[int] = None,
+        max_entradas: Optional[int] = None,
+        formatar_tamanhos: bool = False,
+        executor: Optional["Executor"] = None,
+        concorrencia: int = 4,
+        consulta: Optional["Consulta"] = None,
+    ) -> List[Dict]:
+        """
+        Versão assíncrona de `processar_caminhos`, com o mesmo resultado.
+
+        A lista de entrada é resolvida uma única vez, em lote (ver
+        `resolver_caminhos`), no `executor` (ou no executor padrão do loop).
+        Em seguida, só os diretórios são varridos no executor, com no máximo
+        `concorrencia` varreduras em andamento, sem bloquear o loop de
+        eventos; arquivos são descritos com o `stat` da resolução. No modo com
+        processos a lista inteira é entregue de uma vez ao executor, que
+        coordena o pool de processos.
+        """
+        import asyncio  # pylint: disable=C0415
+
+        lista_caminhos = self._ler_entrada(json_bruto)
+        chave = self._chave_cache(lista_caminhos, max_profundidade, max_entradas, consulta)
+        resultados = self._buscar_no_cache(chave)
+        if resultados is None:
+            loop = asyncio.get_running_loop()
+            if self.processos > 1:
+                resultados = await loop.run_in_executor(
+                    executor,
+                    self._processar_lista,
+                    lista_caminhos,
+                    max_profundidade,
+                    max_entradas,
+                    consulta,
+                )
+            else:
+                resolvidos = await loop.run_in_executor(
+                    executor, self.resolver_caminhos, lista_caminhos
+                )
+                limite = asyncio.Semaphore(max(concorrencia, 1))
+
+                def varrer(caminho: Path, info: os.stat_result) -> Dict:
+                    return self._montar_arvore(caminho, info, self._criar_varredura(
+                        caminho, info, max_profundidade, max_entradas, consulta
+                    ))
+
+                async def varrer_limitado(caminho: Path, info: os.stat_result) -> Dict:
+                    async with limite:
+                        return await loop.run_in_executor(executor, varrer, caminho, info)
+
+                resultados = []
+                diretorios: Dict[int, Awaitable[Dict]] = {}
+                for resolvido in resolvidos:
+                    if resolvido.caminho is None:
+                        continue
+                    if resolvido.info is not None and stat.S_ISDIR(resolvido.info.st_mode):
+                        diretorios[len(resultados)] = varrer_limitado(
+                            resolvido.caminho, resolvido.info
+                        )
+                        resultados.append({})
+                    else:
+                        resultados.append(
+                            self._descrever_nao_diretorio(resolvido.caminho, resolvido.info)
+                        )
+                arvores = await asyncio.gather(*diretorios.values())
+                for posicao, arvore in zip(diretorios, arvores):
+                    resultados[posicao] = arvore
+            self._guardar_no_cache(chave, resultados)
+        return self._finalizar(resultados, formatar_tamanhos)
+
+    def _ler_entrada(self, json_bruto: Union[str, bytes, Dict]) -> List[str]:
+        """
+        Decodifica (com o serializador configurado) e valida o JSON de entrada,
+        retornando a lista de caminhos. Um dicionário já decodificado é usado
+        diretamente, sem voltar a passar por JSON.
+        """
+        if isinstance(json_bruto, dict):
+            json_entrada = json_bruto
+        else:
+            try:
+                json_entrada = get_serializer().loads(json_bruto)
+            except ValueError as e:
+                raise ValueError("Entrada JSON inválida.") from e
+        if not isinstance(json_entrada, dict) or not self._validar_json(json_entrada):
+            raise ValueError("Estrutura JSON inválida.")
+        return json_entrada["jsonEntrada"]
+
+    def _chave_cache(
+        self,
+        lista_caminhos: List[str],
+        max_profundidade: Optional[int],
+        max_entradas: Optional[int],
+        consulta: Optional["Consulta"] = None,
+    ) -> Tuple:
+        """Chave do cache: caminhos normalizados e opções que alteram o resultado."""
+        return (
+            "processar_caminhos",
+            tuple(os.path.abspath(caminho) for caminho in lista_caminhos),
+            (
+                self.max_tentativas,
+                max_profundidade,
+                max_entradas,
+                consulta.chave() if consulta is not None else None,
+            ),
+        )
+
+    def _buscar_no_cache(self, chave: Tuple) -> Optional[List[Dict]]:
+        """Retorna o resultado guardado no cache, se houver cache e entrada válida."""
+        if self.cache is None:
+            return None
+        return self.cache.get(chave)
+
+    def _guardar_no_cache(self, chave: Tuple, resultados: List[Dict]) -> None:
+        """Guarda o resultado no cache, com as raízes usadas na validação por `mtime`."""
+        if self.cache is not None:
+            self.cache.put(chave, resultados, [r["caminho"] for r in resultados])
+
+    @staticmethod
+    def _finalizar(resultados: List[Dict], formatar_tamanhos: bool) -> List[Dict]:
+        """Aplica a formatação opcional de saída."""
+        if formatar_tamanhos:
+            for resultado in resultados:
+                adicionar_tamanhos_formatados(resultado)
+        return resultados
+
+    def agregar_caminhos(
+        self,
+        json_bruto: Union[str, bytes, Dict],
+        top_n: int = 20,
+        max_profundidade: Optional[int] = None,
+        max_entradas: Optional[int] = None,
+        consulta: Optional["Consulta"] = None,
+    ) -> List[Dict]:
+        """
+        Relatório de uso de disco de cada caminho de entrada (ver
+        `app.models.agregacao`): totais recursivos, os `top_n` maiores
+        arquivos e diretórios e histogramas por extensão e por idade. Os
+        diretórios são percorridos com a mesma varredura de
+        `processar_caminhos` (árvore em memória, índice ou disco), mas a
+        árvore não é montada: a resposta tem o tamanho do relatório.
+        """
+        from .agregacao import agregar_arquivo, agregar_varredura  # pylint: disable=C0415
+
+        relatorios: List[Dict] = []
+        for resolvido in self.resolver_caminhos(self._ler_entrada(json_bruto)):
+            if resolvido.caminho is None:
+                continue
+            caminho, info = resolvido.caminho, resolvido.info
+            if info is not None and stat.S_ISREG(info.st_mode):
+                relatorios.append(agregar_arquivo(str(caminho), info, top_n=top_n))
+            elif info is not None and stat.S_ISDIR(info.st_mode):
+                varredura = self._criar_varredura(
+                    caminho, info, max_profundidade, max_entradas, consulta
+                )
+                try:
+                    relatorios.append(agregar_varredura(str(caminho), varredura, top_n=top_n))
+                except OSError as erro:
+                    relatorios.append({"caminho": str(caminho), "erro": erro.strerror or str(erro)})
+            else:
+                relatorios.append({"caminho": str(caminho), "erro": "Caminho inválido"})
+        return relatorios
+
+    def versao_resultado(
+        self,
+        json_bruto: Union[str, bytes, Dict],
+        max_profundidade: Optional[int] = None,
+        max_entradas: Optional[int] = None,
+        formatar_tamanhos: bool = False,
+        consulta: Optional["Consulta"] = None,
+    ) -> Optional[str]:
+        """
+        Identifica o resultado de `processar_caminhos` com as mesmas opções,
+        sem varrer nem serializar; `None` se não for possível.
+
+        Quando todos os diretórios de entrada estão nas árvores do observador,
+        a versão é calculada do `stat` de cada caminho de entrada e da versão
+        de cada árvore, que muda a cada alteração aplicada a ela. Caso
+        contrário, é a versão guardada por `guardar_versao` junto com o
+        resultado no cache, e descartada com ele.
+        """
+        lista_caminhos = self._ler_entrada(json_bruto)
+        chave = self._chave_cache(lista_caminhos, max_profundidade, max_entradas, consulta)
+        estado = self._estado_observado(lista_caminhos)
+        if estado is not None:
+            dados = repr((chave, formatar_tamanhos, estado)).encode("utf-8")
+            return hashlib.blake2b(dados, digest_size=16).hexdigest()
+        if self.cache is None:
+            return None
+        return self.cache.get_version(chave, formatar_tamanhos)
+
+    def guardar_versao(
+        self,
+        json_bruto: Union[str, bytes, Dict],
+        versao: str,
+        max_profundidade: Optional[int] = None,
+        max_entradas: Optional[int] = None,
+        formatar_tamanhos: bool = False,
+        consulta: Optional["Consulta"] = None,
+    ) -> None:
+        """
+        Guarda a versão calculada para o resultado (por exemplo, o hash do
+        corpo serializado) junto com o resultado no cache, para
+        `versao_resultado`. Sem cache, ou sem o resultado no cache, nada é
+        guardado.
+        """
+        if self.cache is None:
+            return
+        lista_caminhos = self._ler_entrada(json_bruto)
+        chave = self._chave_cache(lista_caminhos, max_profundidade, max_entradas, consulta)
+        self.cache.set_version(chave, versao, formatar_tamanhos)
+
+    def _estado_observado(self, lista_caminhos: List[str]) -> Optional[List[Tuple]]:
+        """
+        Estado dos caminhos de entrada (o `stat` feito na resolução e, nos
+        diretórios, a identidade e a versão da árvore em memória), ou `None`
+        se não há observador ou algum diretório não está inteiro numa árvore
+        (subdiretórios sem observação ou com erro são lidos do disco, e as
+        suas alterações não mudam a versão da árvore).
+        """
+        if self.observador is None:
+            return None
+        self.observador.sincronizar()
+        estado: List[Tuple] = []
+        for resolvido in self.resolver_caminhos(lista_caminhos):
+            if resolvido.caminho is None:
+                estado.append((resolvido.entrada,))
+                continue
+            caminho, info = str(resolvido.caminho), resolvido.info
+            if info is None:
+                estado.append((caminho, None))
+                continue
+            assinatura = (
+                info.st_mode, info.st_ino, info.st_size, info.st_mtime_ns, info.st_ctime_ns
+            )
+            if not stat.S_ISDIR(info.st_mode):
+                estado.append((caminho, assinatura))
+                continue
+            arvore = self.observador.arvore_de(caminho)
+            if caminho != os.path.abspath(caminho):
+                return None
+            if arvore is None or not arvore.listado(caminho) or not arvore.completo(caminho):
+                return None
+            estado.append((caminho, assinatura, arvore.identidade, arvore.versao))
+        return estado
+
+    def paginar_caminhos(
+        self,
+        json_bruto: Union[str, bytes, Dict],
+        cursor: Optional[str] = None,
+        limite: int = 100,
+        max_profundidade: Optional[int] = None,
+        consulta: Optional["Consulta"] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Uma página da enumeração dos caminhos de entrada e das suas árvores,
+        no formato de `iterar_arvore_json` (cada nó sem os filhos, com `tipo`
+        e `profundidade`), com os irmãos em ordem de nome.
+
+        Retorna até `limite` itens e o cursor da próxima página (`None` na
+        última). Só o necessário para a página é lido do disco (ver
+        `app.models.paginacao`). O cursor vale apenas para a mesma entrada e
+        as mesmas opções; um cursor inválido levanta `ValueError`.
+        """
+        lista_caminhos = self._ler_entrada(json_bruto)
+        assinatura = assinatura_paginas(
+            [os.path.abspath(caminho) for caminho in lista_caminhos],
+            self.max_tentativas,
+            max_profundidade,
+            consulta.chave() if consulta is not None else None,
+        )
+        inicio, apos = 0, None
+        if cursor:
+            inicio, apos = decodificar_cursor(cursor, assinatura)
+            if apos is None:
+                inicio += 1
+        itens: List[Dict] = []
+        posicao_anterior: Tuple[int, Optional[Componentes]] = (inicio, apos)
+        for posicao, componentes, dados in self._iterar_pagina(
+            lista_caminhos, inicio, apos, max_profundidade, consulta
+        ):
+            if len(itens) >= limite:
+                return itens, codificar_cursor(assinatura, *posicao_anterior)
+            itens.append(dados)
+            posicao_anterior = (posicao, componentes)
+        return itens, None
+
+    def _iterar_pagina(
+        self,
+        lista_caminhos: List[str],
+        inicio: int,
+        apos: Optional[Componentes],
+        max_profundidade: Optional[int],
+        consulta: Optional["Consulta"],
+    ) -> Iterator[Tuple[int, Optional[Componentes], Dict]]:
+        """
+        Itens a partir do caminho de entrada `inicio`, logo depois de `apos`
+        (`None` = desde o próprio caminho), com a posição e os componentes de
+        cada um. Os caminhos de entrada são resolvidos um a um, quando chega a
+        vez de cada um.
+        """
+        resolvedor = ResolvedorCaminhos(self.max_tentativas)
+        for posicao in range(inicio, len(lista_caminhos)):
+            resolvido = resolvedor.resolver(lista_caminhos[posicao])
+            if resolvido.caminho is None:
+                continue
+            caminho, info = resolvido.caminho, resolvido.info
+            retomar = apos if posicao == inicio else None
+            if not stat.S_ISDIR(info.st_mode):
+                if retomar is not None:
+                    continue
+                if stat.S_ISREG(info.st_mode):
+                    dados = Arquivo(caminho, info).para_json()
+                    dados.update({"tipo": "arquivo", "profundidade": 0})
+                else:
+                    dados = {"caminho": str(caminho), "erro": "Caminho inválido"}
+                yield posicao, (), dados
+                continue
+            if retomar is None:
+                dados = _json_item(str(caminho), caminho.name, info)
+                dados.update({"tipo": "diretorio", "profundidade": 0})
+                yield posicao, (), dados
+            varredura = VarreduraOrdenada(caminho, info, retomar or (), max_profundidade, consulta)
+            try:
+                for componentes, no in varredura:
+                    dados = _json_no(no, com_conteudo=False)
+                    dados.update({
+                        "tipo": "arquivo" if no.entrada.e_arquivo else "diretorio",
+                        "profundidade": no.profundidade,
+                    })
+                    yield posicao, componentes, dados
+            except OSError as erro:
+                yield posicao, None, {"caminho": str(caminho), "erro": erro.strerror or str(erro)}
+
+    @staticmethod
+    def _descrever_nao_diretorio(caminho: Path, info: Optional[os.stat_result]) -> Dict:
+        """Descreve um caminho resolvido que não é diretório (arquivo ou inválido)."""
+        if info is not None and stat.S_ISREG(info.st_mode):
+            return Arquivo(caminho, info).para_json()
+        return {"caminho": str(caminho), "erro": "Caminho inválido"}
+
+    @staticmethod
+    def _montar_arvore(
+        caminho: Path, info: os.stat_result, varredura: Union[Varredura, VarreduraIncremental]
+    ) -> Dict:
+        """Árvore JSON do diretório, ou o erro que interrompeu a varredura."""
         try:
-            json_entrada = json.loads(json_bruto)
-            if not self._validar_json(json_entrada):
-                raise ValueError("Estrutura JSON inválida.")
-        except json.JSONDecodeError as e:
-            raise ValueError("Entrada JSON inválida.") from e
-
-        lista_caminhos = json_entrada["jsonEntrada"]
-        caminhos_ajustados = self._ajustar_caminhos(lista_caminhos)
-
-        resultados_processados = []
-        for caminho in caminhos_ajustados:
-            if caminho.is_file():
-                resultados_processados.append(Arquivo(caminho).para_json())
-            elif caminho.is_dir():
-                resultados_processados.append(Diretorio(caminho).para_json())
+            return montar_arvore_json(caminho, info, varredura)
+        except OSError as erro:
+            return {"caminho": str(caminho), "erro": erro.strerror or str(erro)}
+
+    def _processar_lista(
+        self,
+        lista_caminhos: List[str],
+        max_profundidade: Optional[int],
+        max_entradas: Optional[int],
+        consulta: Optional["Consulta"] = None,
+    ) -> List[Dict]:
+        """
+        Ajusta e descreve cada caminho da lista de entrada, reaproveitando o
+        `stat` feito na resolução.
+        """
+        resultados_processados: List[Dict] = []
+        diretorios: List[Tuple[int, Path]] = []
+        for resolvido in self.resolver_caminhos(lista_caminhos):
+            if resolvido.caminho is None:
+                continue
+            caminho, info = resolvido.caminho, resolvido.info
+            if info is not None and stat.S_ISDIR(info.st_mode):
+                varredura = self._criar_varredura(
+                    caminho, info, max_profundidade, max_entradas, consulta
+                )
+                if (
+                    self.processos > 1
+                    and max_entradas is None
+                    and isinstance(varredura, Varredura)
+                    and not isinstance(varredura, VarreduraMemoria)
+                ):
+                    diretorios.append((len(resultados_processados), caminho))
+                    resultados_processados.append({})
+                    continue
+                resultados_processados.append(self._montar_arvore(caminho, info, varredura))
             else:
-                resultados_processados.append({"caminho": str(caminho), "erro": "Caminho inválido"})
+                resultados_processados.append(self._descrever_nao_diretorio(caminho, info))
+
+        if diretorios:
+            from .particionamento import varrer_em_processos  # pylint: disable=C0415
+
+            arvores = varrer_em_processos(
+                [caminho for _, caminho in diretorios],
+                self.processos,
+                self.limiar_divisao,
+                max_profundidade,
+                max_entradas,
+                consulta,
+            )
+            for (posicao, _), arvore in zip(diretorios, arvores):
+                resultados_processados[posicao] = arvore
         return resultados_processados
 
 if __name__ == "__main__":
+    from .json_do_frontend import json_frontend  # pylint: disable=C0415
+
     # Exemplo de uso
     analisador = AnalisadorCaminhos()
     try:
         resultados = analisador.processar_caminhos(json_frontend)
-        for resultado in resultados:
-            print(json.dumps(resultado, indent=4, ensure_ascii=False))
+        get_serializer().write_lines(sys.stdout.buffer, resultados)
     except ValueError as erro:
         print(f"Erro ao processar caminhos: {erro}")
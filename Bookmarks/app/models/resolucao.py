@@ -0,0 +1,124 @@
+# app/models/resolucao.py
+
+"""
+Resolução em lote dos caminhos de entrada do `AnalisadorCaminhos`.
+
+Cada caminho é normalizado uma única vez (absoluto, sem `.`/`..`) e caminhos
+repetidos são resolvidos uma só vez. Para entradas que começam com `../` e não
+existem, são testados os candidatos com mais `../` à frente (`../../x`,
+`../../../x`, ...), até `max_tentativas`. A existência é memorizada por
+caminho durante o lote: quando um candidato não existe, os seus ancestrais
+são verificados (também memorizados), e qualquer caminho sob um diretório
+que já se sabe ausente é descartado sem nenhuma chamada ao sistema.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+
+class CaminhoResolvido(NamedTuple):
+    """Resultado da resolução de um caminho de entrada."""
+
+    entrada: str
+    caminho: Optional[Path]
+    tentativa: Optional[int] = None
+    candidato: Optional[str] = None
+    info: Optional[os.stat_result] = None
+
+    @property
+    def encontrado(self) -> bool:
+        """Indica se algum candidato existe."""
+        return self.caminho is not None
+
+
+class ResolvedorCaminhos:
+    """
+    Resolve listas de caminhos com memória de existência compartilhada.
+
+    `tentativa` indica o candidato escolhido: 0 é o próprio caminho e `n` é o
+    caminho com `n` prefixos `../` a mais. `candidato` é a forma normalizada
+    testada e `caminho` é o candidato com os links simbólicos resolvidos.
+    `info` é o `stat` (seguindo links) feito na verificação, reaproveitável
+    por quem for descrever o caminho.
+
+    A memória vale enquanto o objeto existir; crie um resolvedor por lote para
+    não usar resultados antigos.
+    """
+
+    def __init__(self, max_tentativas: int = 10) -> None:
+        self.max_tentativas = max_tentativas
+        self.chamadas_stat = 0
+        self._existentes: Dict[str, os.stat_result] = {}
+        self._presentes: Set[str] = set()
+        self._ausentes: Set[str] = set()
+
+    def _ancestral_ausente(self, caminho: str) -> bool:
+        """Indica se algum ancestral do caminho já foi visto como ausente."""
+        atual = caminho
+        while True:
+            pai = os.path.dirname(atual)
+            if pai == atual or pai in self._presentes:
+                return False
+            if pai in self._ausentes:
+                return True
+            atual = pai
+
+    def _stat(self, caminho: str) -> Optional[os.stat_result]:
+        """
+        `stat` memorizado do caminho normalizado (`None` se não existir). Na
+        ausência, sobe até o primeiro ancestral existente, registrando os
+        ausentes para os próximos caminhos do lote.
+        """
+        if caminho in self._existentes:
+            return self._existentes[caminho]
+        if caminho in self._ausentes or self._ancestral_ausente(caminho):
+            return None
+        self.chamadas_stat += 1
+        try:
+            info = os.stat(caminho)
+        except (OSError, ValueError):
+            self._ausentes.add(caminho)
+            pai = os.path.dirname(caminho)
+            if pai != caminho:
+                self._stat(pai)
+            return None
+        self._existentes[caminho] = info
+        atual = caminho
+        while atual not in self._presentes:
+            self._presentes.add(atual)
+            atual = os.path.dirname(atual)
+        return info
+
+    def _candidatos(self, entrada: str) -> Iterator[Tuple[int, str]]:
+        """Formas normalizadas a testar, na ordem, sem repetições."""
+        vistos = set()
+        tentativas = self.max_tentativas if entrada.startswith("../") else 0
+        for tentativa in range(tentativas + 1):
+            candidato = os.path.abspath("../" * tentativa + entrada)
+            if candidato not in vistos:
+                vistos.add(candidato)
+                yield tentativa, candidato
+
+    def resolver(self, entrada: str) -> CaminhoResolvido:
+        """Resolve um único caminho (usando a memória do resolvedor)."""
+        for tentativa, candidato in self._candidatos(entrada):
+            info = self._stat(candidato)
+            if info is not None:
+                return CaminhoResolvido(
+                    entrada, Path(candidato).resolve(), tentativa, candidato, info
+                )
+        return CaminhoResolvido(entrada, None)
+
+    def resolver_lote(self, entradas: Iterable[str]) -> List[CaminhoResolvido]:
+        """
+        Resolve os caminhos na ordem de entrada; entradas repetidas são
+        resolvidas uma única vez.
+        """
+        resolvidos: Dict[str, CaminhoResolvido] = {}
+        resultados = []
+        for entrada in entradas:
+            if entrada not in resolvidos:
+                resolvidos[entrada] = self.resolver(entrada)
+            resultados.append(resolvidos[entrada])
+        return resultados
@@ -0,0 +1,211 @@
+# app/models/varredura.py
+
+"""
+Motor de varredura do sistema de arquivos baseado em `os.scandir`.
+
+Cada entrada de diretório é classificada e descrita a partir de um único
+`stat` (cacheado pelo próprio `os.DirEntry`), em vez das várias chamadas de
+`exists()`, `is_file()`, `is_dir()` e `stat()` feitas por `pathlib`.
+"""
+
+import os
+import stat
+from typing import (
+    TYPE_CHECKING, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+)
+
+if TYPE_CHECKING:
+    from .consulta import Consulta
+
+
+class EntradaVarredura(NamedTuple):
+    """Entrada encontrada durante a varredura, já com seus metadados."""
+
+    caminho: str
+    nome: str
+    info: os.stat_result
+
+    @property
+    def e_arquivo(self) -> bool:
+        """Indica se a entrada é um arquivo regular."""
+        return stat.S_ISREG(self.info.st_mode)
+
+    @property
+    def e_diretorio(self) -> bool:
+        """Indica se a entrada é um diretório."""
+        return stat.S_ISDIR(self.info.st_mode)
+
+
+def obter_info(caminho: Union[str, "os.PathLike[str]"]) -> Optional[os.stat_result]:
+    """
+    Retorna o `stat` do caminho (seguindo links simbólicos),
+    ou `None` se ele não existir ou não puder ser acessado.
+    """
+    try:
+        return os.stat(caminho)
+    except (OSError, ValueError):
+        return None
+
+
+def listar_entradas(
+    caminho: Union[str, "os.PathLike[str]"], consulta: Optional["Consulta"] = None
+) -> Iterator[EntradaVarredura]:
+    """
+    Lista o conteúdo imediato de um diretório com um único `stat` por entrada.
+
+    Entradas que desaparecem durante a listagem ou links simbólicos quebrados
+    são ignorados, assim como `Path.is_file()`/`Path.is_dir()` fariam. Com uma
+    `consulta`, as entradas recusadas pelo nome são descartadas antes do `stat`.
+    """
+    with os.scandir(caminho) as entradas:
+        for entrada in entradas:
+            if consulta is not None and not consulta.aceita_antes_do_stat(entrada):
+                continue
+            try:
+                info = entrada.stat()
+            except OSError:
+                continue
+            item = EntradaVarredura(entrada.path, entrada.name, info)
+            if consulta is None or consulta.aceita(item):
+                yield item
+
+
+class NoVarredura(NamedTuple):
+    """Entrada visitada pela `Varredura`, com a profundidade relativa à raiz."""
+
+    entrada: EntradaVarredura
+    profundidade: int
+    ciclo: bool = False
+    erro: Optional[str] = None
+    adiado: bool = False
+
+
+Chave = Tuple[int, int]
+
+
+class Varredura:
+    """
+    Percorre uma árvore em pré-ordem usando uma pilha explícita, sem recursão.
+
+    Os filhos de cada diretório são emitidos na ordem do `scandir`, e somente
+    arquivos regulares e diretórios são visitados. A varredura pode ser
+    limitada por `max_profundidade` (diretórios nesse nível não são abertos)
+    e por `max_entradas`; ao atingir um limite, `truncado` passa a ser `True`
+    e `motivo_truncamento` indica qual limite foi atingido. Diretórios que
+    apontam (via link simbólico) para um ancestral são emitidos com
+    `ciclo=True` e não são percorridos novamente, usando o par
+    (`st_dev`, `st_ino`) para identificá-los.
+
+    `descer`, quando informado, decide se cada diretório deve ser aberto;
+    os recusados são emitidos com `adiado=True` para serem percorridos
+    depois (por exemplo, em outro processo, recebendo `ancestrais()` para
+    manter a detecção de ciclos).
+
+    `consulta`, quando informada, é aplicada a cada diretório listado:
+    arquivos recusados não são emitidos e diretórios podados não são abertos
+    (ver `Consulta`). Só as entradas aceitas contam para `max_entradas`.
+
+    `entradas` e `diretorios_listados` registram o trabalho feito, como na
+    `VarreduraIncremental` (usados pelas métricas de `app.services.metrics`).
+    """
+
+    def __init__(
+        self,
+        raiz: Union[str, "os.PathLike[str]"],
+        info_raiz: Optional[os.stat_result] = None,
+        max_profundidade: Optional[int] = None,
+        max_entradas: Optional[int] = None,
+        descer: Optional[Callable[[EntradaVarredura, int], bool]] = None,
+        ancestrais: Iterable[Chave] = (),
+        consulta: Optional["Consulta"] = None,
+    ) -> None:
+        self.raiz = os.fspath(raiz)
+        self.info_raiz = info_raiz
+        self.max_profundidade = max_profundidade
+        self.max_entradas = max_entradas
+        self.descer = descer
+        self.consulta = consulta
+        self.entradas = 0
+        self.diretorios_listados = 0
+        self.truncado = False
+        self.motivo_truncamento: Optional[str] = None
+        self._ancestrais = list(ancestrais)
+        self._pilha: List[Tuple[Iterator[EntradaVarredura], Chave]] = []
+
+    def _truncar(self, motivo: str) -> None:
+        """Registra que a varredura parou antes de cobrir toda a árvore."""
+        if not self.truncado:
+            self.truncado = True
+            self.motivo_truncamento = motivo
+
+    def ancestrais(self) -> List[Chave]:
+        """Chaves (`st_dev`, `st_ino`) dos diretórios abertos no momento, da raiz para baixo."""
+        return self._ancestrais + [chave for _, chave in self._pilha]
+
+    def _listar(self, caminho: str) -> List[EntradaVarredura]:
+        """Lê o diretório inteiro, liberando o descritor antes de descer."""
+        self.diretorios_listados += 1
+        return [
+            entrada for entrada in listar_entradas(caminho, self.consulta)
+            if entrada.e_arquivo or entrada.e_diretorio
+        ]
+
+    @staticmethod
+    def _tem_conteudo(caminho: str) -> bool:
+        """Indica se o diretório possui alguma entrada, sem listá-lo por completo."""
+        try:
+            with os.scandir(caminho) as entradas:
+                return next(entradas, None) is not None
+        except OSError:
+            return False
+
+    def __iter__(self) -> Iterator[NoVarredura]:
+        info_raiz = self.info_raiz or os.stat(self.raiz)
+        chave_raiz = (info_raiz.st_dev, info_raiz.st_ino)
+        if self.max_profundidade is not None and self.max_profundidade <= 0:
+            if self._tem_conteudo(self.raiz):
+                self._truncar("max_profundidade")
+            return
+
+        ativos = set(self._ancestrais)
+        ativos.add(chave_raiz)
+        pilha = self._pilha
+        pilha.append((iter(self._listar(self.raiz)), chave_raiz))
+        while pilha:
+            filhos, chave_pai = pilha[-1]
+            entrada = next(filhos, None)
+            if entrada is None:
+                pilha.pop()
+                ativos.discard(chave_pai)
+                continue
+            if self.max_entradas is not None and self.entradas >= self.max_entradas:
+                self._truncar("max_entradas")
+                pilha.clear()
+                return
+            self.entradas += 1
+            profundidade = len(pilha)
+
+            if not entrada.e_diretorio:
+                yield NoVarredura(entrada, profundidade)
+                continue
+
+            chave = (entrada.info.st_dev, entrada.info.st_ino)
+            if chave in ativos:
+                yield NoVarredura(entrada, profundidade, ciclo=True)
+                continue
+            if self.max_profundidade is not None and profundidade >= self.max_profundidade:
+                if self._tem_conteudo(entrada.caminho):
+                    self._truncar("max_profundidade")
+                yield NoVarredura(entrada, profundidade)
+                continue
+            if self.descer is not None and not self.descer(entrada, profundidade):
+                yield NoVarredura(entrada, profundidade, adiado=True)
+                continue
+            try:
+                conteudo = self._listar(entrada.caminho)
+            except OSError as erro:
+                yield NoVarredura(entrada, profundidade, erro=erro.strerror or str(erro))
+                continue
+            yield NoVarredura(entrada, profundidade)
+            ativos.add(chave)
+            pilha.append((iter(conteudo), chave))
@@ -6,14 +6,181 @@ Este módulo define as rotas relacionadas
 à análise de texto e caminhos de arquivos.
 """
 
-from flask import Blueprint, render_template, request
-from app.services.text_analysis import analyze_text
-from app.services.file_manager import analyze_paths
+import asyncio
+import functools
+import hashlib
+
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    render_template,
+    request,
+    stream_with_context,
+)
+from app.models.consulta import Consulta
+from app.models.path_model import AnalisadorCaminhos
+from app.services.text_analysis import analyze_stream, analyze_text
+from app.services.file_manager import analyze_paths_async, iter_analyze_paths
+from app.services.jobs import DONE
+from app.services import compression, metrics
+from app.services.serializer import get_serializer
+from app.services.snapshots import with_totals
 
 # Definindo o Blueprint. O nome do blueprint é "analysis".
 bp = Blueprint("analysis", __name__, url_prefix="/")
 
 
+NDJSON_MIMETYPE = "application/x-ndjson"
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Maior página aceita por `/api/paths`
+PATHS_API_MAX_LIMIT = 1000
+# Maior `top_n` aceito por `/disk_usage`
+DISK_USAGE_MAX_TOP = 1000
+# Corpos lidos diretamente em blocos por `/analyze_text`
+TEXT_STREAM_MIMETYPES = ("text/plain", "application/octet-stream")
+# Blocos lidos do spool das tarefas
+SPOOL_BLOCK_SIZE = 64 * 1024
+
+
+def _as_bool(value):
+    """Interpreta valores de formulário como booleanos."""
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def _wants_ndjson():
+    """
+    Indica se o cliente pediu a resposta em fluxo NDJSON,
+    via `?stream=ndjson` ou pelo cabeçalho `Accept`.
+    """
+    if request.values.get("stream") == "ndjson":
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def _wants_json():
+    """Indica se o cliente pediu JSON, via `?format=json` ou pelo cabeçalho `Accept`."""
+    if request.args.get("format") == "json":
+        return True
+    return request.accept_mimetypes.best == "application/json"
+
+
+def _split_values(name):
+    """Valores repetidos e/ou separados por vírgula (`?ext=py,md&ext=txt`)."""
+    return [
+        value.strip()
+        for item in request.values.getlist(name)
+        for value in item.split(",")
+        if value.strip()
+    ]
+
+
+def _query_from_request():
+    """
+    Monta a consulta aplicada durante a varredura a partir dos parâmetros
+    `ext`, `name`, `regex`, `min_size`, `max_size`, `modified_after`,
+    `modified_before` e `prune`.
+    :return: Consulta | None, None se nenhum filtro foi pedido
+    :raises ValueError: se `regex` for inválida
+    """
+    options = {
+        "extensoes": _split_values("ext"),
+        "nomes": _split_values("name"),
+        "regex": request.values.get("regex") or None,
+        "tamanho_min": request.values.get("min_size", type=int),
+        "tamanho_max": request.values.get("max_size", type=int),
+        "modificado_desde": request.values.get("modified_after", type=float),
+        "modificado_ate": request.values.get("modified_before", type=float),
+        "podar": _split_values("prune"),
+    }
+    if not any(value not in (None, []) for value in options.values()):
+        return None
+    return Consulta(**options)
+
+
+def _watcher():
+    """Observador das raízes configuradas (`None` se desligado)."""
+    return current_app.extensions.get("analysis_watcher")
+
+
+def _index():
+    """Índice de metadados da aplicação (`None` se desligado)."""
+    return current_app.extensions.get("analysis_index")
+
+
+def _jobs():
+    """Fila de tarefas da aplicação."""
+    return current_app.extensions["analysis_jobs"]
+
+
+def _snapshots():
+    """Instantâneos guardados pela aplicação."""
+    return current_app.extensions["analysis_snapshots"]
+
+
+def _read_blocks(path):
+    """
+    Lê o arquivo em blocos, sem carregá-lo inteiro na memória.
+    :param path: str
+    """
+    with open(path, "rb") as spool:
+        while True:
+            block = spool.read(SPOOL_BLOCK_SIZE)
+            if not block:
+                return
+            yield block
+
+
+def _paths_input():
+    """
+    Entrada de `process_paths` e `disk_usage`: o corpo JSON no POST ou, no
+    GET, os caminhos repetidos em `path` (`?path=/a&path=/b`).
+    :return: bytes | dict
+    """
+    if request.method == "POST":
+        return request.get_data()
+    return {"jsonEntrada": request.args.getlist("path")}
+
+
+def _not_modified(etag):
+    """
+    Indica se o `If-None-Match` de um GET/HEAD já tem a versão `etag`,
+    comparada de forma fraca (a versão não depende da compressão).
+    """
+    return request.method in ("GET", "HEAD") and request.if_none_match.contains_weak(etag)
+
+
+def _with_etag(response, etag):
+    """Acrescenta o ETag fraco e responde 304 se o cliente já tem essa versão."""
+    response.set_etag(etag, weak=True)
+    return response.make_conditional(request)
+
+
+def _ndjson_response(results):
+    """
+    Envia cada resultado como uma linha JSON assim que ele é produzido.
+    :param results: iterator[dict]
+    """
+    lines = get_serializer().iter_lines(results)
+    return Response(stream_with_context(lines), mimetype=NDJSON_MIMETYPE)
+
+
+@bp.after_request
+def compress_response(response):
+    """
+    Comprime as respostas (gzip ou zstd, ver `app.services.compression`),
+    a menos que `ANALYSIS_COMPRESS` esteja desligado.
+    """
+    if not current_app.config.get("ANALYSIS_COMPRESS", True):
+        return response
+    return compression.compress_response(
+        response,
+        request.accept_encodings,
+        min_size=current_app.config.get("ANALYSIS_COMPRESS_MIN_BYTES", 1024),
+    )
+
+
 @bp.route("/", methods=["GET"])
 def home():
     """
@@ -26,21 +193,306 @@ def home():
 def analyze_text_route():
     """
     Recebe texto enviado pelo cliente e retorna o resultado da análise.
+
+    O texto pode vir no campo `text` do formulário, num arquivo enviado no
+    campo `file` ou no próprio corpo (`text/plain` ou
+    `application/octet-stream`). Arquivos e corpos são lidos em blocos, sem
+    guardar o texto, e o resultado não traz `original_text` nem `words`. No
+    campo `text`, esses campos podem ser omitidos com `echo=0`.
+    Aceita `top_k` e responde em JSON com `format=json` ou `Accept: application/json`.
     """
-    text = request.form.get("text")
-    if not text:
+    top_k = request.args.get("top_k", type=int, default=10)
+    try:
+        if request.mimetype in TEXT_STREAM_MIMETYPES:
+            encoding = request.mimetype_params.get("charset", "utf-8")
+            result = analyze_stream(request.stream, encoding=encoding, top_k=top_k)
+        elif "file" in request.files:
+            result = analyze_stream(request.files["file"].stream, top_k=top_k)
+        else:
+            text = request.form.get("text")
+            if not text:
+                return "Nenhum texto fornecido.", 400
+            echo = request.args.get("echo", type=_as_bool, default=True)
+            result = analyze_text(text, echo=echo, top_k=top_k)
+    except LookupError as error:
+        return str(error), 400
+    if not result["char_count"]:
         return "Nenhum texto fornecido.", 400
-    result = analyze_text(text)
+    if _wants_json():
+        return jsonify(result)
     return render_template("result.html", result=result)
 
 
 @bp.route("/analyze_paths", methods=["POST"])
-def analyze_paths_route():
+async def analyze_paths_route():
     """
     Recebe caminhos enviados pelo cliente e retorna o resultado da análise.
+    `ANALYSIS_WORKERS` limita os `stat` simultâneos nos dois modos. Fora do
+    modo NDJSON, os `stat` rodam no executor compartilhado da aplicação, com
+    no máximo `ANALYSIS_WORKERS` em andamento (ou
+    `ANALYSIS_ASYNC_CONCURRENCY`, quando `ANALYSIS_WORKERS` é 0).
     """
     paths = request.form.getlist("paths")
     if not paths:
         return "Nenhum caminho fornecido.", 400
-    result = analyze_paths(paths)
+    workers = current_app.config.get("ANALYSIS_WORKERS", 0)
+    if _wants_ndjson():
+        try:
+            query = _query_from_request()
+        except ValueError as error:
+            return str(error), 400
+        return _ndjson_response(
+            iter_analyze_paths(
+                paths,
+                recursive=request.values.get("recursive", type=_as_bool, default=False),
+                max_depth=request.values.get("max_depth", type=int),
+                max_entries=request.values.get("max_entries", type=int),
+                workers=workers,
+                query=query,
+                watcher=_watcher(),
+            )
+        )
+    result = await analyze_paths_async(
+        paths,
+        executor=current_app.extensions.get("analysis_executor"),
+        concurrency=workers or current_app.config.get("ANALYSIS_ASYNC_CONCURRENCY", 16),
+        cache=current_app.extensions.get("analysis_cache"),
+    )
     return render_template("result.html", result=result)
+
+
+@bp.route("/process_paths", methods=["GET", "POST"])
+async def process_paths_route():
+    """
+    Recebe o JSON `{"jsonEntrada": [...]}` (ou, no GET, os caminhos em
+    `path`) e retorna a árvore de cada caminho, varrida no executor
+    compartilhado da aplicação.
+    Aceita `max_depth`, `max_entries`, `human_sizes` e os filtros de
+    `_query_from_request` na query string. Diretórios das raízes observadas
+    (`ANALYSIS_WATCH_ROOTS`) são lidos da árvore em memória.
+
+    A resposta traz um ETag. Quando a versão do resultado é conhecida sem
+    varrer (árvores em memória ou versão no cache, ver
+    `AnalisadorCaminhos.versao_resultado`), um GET com esse ETag em
+    `If-None-Match` recebe 304 sem varredura nem serialização; nos demais
+    casos o ETag é o hash do corpo.
+    """
+    analisador = AnalisadorCaminhos(
+        indice=_index(),
+        cache=current_app.extensions.get("analysis_cache"),
+        observador=_watcher(),
+    )
+    paths = _paths_input()
+    if request.method != "POST" and not paths["jsonEntrada"]:
+        return "Nenhum caminho fornecido.", 400
+    try:
+        options = {
+            "max_profundidade": request.args.get("max_depth", type=int),
+            "max_entradas": request.args.get("max_entries", type=int),
+            "formatar_tamanhos": request.args.get("human_sizes", type=_as_bool, default=False),
+            "consulta": _query_from_request(),
+        }
+        etag = analisador.versao_resultado(paths, **options)
+        if etag is not None and _not_modified(etag):
+            return _with_etag(Response(status=304), etag)
+        result = await analisador.processar_caminhos_async(
+            paths,
+            executor=current_app.extensions.get("analysis_executor"),
+            concorrencia=current_app.config.get("ANALYSIS_ASYNC_CONCURRENCY", 16),
+            **options,
+        )
+    except ValueError as error:
+        return str(error), 400
+    body = get_serializer().dumps_bytes(result)
+    if etag is None:
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        analisador.guardar_versao(paths, etag, **options)
+    return _with_etag(Response(body, mimetype="application/json"), etag)
+
+
+@bp.route("/disk_usage", methods=["GET", "POST"])
+async def disk_usage_route():
+    """
+    Relatório de uso de disco (como o `du`) de cada caminho, recebidos como em
+    `process_paths`: totais recursivos, os `top_n` maiores arquivos e
+    diretórios (1 a `DISK_USAGE_MAX_TOP`, padrão 20) e histogramas por
+    extensão e por idade, sem enviar a árvore.
+    Aceita `max_depth`, `max_entries` e os filtros de `_query_from_request`.
+    """
+    analisador = AnalisadorCaminhos(indice=_index(), observador=_watcher())
+    paths = _paths_input()
+    if request.method != "POST" and not paths["jsonEntrada"]:
+        return "Nenhum caminho fornecido.", 400
+    top_n = min(max(request.args.get("top_n", type=int, default=20), 1), DISK_USAGE_MAX_TOP)
+    try:
+        query = _query_from_request()
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            current_app.extensions.get("analysis_executor"),
+            functools.partial(
+                analisador.agregar_caminhos,
+                paths,
+                top_n=top_n,
+                max_profundidade=request.args.get("max_depth", type=int),
+                max_entradas=request.args.get("max_entries", type=int),
+                consulta=query,
+            ),
+        )
+    except ValueError as error:
+        return str(error), 400
+    return Response(get_serializer().dumps_bytes(result), mimetype="application/json")
+
+
+@bp.route("/api/paths", methods=["POST"])
+def paths_api_route():
+    """
+    API JSON paginada: recebe `{"jsonEntrada": [...]}` e retorna
+    `{"items": [...], "next_cursor": ..., "count": ...}` com os caminhos e
+    os nós das suas árvores em ordem de nome. Para a página seguinte, o
+    cliente reenvia o mesmo corpo com `cursor=<next_cursor>`.
+    Aceita `limit` (1 a `PATHS_API_MAX_LIMIT`, padrão 100), `max_depth` e os
+    filtros de `_query_from_request` na query string.
+    """
+    limit = min(max(request.args.get("limit", type=int, default=100), 1), PATHS_API_MAX_LIMIT)
+    try:
+        items, next_cursor = AnalisadorCaminhos().paginar_caminhos(
+            request.get_data(),
+            cursor=request.args.get("cursor"),
+            limite=limit,
+            max_profundidade=request.args.get("max_depth", type=int),
+            consulta=_query_from_request(),
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    body = get_serializer().dumps_bytes(
+        {"items": items, "next_cursor": next_cursor, "count": len(items)}
+    )
+    return Response(body, mimetype="application/json")
+
+
+@bp.route("/jobs", methods=["POST"])
+def submit_job_route():
+    """
+    Enfileira a varredura recursiva dos caminhos enviados (`paths`), com
+    `max_depth`, `max_entries` e filtros (ver `_query_from_request`)
+    opcionais, e retorna o estado da tarefa.
+    """
+    paths = request.form.getlist("paths")
+    if not paths:
+        return "Nenhum caminho fornecido.", 400
+    try:
+        query = _query_from_request()
+    except ValueError as error:
+        return str(error), 400
+    job = _jobs().submit(
+        paths,
+        max_depth=request.values.get("max_depth", type=int),
+        max_entries=request.values.get("max_entries", type=int),
+        query=query,
+    )
+    return jsonify(job.to_dict()), 202
+
+
+@bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status_route(job_id):
+    """
+    Retorna o estado e o progresso da tarefa.
+    """
+    job = _jobs().get(job_id)
+    if job is None:
+        return "Tarefa não encontrada.", 404
+    return jsonify(job.to_dict())
+
+
+@bp.route("/jobs/<job_id>/result", methods=["GET"])
+def job_result_route(job_id):
+    """
+    Envia o resultado da tarefa concluída em NDJSON, lido do spool em disco.
+    O resultado não muda depois de concluído, então o ETag é o id da tarefa.
+    """
+    job = _jobs().get(job_id)
+    if job is None:
+        return "Tarefa não encontrada.", 404
+    if job.status != DONE:
+        return jsonify(job.to_dict()), 409
+    response = Response(_read_blocks(job.result_path), mimetype=NDJSON_MIMETYPE)
+    return _with_etag(response, job.id)
+
+
+@bp.route("/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job_route(job_id):
+    """
+    Cancela a tarefa, na fila ou em execução.
+    """
+    job = _jobs().cancel(job_id)
+    if job is None:
+        return "Tarefa não encontrada.", 404
+    return jsonify(job.to_dict())
+
+
+@bp.route("/snapshots", methods=["POST"])
+def create_snapshot_route():
+    """
+    Grava um instantâneo do diretório `path`, com `max_depth` e filtros (ver
+    `_query_from_request`) opcionais, e retorna o seu resumo.
+    """
+    path = request.values.get("path")
+    if not path:
+        return "Nenhum caminho fornecido.", 400
+    try:
+        snapshot = _snapshots().create(
+            path,
+            max_depth=request.values.get("max_depth", type=int),
+            query=_query_from_request(),
+        )
+    except ValueError as error:
+        return str(error), 400
+    return jsonify(snapshot), 201
+
+
+@bp.route("/snapshots", methods=["GET"])
+def list_snapshots_route():
+    """
+    Lista os instantâneos guardados, do mais antigo para o mais recente.
+    """
+    return jsonify(_snapshots().list())
+
+
+@bp.route("/snapshots/<old_id>/diff/<new_id>", methods=["GET"])
+def diff_snapshots_route(old_id, new_id):
+    """
+    Envia em NDJSON as mudanças do instantâneo `old_id` para `new_id`, uma
+    por linha, e por último o `resumo` com os totais. Aceita `max_pending`
+    (removidos/adicionados guardados à espera de uma movimentação). Os
+    instantâneos não mudam, então o ETag vem dos ids e das opções.
+    """
+    max_pending = request.args.get("max_pending", type=int, default=100_000)
+    try:
+        changes = _snapshots().diff(old_id, new_id, max_pending=max_pending)
+    except KeyError:
+        return "Instantâneo não encontrado.", 404
+    response = _ndjson_response(with_totals(changes))
+    return _with_etag(response, f"{old_id}-{new_id}-{max_pending}")
+
+
+@bp.route("/watcher", methods=["GET"])
+def watcher_route():
+    """
+    Retorna o backend e os totais de cada raiz observada
+    (404 quando não há raízes em `ANALYSIS_WATCH_ROOTS`).
+    """
+    watcher = _watcher()
+    if watcher is None:
+        return "Observador desligado.", 404
+    return jsonify(watcher.estado())
+
+
+@bp.route("/metrics", methods=["GET"])
+def metrics_route():
+    """
+    Retorna as métricas das fases da análise no formato texto do Prometheus
+    (404 quando desligadas por `ANALYSIS_METRICS=0`).
+    """
+    if not metrics.ENABLED:
+        return "Métricas desligadas.", 404
+    return Response(metrics.render(), content_type=PROMETHEUS_MIMETYPE)
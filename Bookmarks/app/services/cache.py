@@ -0,0 +1,246 @@
+# app/services/cache.py
+
+"""
+Cache em memória (TTL + LRU) para os resultados de análise de caminhos.
+
+Os resultados são guardados já serializados em JSON compacto: cada acerto
+devolve uma cópia nova (o chamador pode alterá-la à vontade) e o tamanho em
+bytes de cada entrada é conhecido exatamente para o limite de memória.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from app.services.serializer import get_serializer
+
+Assinatura = Tuple[Tuple[str, Optional[Tuple[int, int]]], ...]
+
+
+def normalize_paths(paths: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Normaliza os caminhos para a chave do cache, sem acessar o disco
+    (`os.path.abspath`, que também resolve `.` e `..` lexicalmente).
+    """
+    return tuple(os.path.abspath(path) for path in paths)
+
+
+def _root_signature(roots: Iterable[str]) -> Assinatura:
+    """`mtime`/`ctime` de cada raiz (ou `None` se ela não existir)."""
+    signature = []
+    for root in roots:
+        try:
+            info = os.stat(root)
+            signature.append((root, (info.st_mtime_ns, info.st_ctime_ns)))
+        except (OSError, ValueError):
+            signature.append((root, None))
+    return tuple(signature)
+
+
+class _Entry(NamedTuple):
+    payload: bytes
+    expires_at: float
+    signature: Optional[Assinatura]
+    versions: Dict[Hashable, str]
+
+
+class ResultCache:
+    """
+    Cache limitado por tempo de vida (`ttl`, em segundos), número de entradas
+    (`max_entries`) e bytes serializados (`max_bytes`), com descarte LRU.
+
+    Com `validate_mtime=True`, cada acerto refaz o `stat` das raízes
+    informadas em `put` e descarta a entrada se o `mtime`/`ctime` de alguma
+    delas mudou. Isso detecta entradas criadas ou removidas diretamente na
+    raiz; alterações mais profundas só aparecem quando o `ttl` expira. O
+    `stat` é feito fora da trava, sem bloquear os outros acessos ao cache.
+
+    Cada entrada pode guardar versões do valor (`set_version`), por exemplo
+    o hash de uma resposta montada com ele; elas são descartadas junto com a
+    entrada.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 5.0,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        validate_mtime: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.validate_mtime = validate_mtime
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.payload)
+
+    def _lookup(self, key: Hashable) -> Optional[_Entry]:
+        """Entrada válida da chave, ou `None`; descarta a expirada ou invalidada."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                self._discard(key)
+                self.expirations += 1
+                entry = None
+        if entry is not None and entry.signature is not None:
+            if _root_signature(root for root, _ in entry.signature) != entry.signature:
+                with self._lock:
+                    # Só descarta se a entrada não foi substituída durante o `stat`
+                    if self._entries.get(key) is entry:
+                        self._discard(key)
+                        self.invalidations += 1
+                entry = None
+        return entry
+
+    def _record(self, key: Hashable, entry: Optional[_Entry]) -> None:
+        """Conta o acerto (e marca a entrada como usada) ou o erro; exige a trava."""
+        if entry is None:
+            self.misses += 1
+            return
+        if self._entries.get(key) is entry:
+            self._entries.move_to_end(key)
+        self.hits += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna uma cópia do valor guardado, ou `None` se ausente/expirado/invalidado."""
+        entry = self._lookup(key)
+        with self._lock:
+            self._record(key, entry)
+        if entry is None:
+            return None
+        return get_serializer().loads(entry.payload)
+
+    def get_version(self, key: Hashable, variant: Hashable = None) -> Optional[str]:
+        """
+        Versão guardada por `set_version`, ou `None` se ela ou a entrada não
+        existir. Conta como um acesso à entrada, como `get`.
+        """
+        entry = self._lookup(key)
+        with self._lock:
+            self._record(key, entry)
+            return None if entry is None else entry.versions.get(variant)
+
+    def set_version(self, key: Hashable, version: str, variant: Hashable = None) -> bool:
+        """
+        Guarda uma versão junto com o valor da chave (uma por `variant`).
+        Retorna `False`, sem guardar, se a chave não estiver no cache.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry.versions[variant] = version
+            return True
+
+    def put(self, key: Hashable, value: Any, roots: Iterable[str] = ()) -> None:
+        """Guarda o valor; entradas maiores que `max_bytes` não são guardadas."""
+        if self.ttl <= 0:
+            return
+        payload = get_serializer().dumps_bytes(value)
+        if len(payload) > self.max_bytes:
+            return
+        signature = _root_signature(roots) if self.validate_mtime else None
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = _Entry(payload, self._clock() + self.ttl, signature, {})
+            self._bytes += len(payload)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Any], roots: Iterable[str] = ()
+    ) -> Any:
+        """
+        Retorna o valor guardado ou calcula, guarda e retorna um novo.
+        O cálculo é feito fora da trava, sem bloquear outros acessos ao cache.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value, roots)
+        return value
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de uso do cache."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def cached_call(
+    cache: Optional[ResultCache],
+    name: str,
+    paths: List[str],
+    options: Tuple,
+    compute: Callable[[], Any],
+) -> Any:
+    """
+    Aplica o cache (se houver) a uma análise identificada por `name`,
+    pelos caminhos normalizados e pelas opções que afetam o resultado.
+    """
+    if cache is None:
+        return compute()
+    roots = normalize_paths(paths)
+    return cache.get_or_compute((name, roots, options), compute, roots)
+
+
+async def cached_call_async(
+    cache: Optional[ResultCache],
+    name: str,
+    paths: List[str],
+    options: Tuple,
+    compute: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Versão de `cached_call` para análises assíncronas; usa as mesmas chaves,
+    então as versões síncrona e assíncrona compartilham as entradas.
+    """
+    if cache is None:
+        return await compute()
+    roots = normalize_paths(paths)
+    key = (name, roots, options)
+    value = cache.get(key)
+    if value is None:
+        value = await compute()
+        cache.put(key, value, roots)
+    return value
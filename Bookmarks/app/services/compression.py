@@ -0,0 +1,164 @@
+# pylint: disable=C
+# app/services/compression.py
+
+"""
+Compressão das respostas de análise conforme o `Accept-Encoding` do cliente.
+
+São oferecidos `zstd` (quando o pacote `zstandard` está instalado) e `gzip`
+(biblioteca padrão); entre os aceitos com a mesma preferência, `zstd` vem
+primeiro. Respostas com corpo pronto só são comprimidas a partir de
+`min_size` bytes. Respostas em fluxo (NDJSON) são comprimidas bloco a bloco,
+com um flush a cada bloco, para que cada parte chegue ao cliente assim que é
+produzida.
+
+A variável de ambiente `RESPONSE_CODECS` (ex.: `gzip`) limita os codecs
+oferecidos, na ordem de preferência.
+"""
+
+import gzip
+import importlib
+import os
+import zlib
+
+COMPRESSIBLE_MIMETYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/html",
+    "text/plain",
+)
+CODECS = ("zstd", "gzip")
+
+
+class GzipCodec:
+    """Codec `gzip` (zlib); as outras classes seguem a mesma interface."""
+
+    name = "gzip"
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        """
+        :param data: bytes
+        :return: bytes
+        """
+        return gzip.compress(data, self.level, mtime=0)
+
+    def iter_compress(self, chunks):
+        """
+        Comprime uma sequência de blocos, devolvendo cada bloco comprimido
+        assim que ele é lido.
+        :param chunks: iterable[bytes]
+        :return: iterator[bytes]
+        """
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+class ZstdCodec(GzipCodec):
+    """Codec `zstd` do pacote `zstandard`."""
+
+    name = "zstd"
+
+    def __init__(self, module, level=3):
+        super().__init__(level)
+        self._zstd = module
+
+    def compress(self, data):
+        # Um compressor por chamada: as instâncias não podem ser
+        # compartilhadas entre threads
+        return self._zstd.ZstdCompressor(level=self.level).compress(data)
+
+    def iter_compress(self, chunks):
+        compressor = self._zstd.ZstdCompressor(level=self.level).compressobj()
+        for chunk in chunks:
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush(
+                    self._zstd.COMPRESSOBJ_FLUSH_BLOCK
+                )
+        yield compressor.flush()
+
+
+def _load_codec(name):
+    """
+    Cria o codec pelo nome.
+    :raises ValueError: nome desconhecido
+    :raises ImportError: codec não instalado
+    """
+    if name == "gzip":
+        return GzipCodec()
+    if name == "zstd":
+        return ZstdCodec(importlib.import_module("zstandard"))
+    raise ValueError(f"Response codec '{name}' is not valid.")
+
+
+_codecs = {}
+
+
+def available_codecs():
+    """
+    Codecs instalados, na ordem de preferência (`RESPONSE_CODECS` ou `CODECS`),
+    carregados uma única vez por processo.
+    :return: dict[str, GzipCodec]
+    """
+    names = os.environ.get("RESPONSE_CODECS") or ",".join(CODECS)
+    codecs = _codecs.get(names)
+    if codecs is None:
+        codecs = {}
+        for name in (item.strip() for item in names.split(",")):
+            try:
+                codecs[name] = _load_codec(name)
+            except ImportError:
+                continue
+        _codecs[names] = codecs
+    return codecs
+
+
+def choose_codec(accept_encodings):
+    """
+    Codec preferido entre os aceitos pelo cliente.
+    :param accept_encodings: werkzeug.datastructures.Accept (`request.accept_encodings`)
+    :return: GzipCodec | None, None se o cliente não aceita nenhum
+    """
+    codecs = available_codecs()
+    best = accept_encodings.best_match(list(codecs))
+    return codecs.get(best) if best else None
+
+
+def compress_response(response, accept_encodings, min_size=1024):
+    """
+    Comprime a resposta no lugar quando o tipo é comprimível, o status é 200
+    e ela ainda não tem `Content-Encoding`. Acrescenta `Vary: Accept-Encoding`
+    mesmo quando o cliente não aceita nenhum codec.
+    :param response: flask.Response
+    :param accept_encodings: werkzeug.datastructures.Accept
+    :param min_size: int, menor corpo pronto comprimido (em bytes)
+    :return: flask.Response
+    """
+    if (
+        response.status_code != 200
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or "Content-Encoding" in response.headers
+        or response.direct_passthrough
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    codec = choose_codec(accept_encodings)
+    if codec is None:
+        return response
+    if response.is_streamed:
+        source = response.response
+        response.response = codec.iter_compress(response.iter_encoded())
+        if hasattr(source, "close"):
+            response.call_on_close(source.close)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(codec.compress(data))
+    response.headers["Content-Encoding"] = codec.name
+    return response
@@ -1,6 +1,15 @@
 # pylint: disable=C
 
+import asyncio
 import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.models.path_model import iterar_arvore_json
+from app.models.varredura import Varredura
+from app.services.cache import cached_call, cached_call_async
+from app.services.metrics import timed
 
 
 def validate_path(path):
@@ -8,24 +17,170 @@ def validate_path(path):
     return os.path.exists(path)
 
 
-def analyze_paths(paths):
+def _stat_path(path):
+    """
+    Faz o único `os.stat` necessário para analisar o caminho.
+    :param path: str
+    :return: os.stat_result | None
+    """
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _describe_path(path, info):
+    """
+    Monta o resultado da análise a partir do `stat` do caminho.
+    :param path: str
+    :param info: os.stat_result | None
+    :return: dict
+    """
+    if info is None:
+        return {"path": path, "exists": False}
+    result = {
+        "path": path,
+        "exists": True,
+        "is_file": stat.S_ISREG(info.st_mode),
+        "is_dir": stat.S_ISDIR(info.st_mode),
+    }
+    if result["is_file"]:
+        result["size"] = info.st_size
+    return result
+
+
+def _iter_stats(paths, workers):
+    """
+    Faz o `stat` de cada caminho, em série ou distribuído entre `workers`
+    threads, sempre devolvendo os pares na ordem de entrada.
+    :param paths: list[str]
+    :param workers: int
+    :return: iterator[tuple[str, os.stat_result | None]]
+    """
+    if not workers or workers < 2 or len(paths) < 2:
+        for path in paths:
+            yield path, _stat_path(path)
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        yield from zip(paths, executor.map(_stat_path, paths))
+
+
+def iter_analyze_paths(
+    paths, recursive=False, max_depth=None, max_entries=None, workers=0, query=None,
+    watcher=None,
+):
+    """
+    Versão geradora de `analyze_paths`: cada resultado é emitido assim que o
+    caminho é analisado. Com `recursive=True`, cada diretório é seguido pelos
+    nós da sua árvore, no formato de `iterar_arvore_json`.
+    :param paths: list[str]
+    :param recursive: bool
+    :param max_depth: int | None
+    :param max_entries: int | None
+    :param workers: int, threads usadas para os `stat` (0 ou 1 = em série)
+    :param query: Consulta | None, filtros aplicados durante a varredura recursiva
+    :param watcher: ObservadorArvores | None, percorre as raízes observadas em memória
+    :return: iterator[dict]
+    """
+    for path, info in _iter_stats(list(paths), workers):
+        result = _describe_path(path, info)
+        yield result
+        if recursive and result.get("is_dir"):
+            root = Path(path)
+            varredura = None
+            if watcher is not None:
+                varredura = watcher.varredura(path, info, max_depth, max_entries, query)
+            if varredura is None:
+                varredura = Varredura(root, info, max_depth, max_entries, consulta=query)
+            try:
+                yield from iterar_arvore_json(root, info, varredura)
+            except OSError as error:
+                yield {"caminho": path, "erro": error.strerror or str(error)}
+
+
+def _count_results(results, *_args, **_kwargs):
+    """Contadores das métricas: caminhos analisados e bytes dos arquivos."""
+    return {
+        "entries": len(results),
+        "bytes": sum(result.get("size", 0) for result in results),
+    }
+
+
+def _count_stats(_results, paths, *_args):
+    """Contadores das métricas: um `stat` por caminho."""
+    return {"syscalls": len(paths)}
+
+
+@timed("stat", count=_count_stats)
+def _analyze_uncached(paths, workers):
+    """
+    Faz os `stat` dos caminhos (sem cache).
+    :param paths: list[str]
+    :param workers: int
+    :return: list[dict]
+    """
+    return list(iter_analyze_paths(paths, workers=workers))
+
+
+@timed("analyze_paths", count=_count_results)
+def analyze_paths(paths, workers=0, cache=None):
     """
     Analisa uma lista de caminhos.
     :param paths: list[str]
+    :param workers: int, threads usadas para os `stat` (0 ou 1 = em série)
+    :param cache: ResultCache | None, reaproveita análises recentes dos mesmos caminhos
+    :return: list[dict]
+    """
+    paths = list(paths)
+    results = cached_call(
+        cache, "analyze_paths", paths, (),
+        lambda: _analyze_uncached(paths, workers),
+    )
+    for result, path in zip(results, paths):
+        result["path"] = path
+    return results
+
+
+@timed("stat", count=_count_stats)
+async def _analyze_paths_concurrently(paths, executor, concurrency):
+    """
+    Faz os `stat` no `executor` com no máximo `concurrency` chamadas em
+    andamento: `concurrency` corrotinas consomem a mesma lista de caminhos,
+    então não é criada uma tarefa por caminho.
+    :param paths: list[str]
+    :param executor: concurrent.futures.Executor | None (None = executor padrão do loop)
+    :param concurrency: int
+    :return: list[dict]
+    """
+    loop = asyncio.get_running_loop()
+    results = [None] * len(paths)
+    pending = iter(enumerate(paths))
+
+    async def consume():
+        for index, path in pending:
+            info = await loop.run_in_executor(executor, _stat_path, path)
+            results[index] = _describe_path(path, info)
+
+    await asyncio.gather(*(consume() for _ in range(min(max(concurrency, 1), len(paths)))))
+    return results
+
+
+@timed("analyze_paths", count=_count_results)
+async def analyze_paths_async(paths, executor=None, concurrency=16, cache=None):
+    """
+    Versão assíncrona de `analyze_paths`: os `stat` bloqueantes rodam num
+    executor limitado, sem ocupar o loop de eventos.
+    :param paths: list[str]
+    :param executor: concurrent.futures.Executor | None, compartilhado entre requisições
+    :param concurrency: int, máximo de `stat` em andamento nesta chamada
+    :param cache: ResultCache | None
     :return: list[dict]
     """
-    results = []
-    for path in paths:
-        if os.path.exists(path):
-            result = {
-                "path": path,
-                "exists": True,
-                "is_file": os.path.isfile(path),
-                "is_dir": os.path.isdir(path),
-            }
-            if result["is_file"]:
-                result["size"] = os.path.getsize(path)
-            results.append(result)
-        else:
-            results.append({"path": path, "exists": False})
+    paths = list(paths)
+    results = await cached_call_async(
+        cache, "analyze_paths", paths, (),
+        lambda: _analyze_paths_concurrently(paths, executor, concurrency),
+    )
+    for result, path in zip(results, paths):
+        result["path"] = path
     return results
@@ -0,0 +1,219 @@
+# app/services/jobs.py
+
+"""
+Fila local de tarefas para varreduras longas, sem broker externo.
+
+Cada tarefa percorre os caminhos com `iter_analyze_paths(recursive=True)` num
+pool de threads local e grava cada nó, como uma linha JSON, num arquivo de
+spool em disco: a memória usada não depende do tamanho da árvore. O progresso
+(entradas varridas e bytes dos arquivos) pode ser consultado durante a
+execução, e a tarefa pode ser cancelada antes ou durante a varredura.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent import futures
+
+from app.services.file_manager import iter_analyze_paths
+from app.services.serializer import get_serializer
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (DONE, FAILED, CANCELLED)
+PARTIAL_SUFFIX = ".part"
+
+
+class JobCancelled(Exception):
+    """Interrompe a varredura de uma tarefa cancelada."""
+
+
+class Job:
+    """Estado e progresso de uma tarefa de varredura."""
+
+    def __init__(self, job_id, paths, options, result_path):
+        self.id = job_id
+        self.paths = paths
+        self.options = options
+        self.result_path = result_path
+        self.status = QUEUED
+        self.entries_scanned = 0
+        self.bytes_scanned = 0
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.cancel_requested = threading.Event()
+
+    def wait(self, timeout=None):
+        """
+        Aguarda o fim da tarefa.
+        :param timeout: float | None, em segundos
+        :return: bool, True se a tarefa terminou
+        """
+        if self.future is not None and not self.future.cancelled():
+            try:
+                self.future.result(timeout)
+            except futures.TimeoutError:
+                return False
+        return self.status in FINISHED
+
+    def to_dict(self):
+        """
+        Resumo da tarefa para as rotas.
+        :return: dict
+        """
+        return {
+            "id": self.id,
+            "status": self.status,
+            "paths": len(self.paths),
+            "entries_scanned": self.entries_scanned,
+            "bytes_scanned": self.bytes_scanned,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Executa tarefas de varredura em `max_workers` threads e guarda os
+    resultados em `spool_dir`. Só as `max_finished` tarefas concluídas mais
+    recentes são mantidas; as mais antigas têm o arquivo de resultado apagado.
+    """
+
+    def __init__(self, spool_dir=None, max_workers=2, max_finished=100, executor=None):
+        """
+        :param spool_dir: str | None, diretório dos resultados (padrão: um diretório temporário)
+        :param max_workers: int, tarefas executadas ao mesmo tempo
+        :param max_finished: int, tarefas concluídas mantidas
+        :param executor: concurrent.futures.Executor | None, substitui o pool próprio
+        """
+        self.spool_dir = spool_dir or os.path.join(tempfile.gettempdir(), "analysis-jobs")
+        self.max_finished = max_finished
+        self._executor = executor or futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="analysis-job"
+        )
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+
+    def submit(self, paths, max_depth=None, max_entries=None, query=None):
+        """
+        Enfileira a varredura dos caminhos.
+        :param paths: list[str]
+        :param max_depth: int | None
+        :param max_entries: int | None
+        :param query: Consulta | None, filtros aplicados durante a varredura
+        :return: Job
+        """
+        os.makedirs(self.spool_dir, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        job = Job(
+            job_id,
+            list(paths),
+            {"max_depth": max_depth, "max_entries": max_entries, "query": query},
+            os.path.join(self.spool_dir, f"{job_id}.ndjson"),
+        )
+        job.future = self._executor.submit(self._run, job)
+        with self._lock:
+            self._jobs[job_id] = job
+        return job
+
+    def get(self, job_id):
+        """
+        :param job_id: str
+        :return: Job | None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancela a tarefa: se ainda estiver na fila ela não é executada; se
+        estiver em execução, a varredura para no próximo nó.
+        :param job_id: str
+        :return: Job | None
+        """
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        job.cancel_requested.set()
+        if job.future.cancel():
+            self._finish(job, CANCELLED)
+        return job
+
+    def _run(self, job):
+        """Executa a tarefa, gravando cada nó no spool assim que é produzido."""
+        if job.cancel_requested.is_set():
+            self._finish(job, CANCELLED)
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        partial_path = job.result_path + PARTIAL_SUFFIX
+        try:
+            dumps = get_serializer().dumps_bytes
+            with open(partial_path, "wb") as spool:
+                records = iter_analyze_paths(
+                    job.paths,
+                    recursive=True,
+                    max_depth=job.options["max_depth"],
+                    max_entries=job.options["max_entries"],
+                    query=job.options["query"],
+                )
+                for record in records:
+                    if job.cancel_requested.is_set():
+                        raise JobCancelled()
+                    spool.write(dumps(record) + b"\n")
+                    if "tipo" in record or record.get("is_file"):
+                        job.entries_scanned += 1
+                        job.bytes_scanned += record.get("tamanho") or record.get("size") or 0
+            os.replace(partial_path, job.result_path)
+        except JobCancelled:
+            _remove(partial_path)
+            self._finish(job, CANCELLED)
+        except Exception as error:  # pylint: disable=W0718
+            _remove(partial_path)
+            job.error = str(error)
+            self._finish(job, FAILED)
+        else:
+            self._finish(job, DONE)
+
+    def _finish(self, job, status):
+        """Marca a tarefa como concluída e descarta as concluídas mais antigas."""
+        job.status = status
+        job.finished_at = time.time()
+        with self._lock:
+            finished = [item for item in self._jobs.values() if item.status in FINISHED]
+            for old in finished[: max(len(finished) - self.max_finished, 0)]:
+                del self._jobs[old.id]
+                _remove(old.result_path)
+
+    def shutdown(self):
+        """
+        Cancela as tarefas pendentes, encerra o pool e apaga os resultados
+        parciais que ainda existam.
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            self.cancel(job.id)
+        self._executor.shutdown(wait=True)
+        for job in jobs:
+            _remove(job.result_path + PARTIAL_SUFFIX)
+
+
+def _remove(path):
+    """Apaga o arquivo, se existir."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
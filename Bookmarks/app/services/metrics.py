@@ -0,0 +1,135 @@
+# app/services/metrics.py
+
+"""
+Métricas das fases da análise (varredura, conversão para JSON, validação,
+serialização), expostas no formato texto do Prometheus.
+
+Cada função instrumentada com `timed` acumula a duração das chamadas por fase
+e, opcionalmente, contadores de chamadas ao sistema, entradas e bytes. A
+variável de ambiente `ANALYSIS_METRICS=0` desliga tudo: a decisão é tomada
+quando o decorador é aplicado (na importação), e as funções ficam sem nenhum
+invólucro, ou seja, sem custo algum.
+"""
+
+import functools
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("ANALYSIS_METRICS", "1").lower() not in ("0", "false", "no", "off")
+
+# Flag de `co_flags` das funções `async def` (evita importar `inspect`/`asyncio`)
+_CO_COROUTINE = 0x80
+
+COUNTERS = {
+    "syscalls": "Chamadas ao sistema (scandir e stat) feitas pela fase.",
+    "entries": "Entradas (arquivos, diretórios ou caminhos) processadas pela fase.",
+    "bytes": "Bytes contabilizados pela fase (tamanho dos arquivos ou do JSON gerado).",
+}
+
+
+class Registry:
+    """Acumula durações e contadores por fase, de forma segura entre threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._counters = {}
+
+    def observe(self, phase, seconds, counts=None):
+        """
+        Registra uma chamada da fase.
+        :param phase: str
+        :param seconds: float, duração da chamada
+        :param counts: dict[str, int] | None, incrementos de `COUNTERS`
+        """
+        with self._lock:
+            total, calls = self._durations.get(phase, (0.0, 0))
+            self._durations[phase] = (total + seconds, calls + 1)
+            for name, value in (counts or {}).items():
+                key = (name, phase)
+                self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self):
+        """
+        :return: dict com `durations` ({fase: (segundos, chamadas)}) e
+            `counters` ({(contador, fase): valor})
+        """
+        with self._lock:
+            return {"durations": dict(self._durations), "counters": dict(self._counters)}
+
+    def reset(self):
+        """Zera todas as métricas."""
+        with self._lock:
+            self._durations.clear()
+            self._counters.clear()
+
+    def render(self):
+        """
+        Gera as métricas no formato texto do Prometheus.
+        :return: str
+        """
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP analysis_phase_seconds Duração das chamadas de cada fase da análise.",
+            "# TYPE analysis_phase_seconds summary",
+        ]
+        for phase, (total, calls) in sorted(snapshot["durations"].items()):
+            lines.append(f'analysis_phase_seconds_sum{{phase="{phase}"}} {total:.9f}')
+            lines.append(f'analysis_phase_seconds_count{{phase="{phase}"}} {calls}')
+        for name, description in COUNTERS.items():
+            lines.append(f"# HELP analysis_{name}_total {description}")
+            lines.append(f"# TYPE analysis_{name}_total counter")
+            for (counter, phase), value in sorted(snapshot["counters"].items()):
+                if counter == name:
+                    lines.append(f'analysis_{name}_total{{phase="{phase}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def timed(phase, count=None):
+    """
+    Decorador que mede a duração de cada chamada na fase `phase`.
+    Com as métricas desligadas, retorna a própria função.
+    :param phase: str
+    :param count: callable | None, `count(result, *args, **kwargs)` retorna
+        os incrementos dos contadores (`syscalls`, `entries`, `bytes`)
+    """
+
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        if func.__code__.co_flags & _CO_COROUTINE:
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                result = await func(*args, **kwargs)
+                elapsed = time.perf_counter() - start
+                REGISTRY.observe(phase, elapsed, count and count(result, *args, **kwargs))
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            REGISTRY.observe(phase, elapsed, count and count(result, *args, **kwargs))
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def render():
+    """
+    Métricas acumuladas no processo, no formato texto do Prometheus.
+    :return: str
+    """
+    return REGISTRY.render()
@@ -0,0 +1,230 @@
+# app/services/serializer.py
+
+"""
+Serialização JSON dos resultados de análise, com backend plugável.
+
+A saída é compacta por padrão (sem indentação nem espaços), e a indentação só
+é usada quando pedida (`pretty=True`). O backend é escolhido na primeira vez
+que é usado: `orjson` ou `msgspec` quando instalados, senão a biblioteca
+padrão. A variável de ambiente `JSON_BACKEND` (`orjson`, `msgspec`, `json` ou
+`auto`) força a escolha.
+
+Nomes de arquivo que não são UTF-8 válido chegam do `os.scandir` com
+substitutos isolados (ex.: `"\\udcff"`), que não podem ser gravados em UTF-8.
+Nesse caso o valor é serializado de novo com `ensure_ascii=True`: os
+substitutos saem escapados (`\\udcff`) e voltam iguais no `loads` (que usa
+a biblioteca padrão quando o backend rápido os recusa).
+
+Listas grandes podem ser escritas item a item numa resposta em fluxo ou num
+arquivo (`iter_array`, `iter_lines`, `write_array`, `write_lines`), sem montar
+uma única string com todo o resultado.
+"""
+
+import importlib
+import json
+import os
+
+from app.services.metrics import timed
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+class JsonBackend:
+    """Backend da biblioteca padrão; as outras classes seguem a mesma interface."""
+
+    name = "json"
+
+    def dumps(self, value, pretty=False):
+        """
+        :param value: objeto serializável
+        :param pretty: bool, indenta com 2 espaços
+        :return: bytes (UTF-8)
+        """
+        try:
+            return self._dumps_stdlib(value, pretty, ensure_ascii=False).encode("utf-8")
+        except UnicodeEncodeError:
+            return self._dumps_escaped(value, pretty)
+
+    @staticmethod
+    def _dumps_stdlib(value, pretty, ensure_ascii):
+        if pretty:
+            return json.dumps(value, ensure_ascii=ensure_ascii, indent=2)
+        return json.dumps(value, ensure_ascii=ensure_ascii, separators=(",", ":"))
+
+    def _dumps_escaped(self, value, pretty):
+        """
+        Saída ASCII, com os caracteres não ASCII escapados; usada para
+        strings com substitutos isolados, que não existem em UTF-8.
+        :return: bytes
+        """
+        return self._dumps_stdlib(value, pretty, ensure_ascii=True).encode("ascii")
+
+    def loads(self, data):
+        """
+        :param data: str | bytes
+        :return: objeto decodificado
+        :raises ValueError: se o JSON for inválido
+        """
+        return json.loads(data)
+
+
+class OrjsonBackend(JsonBackend):
+    """Backend `orjson` (saída já em bytes UTF-8)."""
+
+    name = "orjson"
+
+    def __init__(self, module):
+        self._orjson = module
+
+    def dumps(self, value, pretty=False):
+        option = self._orjson.OPT_INDENT_2 if pretty else 0
+        try:
+            return self._orjson.dumps(value, option=option)
+        except self._orjson.JSONEncodeError:
+            # Substitutos isolados; tipos não serializáveis falham de novo aqui
+            return self._dumps_escaped(value, pretty)
+
+    def loads(self, data):
+        try:
+            return self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            # O orjson recusa substitutos isolados escapados (`\udcff`)
+            return json.loads(data)
+
+
+class MsgspecBackend(JsonBackend):
+    """Backend `msgspec.json`."""
+
+    name = "msgspec"
+
+    def __init__(self, module):
+        self._json = module.json
+        self._decode_error = module.DecodeError
+
+    def dumps(self, value, pretty=False):
+        try:
+            data = self._json.encode(value)
+        except UnicodeEncodeError:
+            return self._dumps_escaped(value, pretty)
+        return self._json.format(data, indent=2) if pretty else data
+
+    def loads(self, data):
+        try:
+            return self._json.decode(data)
+        except self._decode_error as error:
+            try:
+                return json.loads(data)
+            except ValueError:
+                raise ValueError(str(error)) from error
+
+
+class Serializer:
+    """
+    Serializa valores e sequências de valores com o backend escolhido.
+    """
+
+    def __init__(self, backend):
+        """
+        :param backend: JsonBackend
+        """
+        self.backend = backend
+        self.name = backend.name
+
+    def dumps(self, value, pretty=False):
+        """
+        :return: str
+        """
+        return self.dumps_bytes(value, pretty).decode("utf-8")
+
+    @timed("json_encode", count=lambda data, *_, **__: {"bytes": len(data)})
+    def dumps_bytes(self, value, pretty=False):
+        """
+        :return: bytes (UTF-8)
+        """
+        return self.backend.dumps(value, pretty)
+
+    def loads(self, data):
+        """
+        Decodifica `str` ou `bytes` (sem precisar decodificar o texto antes).
+        :raises ValueError: se o JSON for inválido
+        """
+        return self.backend.loads(data)
+
+    def iter_array(self, items):
+        """
+        Gera um array JSON em pedaços, um por item.
+        :param items: iterable
+        :return: iterator[bytes]
+        """
+        dumps = self.backend.dumps
+        separator = b"["
+        for item in items:
+            yield separator + dumps(item)
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+
+    def iter_lines(self, records):
+        """
+        Gera NDJSON: um objeto por linha.
+        :param records: iterable
+        :return: iterator[bytes]
+        """
+        dumps = self.backend.dumps
+        for record in records:
+            yield dumps(record) + b"\n"
+
+    def write_array(self, stream, items):
+        """
+        Escreve um array JSON num arquivo binário, item a item.
+        :param stream: arquivo aberto em modo binário
+        :param items: iterable
+        """
+        for chunk in self.iter_array(items):
+            stream.write(chunk)
+
+    def write_lines(self, stream, records):
+        """
+        Escreve NDJSON num arquivo binário, registro a registro.
+        :param stream: arquivo aberto em modo binário
+        :param records: iterable
+        """
+        for line in self.iter_lines(records):
+            stream.write(line)
+
+
+def _load_backend(name):
+    """
+    Cria o backend pelo nome; `auto` usa o primeiro disponível.
+    :raises ValueError: nome desconhecido
+    :raises ImportError: backend não instalado
+    """
+    if name == "auto":
+        for candidate in BACKENDS:
+            try:
+                return _load_backend(candidate)
+            except ImportError:
+                continue
+    if name == "json":
+        return JsonBackend()
+    if name == "orjson":
+        return OrjsonBackend(importlib.import_module("orjson"))
+    if name == "msgspec":
+        return MsgspecBackend(importlib.import_module("msgspec"))
+    raise ValueError(f"JSON backend '{name}' is not valid.")
+
+
+_serializers = {}
+
+
+def get_serializer(backend=None):
+    """
+    Retorna o serializador do backend (padrão: `JSON_BACKEND` ou `auto`),
+    criado uma única vez por processo.
+    :param backend: str | None
+    :return: Serializer
+    """
+    name = backend or os.environ.get("JSON_BACKEND", "auto")
+    serializer = _serializers.get(name)
+    if serializer is None:
+        serializer = _serializers[name] = Serializer(_load_backend(name))
+    return serializer
@@ -0,0 +1,149 @@
+# app/services/snapshots.py
+
+"""
+Instantâneos de árvores guardados em disco e comparados sob demanda.
+
+Cada instantâneo é um arquivo binário (ver `app.models.instantaneo`) em
+`directory`, identificado por um id gerado na criação. Só os `max_snapshots`
+mais recentes são mantidos. A comparação lê os dois arquivos em fluxo: a
+memória usada não depende do tamanho das árvores.
+"""
+
+import os
+import re
+import tempfile
+import threading
+import uuid
+
+from app.models.instantaneo import LeitorInstantaneo, comparar_instantaneos, gravar_instantaneo
+
+SNAPSHOT_SUFFIX = ".snap"
+_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+class SnapshotStore:
+    """
+    Cria, lista e compara os instantâneos guardados em `directory`.
+    """
+
+    def __init__(self, directory=None, max_snapshots=100):
+        """
+        :param directory: str | None, diretório dos instantâneos (padrão: temporário)
+        :param max_snapshots: int, instantâneos mantidos
+        """
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "analysis-snapshots")
+        self.max_snapshots = max_snapshots
+        self._lock = threading.Lock()
+
+    def _path(self, snapshot_id):
+        """
+        :return: str | None, None se o id for inválido
+        """
+        if not isinstance(snapshot_id, str) or not _ID_PATTERN.fullmatch(snapshot_id):
+            return None
+        return os.path.join(self.directory, snapshot_id + SNAPSHOT_SUFFIX)
+
+    @staticmethod
+    def _describe(snapshot_id, path, header):
+        return {
+            "id": snapshot_id,
+            "root": header["raiz"],
+            "created_at": header["criado_em"],
+            "max_depth": header.get("max_profundidade"),
+            "filtered": header.get("filtrado", False),
+            "bytes": os.path.getsize(path),
+        }
+
+    def create(self, path, max_depth=None, query=None):
+        """
+        Varre o diretório e grava um novo instantâneo.
+        :param path: str
+        :param max_depth: int | None
+        :param query: Consulta | None, filtros aplicados durante a varredura
+        :return: dict, resumo do instantâneo (com `entries`)
+        :raises ValueError: se o caminho não for um diretório
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot_id = uuid.uuid4().hex
+        destination = self._path(snapshot_id)
+        header = gravar_instantaneo(path, destination, max_profundidade=max_depth, consulta=query)
+        summary = self._describe(snapshot_id, destination, header)
+        summary["entries"] = header["entradas"]
+        self._prune()
+        return summary
+
+    def _prune(self):
+        """Apaga os instantâneos mais antigos além de `max_snapshots`."""
+        with self._lock:
+            snapshots = self.list()
+            for old in snapshots[: max(len(snapshots) - self.max_snapshots, 0)]:
+                try:
+                    os.remove(self._path(old["id"]))
+                except OSError:
+                    pass
+
+    def get(self, snapshot_id):
+        """
+        :param snapshot_id: str
+        :return: dict | None, None se não existir
+        """
+        path = self._path(snapshot_id)
+        if path is None:
+            return None
+        try:
+            return self._describe(snapshot_id, path, LeitorInstantaneo(path).cabecalho)
+        except (OSError, ValueError):
+            return None
+
+    def list(self):
+        """
+        Instantâneos guardados, do mais antigo para o mais recente.
+        :return: list[dict]
+        """
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        snapshots = []
+        for name in names:
+            if name.endswith(SNAPSHOT_SUFFIX):
+                snapshot = self.get(name[: -len(SNAPSHOT_SUFFIX)])
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+        snapshots.sort(key=lambda snapshot: snapshot["created_at"])
+        return snapshots
+
+    def diff(self, old_id, new_id, max_pending=100_000):
+        """
+        Mudanças do instantâneo `old_id` para `new_id` (ver
+        `comparar_instantaneos`), produzidas durante a leitura.
+        :param old_id: str
+        :param new_id: str
+        :param max_pending: int, removidos/adicionados guardados à espera do par
+        :return: iterator[dict]
+        :raises KeyError: se algum dos instantâneos não existir
+        """
+        readers = []
+        for snapshot_id in (old_id, new_id):
+            path = self._path(snapshot_id)
+            if path is None:
+                raise KeyError(snapshot_id)
+            try:
+                readers.append(LeitorInstantaneo(path))
+            except (OSError, ValueError) as error:
+                raise KeyError(snapshot_id) from error
+        return comparar_instantaneos(*readers, max_pendentes=max_pending)
+
+
+def with_totals(changes):
+    """
+    Repassa as mudanças e, no final, um registro `{"resumo": {...}}` com o
+    total de cada tipo de mudança.
+    :param changes: iterable[dict]
+    :return: iterator[dict]
+    """
+    totals = {"adicionado": 0, "removido": 0, "modificado": 0, "movido": 0}
+    for change in changes:
+        totals[change["mudanca"]] += 1
+        yield change
+    yield {"resumo": totals}
@@ -1,18 +1,226 @@
 # pylint: disable=C
+# app/services/text_analysis.py
 
-def analyze_text(text):
+"""
+Análise de textos: contagem de caracteres, palavras e linhas, palavras mais
+frequentes e estimativa de palavras distintas.
+
+`TextAnalyzer` recebe o texto em partes (`feed`) e não guarda o texto: a
+memória usada depende do número de palavras distintas acompanhadas
+(`max_tracked`) e não do tamanho da entrada. `analyze_stream` lê um arquivo
+ou o corpo da requisição em blocos; `analyze_text` analisa um texto já em
+memória e, por padrão, também devolve o texto e a lista de palavras (`echo`).
+
+Palavras são as partes separadas por espaços em branco (como em
+`str.split()`), comparadas sem diferenciar maiúsculas (`str.casefold`) nas
+frequências e na contagem de distintas.
+"""
+
+import codecs
+import heapq
+from collections import Counter
+from operator import itemgetter
+
+from app.services.metrics import timed
+
+_HASH_MASK = (1 << 64) - 1
+
+
+class DistinctCounter:
+    """
+    Estimativa do número de valores distintos pelo método dos k menores
+    valores (KMV): guarda só os `k` menores hashes vistos. Até `k` valores
+    distintos a contagem é exata; acima disso, o erro relativo típico é de
+    `1 / sqrt(k)` (cerca de 3% com `k=1024`).
+    """
+
+    def __init__(self, k=1024):
+        self.k = k
+        self._heap = []
+        self._members = set()
+
+    def add_hash(self, value):
+        """
+        :param value: int, hash de 64 bits do valor
+        """
+        if value in self._members:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, -value)
+            self._members.add(value)
+        elif value < -self._heap[0]:
+            removed = -heapq.heapreplace(self._heap, -value)
+            self._members.discard(removed)
+            self._members.add(value)
+
+    @property
+    def exact(self):
+        """Indica se a contagem ainda é exata."""
+        return len(self._heap) < self.k
+
+    def estimate(self):
+        """
+        :return: int, valores distintos (exato ou estimado)
+        """
+        if self.exact:
+            return len(self._heap)
+        kth = -self._heap[0]
+        return round((self.k - 1) * (_HASH_MASK + 1) / (kth + 1))
+
+
+class TextAnalyzer:
+    """
+    Acumula as estatísticas de um texto recebido em partes.
+
+    As frequências são guardadas num `Counter` limitado: quando ele passa de
+    `2 * max_tracked` palavras, só as `max_tracked` mais frequentes são
+    mantidas. Depois disso, as contagens do top-K são aproximadas (limites
+    inferiores) e `top_words_exact` fica `False`.
+
+    :param top_k: int, palavras mais frequentes no resultado
+    :param max_tracked: int, palavras distintas mantidas no contador
+    :param distinct_k: int, hashes guardados para estimar as distintas
+    :param keep_words: bool, guarda a lista de palavras para o `echo`
+    """
+
+    def __init__(self, top_k=10, max_tracked=50_000, distinct_k=1024, keep_words=False):
+        self.top_k = top_k
+        self.max_tracked = max_tracked
+        self.char_count = 0
+        self.word_count = 0
+        self._newlines = 0
+        self._last_char = ""
+        self._partial = []
+        self._counts = Counter()
+        self._pruned = False
+        self._distinct = DistinctCounter(distinct_k)
+        self._words = [] if keep_words else None
+
+    def feed(self, chunk):
+        """
+        Acrescenta uma parte do texto. Uma palavra pode começar numa parte e
+        terminar na seguinte.
+        :param chunk: str
+        """
+        if not chunk:
+            return
+        self.char_count += len(chunk)
+        self._newlines += chunk.count("\n")
+        self._last_char = chunk[-1]
+        starts_word = not chunk[0].isspace()
+        ends_word = not chunk[-1].isspace()
+        words = chunk.split()
+        if len(words) == 1 and starts_word and ends_word:
+            self._partial.append(chunk)
+            return
+        if self._partial:
+            if starts_word and words:
+                words[0] = "".join(self._partial) + words[0]
+            else:
+                words.insert(0, "".join(self._partial))
+            self._partial = []
+        if ends_word and words:
+            self._partial.append(words.pop())
+        self._add(words)
+
+    def _add(self, words):
+        if not words:
+            return
+        self.word_count += len(words)
+        if self._words is not None:
+            self._words.extend(words)
+        folded = list(map(str.casefold, words))
+        self._counts.update(folded)
+        add_hash = self._distinct.add_hash
+        for word in set(folded):
+            add_hash(hash(word) & _HASH_MASK)
+        if len(self._counts) > 2 * self.max_tracked:
+            self._counts = Counter(dict(self._counts.most_common(self.max_tracked)))
+            self._pruned = True
+
+    def close(self):
+        """Conclui a última palavra (se o texto não terminar em espaço)."""
+        if self._partial:
+            words = ["".join(self._partial)]
+            self._partial = []
+            self._add(words)
+
+    @property
+    def line_count(self):
+        """Linhas separadas por `\\n` (a última pode não terminar em `\\n`)."""
+        return self._newlines + (1 if self._last_char and self._last_char != "\n" else 0)
+
+    def result(self):
+        """
+        :return: dict com as contagens, `top_words` ([{"word", "count"}]) e
+            `unique_words` (com `unique_words_exact`)
+        """
+        self.close()
+        top = heapq.nlargest(self.top_k, self._counts.items(), key=itemgetter(1))
+        result = {
+            "char_count": self.char_count,
+            "word_count": self.word_count,
+            "line_count": self.line_count,
+            "unique_words": self._distinct.estimate(),
+            "unique_words_exact": self._distinct.exact,
+            "top_words": [
+                {"word": word, "count": count}
+                for word, count in sorted(top, key=lambda item: (-item[1], item[0]))
+            ],
+            "top_words_exact": not self._pruned,
+        }
+        if self._words is not None:
+            result["words"] = self._words
+        return result
+
+
+def _count_text(result, *_args, **_kwargs):
+    """Contadores das métricas: palavras e caracteres analisados."""
+    return {"entries": result["word_count"], "bytes": result["char_count"]}
+
+
+@timed("analyze_text", count=_count_text)
+def analyze_text(text, echo=True, top_k=10, max_tracked=50_000):
     """
     Analisa um texto fornecido.
     :param text: str
+    :param echo: bool, inclui `original_text` e `words` no resultado
+    :param top_k: int, palavras mais frequentes no resultado
+    :param max_tracked: int, palavras distintas mantidas no contador
     :return: dict
     """
-    words = text.split()
-    char_count = len(text)
-    word_count = len(words)
+    analyzer = TextAnalyzer(top_k, max_tracked, keep_words=echo)
+    analyzer.feed(text)
+    result = analyzer.result()
+    if echo:
+        result["original_text"] = text
+    return result
+
 
-    return {
-        "original_text": text,
-        "char_count": char_count,
-        "word_count": word_count,
-        "words": words
-    }
+@timed("analyze_text", count=_count_text)
+def analyze_stream(stream, encoding="utf-8", chunk_size=64 * 1024, top_k=10, max_tracked=50_000):
+    """
+    Analisa o conteúdo de um arquivo aberto (texto ou binário), lido em
+    blocos de `chunk_size`, sem guardar o texto. Bytes são decodificados de
+    forma incremental, com `errors="replace"`.
+    :param stream: objeto com `read(n)` retornando str ou bytes
+    :param encoding: str, codificação dos bytes
+    :param chunk_size: int
+    :param top_k: int
+    :param max_tracked: int
+    :return: dict, sem os campos de `echo`
+    """
+    analyzer = TextAnalyzer(top_k, max_tracked)
+    decoder = None
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            chunk = decoder.decode(chunk)
+        analyzer.feed(chunk)
+    if decoder is not None:
+        analyzer.feed(decoder.decode(b"", final=True))
+    return analyzer.result()
@@ -14,9 +14,10 @@ Returns:
     ou `None` se as entradas forem válidas.
 """
 
-import json
+import sys
 from typing import List, Optional
 from src.controllers.controle_caminhos import ControladorDeCaminhos
+from app.services.serializer import get_serializer
 
 
 def validar_entradas(caminhos: List[str], extensoes: Optional[List[str]]):
@@ -97,8 +98,9 @@ def exibir_resultados(
                         resultado["conteudo"], extensoes
                     )
 
-        # Exibe os resultados
-        print(json.dumps(resultados_json, ensure_ascii=False, indent=4))
+        # Exibe os resultados, item a item, sem montar uma string única
+        get_serializer().write_array(sys.stdout.buffer, resultados_json)
+        sys.stdout.buffer.write(b"\n")
 
     except (ValueError, TypeError, FileNotFoundError, PermissionError) as e:
         print(f"Erro ao processar caminhos: {e}")
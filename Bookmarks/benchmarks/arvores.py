@@ -0,0 +1,149 @@
+# benchmarks/arvores.py
+
+"""
+Gera árvores sintéticas e reprodutíveis para os benchmarks.
+
+Uso (a partir de `Bookmarks/`):
+
+    python -m benchmarks.arvores /dev/shm/arvore --shape wide --scale 2
+
+Formas disponíveis:
+
+- `wide`: um único nível com muitas pastas e centenas de arquivos em cada;
+- `deep`: cadeias longas de pastas aninhadas, com poucos arquivos por nível;
+- `tiny`: muitos arquivos minúsculos (0 a 64 bytes) em dois níveis de pastas.
+
+A mesma forma, escala e semente geram sempre os mesmos nomes e tamanhos. Os
+arquivos grandes são esparsos (`truncate`): o `stat` informa o tamanho, mas
+nada é gravado no disco, o que mantém a árvore pequena mesmo em `tmpfs`.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+
+FORMAS = ("wide", "deep", "tiny")
+
+_EXTENSOES = (".txt", ".py", ".md", ".json", ".png", ".zip", "")
+
+
+def diretorio_temporario():
+    """
+    Diretório base das árvores: `/dev/shm` (tmpfs) quando disponível, para
+    medir o custo das chamadas e não o do disco; senão o temporário padrão.
+    """
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _criar_arquivo(caminho, tamanho):
+    """Cria o arquivo com o tamanho pedido, sem gravar o conteúdo (esparso)."""
+    with open(caminho, "wb") as arquivo:
+        if tamanho:
+            arquivo.truncate(tamanho)
+
+
+def _nome_arquivo(sorteio, indice):
+    """Nome do arquivo com uma extensão sorteada."""
+    return f"arquivo_{indice:05d}{sorteio.choice(_EXTENSOES)}"
+
+
+def _larga(raiz, escala, sorteio):
+    """50 pastas (vezes a escala) com 200 arquivos de até 1 MiB cada."""
+    for indice_pasta in range(50 * escala):
+        pasta = os.path.join(raiz, f"pasta_{indice_pasta:05d}")
+        os.mkdir(pasta)
+        for indice in range(200):
+            caminho = os.path.join(pasta, _nome_arquivo(sorteio, indice))
+            _criar_arquivo(caminho, sorteio.randint(0, 1024 * 1024))
+
+
+def _profunda(raiz, escala, sorteio):
+    """4 cadeias (vezes a escala) de 100 níveis, com 5 arquivos por nível."""
+    for indice_cadeia in range(4 * escala):
+        pasta = os.path.join(raiz, f"cadeia_{indice_cadeia:03d}")
+        for nivel in range(100):
+            os.mkdir(pasta)
+            for indice in range(5):
+                caminho = os.path.join(pasta, _nome_arquivo(sorteio, indice))
+                _criar_arquivo(caminho, sorteio.randint(0, 64 * 1024))
+            pasta = os.path.join(pasta, f"n{nivel:03d}")
+
+
+def _minusculos(raiz, escala, sorteio):
+    """20 pastas (vezes a escala) com 20 subpastas de 25 arquivos de até 64 bytes."""
+    for indice_pasta in range(20 * escala):
+        for indice_sub in range(20):
+            pasta = os.path.join(raiz, f"pasta_{indice_pasta:04d}", f"sub_{indice_sub:02d}")
+            os.makedirs(pasta)
+            for indice in range(25):
+                caminho = os.path.join(pasta, _nome_arquivo(sorteio, indice))
+                with open(caminho, "wb") as arquivo:
+                    arquivo.write(b"x" * sorteio.randint(0, 64))
+
+
+_GERADORES = {"wide": _larga, "deep": _profunda, "tiny": _minusculos}
+
+
+def criar_arvore(raiz, forma, escala=1, semente=0):
+    """
+    Cria a árvore sintética em `raiz` (que não pode existir).
+    :param raiz: str
+    :param forma: str, uma de `FORMAS`
+    :param escala: int, multiplica o número de pastas/cadeias
+    :param semente: int, semente dos nomes e tamanhos
+    :return: dict com `arquivos`, `diretorios` e `bytes` criados
+    """
+    if forma not in _GERADORES:
+        raise ValueError(f"Forma '{forma}' desconhecida; use uma de {FORMAS}.")
+    os.mkdir(raiz)
+    _GERADORES[forma](raiz, escala, random.Random(f"{forma}:{escala}:{semente}"))
+    return contar_arvore(raiz)
+
+
+def contar_arvore(raiz):
+    """
+    Conta arquivos, diretórios (sem a raiz) e bytes da árvore.
+    :param raiz: str
+    :return: dict
+    """
+    totais = {"arquivos": 0, "diretorios": 0, "bytes": 0}
+    for pasta, subpastas, arquivos in os.walk(raiz):
+        totais["diretorios"] += len(subpastas)
+        totais["arquivos"] += len(arquivos)
+        totais["bytes"] += sum(os.stat(os.path.join(pasta, nome)).st_size for nome in arquivos)
+    return totais
+
+
+def listar_arquivos(raiz):
+    """
+    Caminhos de todos os arquivos da árvore, em ordem determinística.
+    :param raiz: str
+    :return: list[str]
+    """
+    caminhos = []
+    for pasta, subpastas, arquivos in os.walk(raiz):
+        subpastas.sort()
+        caminhos.extend(os.path.join(pasta, nome) for nome in sorted(arquivos))
+    return caminhos
+
+
+def main():
+    """Cria uma árvore sintética e imprime seus totais."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("destino")
+    parser.add_argument("--shape", choices=FORMAS, default="wide")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    totais = criar_arvore(args.destino, args.shape, args.scale, args.seed)
+    print(
+        f"{args.destino}: {totais['arquivos']} arquivos, "
+        f"{totais['diretorios']} diretórios, {totais['bytes']} bytes"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_analyze_paths.py
+
+"""
+Compara `analyze_paths` em série com o modo de threads (`workers`).
+
+Uso (a partir de `Bookmarks/`):
+
+    python -m benchmarks.bench_analyze_paths --paths 5000 --workers 8 \\
+        --simulated-latency-ms 2
+
+`--simulated-latency-ms` acrescenta uma espera a cada `os.stat`, imitando a
+latência de um ponto de montagem de rede (NFS), onde o ganho das threads
+aparece; em disco local o modo em série costuma ser suficiente.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.services import file_manager
+
+
+def _criar_caminhos(raiz, quantidade):
+    """Cria metade dos caminhos como arquivos; a outra metade não existe."""
+    caminhos = []
+    for indice in range(quantidade):
+        caminho = os.path.join(raiz, f"arquivo_{indice}.txt")
+        if indice % 2 == 0:
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                arquivo.write("x" * indice)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def _simular_latencia(segundos):
+    """Envolve `os.stat` com uma espera fixa (que libera o GIL, como uma chamada de rede)."""
+    stat_original = os.stat
+
+    def stat_lento(*args, **kwargs):
+        time.sleep(segundos)
+        return stat_original(*args, **kwargs)
+
+    os.stat = stat_lento
+    return stat_original
+
+
+def _medir(caminhos, workers, repeticoes):
+    """Retorna o melhor tempo de `analyze_paths` entre as repetições."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        file_manager.analyze_paths(caminhos, workers=workers)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    """Executa o benchmark e imprime os tempos de cada modo."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paths", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--simulated-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as raiz:
+        caminhos = _criar_caminhos(raiz, args.paths)
+        if args.simulated_latency_ms:
+            stat_original = _simular_latencia(args.simulated_latency_ms / 1000)
+        try:
+            serial = _medir(caminhos, 0, args.repeat)
+            paralelo = _medir(caminhos, args.workers, args.repeat)
+        finally:
+            if args.simulated_latency_ms:
+                os.stat = stat_original
+        assert file_manager.analyze_paths(caminhos) == file_manager.analyze_paths(
+            caminhos, workers=args.workers
+        )
+
+    print(f"caminhos: {args.paths}  latência simulada: {args.simulated_latency_ms} ms")
+    print(f"em série:            {serial * 1000:10.2f} ms")
+    print(f"{args.workers:2d} threads:          {paralelo * 1000:10.2f} ms")
+    print(f"aceleração:          {serial / paralelo:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
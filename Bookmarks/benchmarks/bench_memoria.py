@@ -0,0 +1,78 @@
+# benchmarks/bench_memoria.py
+
+"""
+Mede a memória por entrada das representações de uma árvore varrida.
+
+Uso (a partir de `Bookmarks/`):
+
+    python -m benchmarks.bench_memoria --dirs 200 --files-per-dir 250
+
+Compara `Diretorio` (um objeto por entrada), o JSON aninhado de
+`montar_arvore_json` e `ArvoreColunar`, medindo com `tracemalloc` a memória
+que continua alocada depois da construção de cada uma.
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from app.models.colunar import ArvoreColunar
+from app.models.path_model import Diretorio, montar_arvore_json
+from app.models.varredura import Varredura
+
+_EXTENSOES = (".txt", ".py", ".md", ".json", ".png")
+
+
+def _criar_arvore(raiz, diretorios, arquivos_por_diretorio):
+    """Cria `diretorios` pastas com `arquivos_por_diretorio` arquivos cada."""
+    for indice_dir in range(diretorios):
+        pasta = os.path.join(raiz, f"pasta_{indice_dir:05d}")
+        os.mkdir(pasta)
+        for indice in range(arquivos_por_diretorio):
+            nome = f"arquivo_{indice:05d}{_EXTENSOES[indice % len(_EXTENSOES)]}"
+            with open(os.path.join(pasta, nome), "w", encoding="utf-8"):
+                pass
+
+
+def _medir(construir):
+    """Retorna o objeto construído e os bytes que ele mantém alocados."""
+    gc.collect()
+    tracemalloc.start()
+    objeto = construir()
+    gc.collect()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objeto, atual
+
+
+def main():
+    """Executa o benchmark e imprime os bytes por entrada de cada representação."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dirs", type=int, default=200)
+    parser.add_argument("--files-per-dir", type=int, default=250)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporario:
+        raiz = Path(temporario)
+        _criar_arvore(temporario, args.dirs, args.files_per_dir)
+        entradas = args.dirs * (args.files_per_dir + 1)
+        medicoes = {
+            "Diretorio": lambda: Diretorio(raiz),
+            "montar_arvore_json": lambda: montar_arvore_json(raiz, raiz.stat(), Varredura(raiz)),
+            "ArvoreColunar": lambda: ArvoreColunar(raiz),
+        }
+        print(f"entradas: {entradas}")
+        for nome, construir in medicoes.items():
+            objeto, memoria = _medir(construir)
+            print(f"{nome:20s} {memoria / entradas:10.1f} bytes/entrada")
+            if isinstance(objeto, ArvoreColunar):
+                estimativa = objeto.memoria_em_bytes() / entradas
+                print(f"{'  (memoria_em_bytes)':20s} {estimativa:10.1f} bytes/entrada")
+            del objeto
+
+
+if __name__ == "__main__":
+    main()
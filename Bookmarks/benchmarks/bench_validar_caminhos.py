@@ -0,0 +1,98 @@
+# benchmarks/bench_validar_caminhos.py
+
+"""
+Compara a validação original de caminhos com `validar_lote`.
+
+Uso (a partir de `Bookmarks/`):
+
+    python -m benchmarks.bench_validar_caminhos --paths 100000
+
+A versão original recompila a regex a cada caminho, faz uma segunda busca
+pelos caracteres inválidos e chama `strip()` várias vezes; `validar_lote`
+usa uma única regex pré-compilada por caminho.
+"""
+
+import argparse
+import random
+import re
+import time
+
+from app.models.json_do_frontend import validar_lote
+
+_PADRAO_ORIGINAL = r"""
+    ^(
+        (/[\w\s.-]+)+/?$
+        |
+        [a-zA-Z]:\\([\w\s.-]+\\?)+$
+        |
+        ([\w\s.-]+(/|\\)?)+$
+        |
+        \\\\[\w\s.-]+(\\[\w\s.-]+)+$
+    )$
+"""
+
+_EXEMPLOS = [
+    "  /home/usuario/Documentos/Photos.zip",
+    "/var/log/syslog/",
+    "../Downloads/",
+    "./relative/path/to/file",
+    "relative\\path\\..\\arquivo.txt",
+    "\\\\Server\\Share\\folder\\",
+    "C:\\Users\\Invalid|Char",
+    "/invalid/path<>",
+    "invalid_path_@!",
+    "",
+]
+
+
+def _validar_original(caminhos):
+    """Reproduz `filtrar_caminhos_validos` antes das regex pré-compiladas."""
+    validos = []
+    for c in caminhos:
+        caminho_strip = c.strip()
+        if isinstance(c, str) and caminho_strip:
+            padrao = re.compile(_PADRAO_ORIGINAL, re.VERBOSE)
+            if (
+                padrao.match(caminho_strip)
+                and not re.search(r'[<>:"|?*\x00-\x1f]', caminho_strip)
+                and caminho_strip.strip()
+                and len(caminho_strip.strip()) >= 2
+            ):
+                validos.append(caminho_strip)
+    return validos
+
+
+def _medir(funcao, caminhos, repeticoes):
+    """Retorna o melhor tempo da função entre as repetições."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(caminhos)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    """Executa o benchmark e imprime os tempos de cada versão."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paths", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    gerador = random.Random(0)
+    caminhos = [
+        f"{gerador.choice(_EXEMPLOS)}{indice}" for indice in range(args.paths)
+    ]
+    aceitos = [r.caminho for r in validar_lote(caminhos) if r.valido]
+    assert aceitos == _validar_original(caminhos)
+
+    original = _medir(_validar_original, caminhos, args.repeat)
+    lote = _medir(validar_lote, caminhos, args.repeat)
+    print(f"caminhos: {args.paths}")
+    print(f"original:            {original * 1000:10.2f} ms")
+    print(f"validar_lote:        {lote * 1000:10.2f} ms")
+    print(f"aceleração:          {original / lote:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
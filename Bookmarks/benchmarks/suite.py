@@ -0,0 +1,261 @@
+# benchmarks/suite.py
+
+"""
+Suíte de benchmarks com árvores sintéticas e baseline em JSON.
+
+Uso (a partir de `Bookmarks/`):
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json --tolerance 0.25
+
+Para cada forma de árvore (`wide`, `deep`, `tiny`, ver `benchmarks.arvores`)
+mede `analyze_paths`, `processar_caminhos`, `validar_lote` e a serialização
+do resultado com cada backend instalado. Cada caso roda num processo novo
+(`spawn`), para que o pico de memória (RSS) seja só dele, e informa a
+latência (p50, p90, p99, mínimo e média), a vazão em entradas por segundo
+e o pico de RSS.
+
+Com `--compare`, a p50 e o pico de RSS de cada caso são comparados com os
+da baseline; o comando termina com código 1 se algum caso piorou mais que
+`--tolerance` (fração; 0.25 = 25%). As métricas de `app.services.metrics`
+podem ser desligadas com `ANALYSIS_METRICS=0` para medir sem instrumentação.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.arvores import (
+    FORMAS,
+    contar_arvore,
+    criar_arvore,
+    diretorio_temporario,
+    listar_arquivos,
+)
+
+CASOS = ("analyze_paths", "processar_caminhos", "validar_lote", "serializer")
+
+
+def _pico_rss_bytes():
+    """Pico de memória residente do processo, em bytes (`None` sem `resource`)."""
+    try:
+        import resource  # pylint: disable=C0415
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def _percentil(valores_ordenados, fracao):
+    """Percentil pelo método do posto mais próximo."""
+    posto = max(math.ceil(fracao * len(valores_ordenados)), 1)
+    return valores_ordenados[posto - 1]
+
+
+def _preparar(caso, raiz, backend):
+    """
+    Monta a entrada do caso fora da medição.
+    :return: tuple[callable, int], função medida e entradas processadas por chamada
+    """
+    # pylint: disable=C0415
+    if caso == "analyze_paths":
+        from app.services.file_manager import analyze_paths
+
+        caminhos = listar_arquivos(raiz)
+        return (lambda: analyze_paths(caminhos)), len(caminhos)
+    if caso == "validar_lote":
+        from app.models.json_do_frontend import validar_lote
+
+        caminhos = listar_arquivos(raiz)
+        return (lambda: validar_lote(caminhos)), len(caminhos)
+
+    from app.models.path_model import AnalisadorCaminhos
+
+    totais = contar_arvore(raiz)
+    entradas = totais["arquivos"] + totais["diretorios"] + 1
+    entrada = {"jsonEntrada": [raiz]}
+    if caso == "processar_caminhos":
+        analisador = AnalisadorCaminhos()
+        return (lambda: analisador.processar_caminhos(entrada)), entradas
+    if caso == "serializer":
+        from app.services.serializer import get_serializer
+
+        arvore = AnalisadorCaminhos().processar_caminhos(entrada)
+        dumps_bytes = get_serializer(backend).dumps_bytes
+        return (lambda: dumps_bytes(arvore)), entradas
+    raise ValueError(f"Caso '{caso}' desconhecido; use um de {CASOS}.")
+
+
+def executar_caso(caso, raiz, repeticoes, aquecimento, backend=None):
+    """
+    Executa o caso no processo atual.
+    :param caso: str, um de `CASOS`
+    :param raiz: str, raiz da árvore sintética
+    :param repeticoes: int, chamadas medidas
+    :param aquecimento: int, chamadas descartadas antes da medição
+    :param backend: str | None, backend do serializador (caso `serializer`)
+    :return: dict
+    """
+    rss_inicial = _pico_rss_bytes()
+    funcao, entradas = _preparar(caso, raiz, backend)
+    for _ in range(aquecimento):
+        funcao()
+    latencias = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        latencias.append(time.perf_counter() - inicio)
+    latencias.sort()
+    p50 = _percentil(latencias, 0.50)
+    return {
+        "entries": entradas,
+        "repeat": repeticoes,
+        "p50_s": p50,
+        "p90_s": _percentil(latencias, 0.90),
+        "p99_s": _percentil(latencias, 0.99),
+        "min_s": latencias[0],
+        "mean_s": sum(latencias) / len(latencias),
+        "throughput_entries_s": entradas / p50 if p50 else None,
+        "rss_start_bytes": rss_inicial,
+        "peak_rss_bytes": _pico_rss_bytes(),
+    }
+
+
+def _backends_instalados():
+    """Backends de serialização disponíveis neste ambiente."""
+    from app.services.serializer import BACKENDS, get_serializer  # pylint: disable=C0415
+
+    instalados = []
+    for backend in BACKENDS:
+        try:
+            get_serializer(backend)
+        except ImportError:
+            continue
+        instalados.append(backend)
+    return instalados
+
+
+def _nomes_dos_casos(casos):
+    """Expande `serializer` em um caso por backend instalado."""
+    nomes = []
+    for caso in casos:
+        if caso == "serializer":
+            nomes.extend((caso, backend) for backend in _backends_instalados())
+        else:
+            nomes.append((caso, None))
+    return nomes
+
+
+def executar_suite(formas, casos, escala, semente, repeticoes, aquecimento, base):
+    """
+    Cria cada árvore e executa cada caso num processo novo.
+    :return: dict no formato da baseline (`meta` e `results`)
+    """
+    contexto = multiprocessing.get_context("spawn")
+    resultados = {}
+    for forma in formas:
+        with tempfile.TemporaryDirectory(dir=base, prefix=f"bench-{forma}-") as temporario:
+            raiz = os.path.join(temporario, "arvore")
+            totais = criar_arvore(raiz, forma, escala, semente)
+            for caso, backend in _nomes_dos_casos(casos):
+                nome = f"{forma}/{caso}" + (f"/{backend}" if backend else "")
+                with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+                    resultado = executor.submit(
+                        executar_caso, caso, raiz, repeticoes, aquecimento, backend
+                    ).result()
+                resultado["tree"] = totais
+                resultados[nome] = resultado
+                _imprimir(nome, resultado)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": escala,
+            "seed": semente,
+            "base_dir": base,
+            "metrics": os.environ.get("ANALYSIS_METRICS", "1"),
+            "created_at": time.time(),
+        },
+        "results": resultados,
+    }
+
+
+def _imprimir(nome, resultado):
+    """Uma linha por caso: latências, vazão e pico de RSS."""
+    pico = resultado["peak_rss_bytes"]
+    print(
+        f"{nome:36s} p50 {resultado['p50_s'] * 1000:9.2f} ms"
+        f"  p90 {resultado['p90_s'] * 1000:9.2f} ms"
+        f"  p99 {resultado['p99_s'] * 1000:9.2f} ms"
+        f"  {resultado['throughput_entries_s'] or 0:12.0f} entradas/s"
+        f"  RSS {pico / 2**20 if pico else float('nan'):8.1f} MiB"
+    )
+
+
+def comparar(atual, baseline, tolerancia):
+    """
+    Compara a p50 e o pico de RSS de cada caso presente nas duas execuções.
+    :return: list[str], descrição das regressões acima da tolerância
+    """
+    regressoes = []
+    for nome, resultado in sorted(atual["results"].items()):
+        anterior = baseline["results"].get(nome)
+        if anterior is None:
+            continue
+        for chave in ("p50_s", "peak_rss_bytes"):
+            if not resultado.get(chave) or not anterior.get(chave):
+                continue
+            razao = resultado[chave] / anterior[chave]
+            marca = "  REGRESSÃO" if razao > 1 + tolerancia else ""
+            print(f"{nome:36s} {chave:15s} {razao:6.2f}x{marca}")
+            if marca:
+                regressoes.append(f"{nome} {chave} {razao:.2f}x")
+    return regressoes
+
+
+def main():
+    """Executa a suíte, grava e/ou compara com a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shape", action="append", choices=FORMAS)
+    parser.add_argument("--case", action="append", choices=CASOS)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--dir", default=None, help="onde criar as árvores (padrão: tmpfs)")
+    parser.add_argument("--output", help="grava os resultados neste JSON")
+    parser.add_argument("--compare", help="baseline JSON para comparação")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    atual = executar_suite(
+        args.shape or list(FORMAS),
+        args.case or list(CASOS),
+        args.scale,
+        args.seed,
+        args.repeat,
+        args.warmup,
+        args.dir or diretorio_temporario(),
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as arquivo:
+            json.dump(atual, arquivo, indent=2, sort_keys=True)
+            arquivo.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as arquivo:
+            baseline = json.load(arquivo)
+        regressoes = comparar(atual, baseline, args.tolerance)
+        if regressoes:
+            print(f"{len(regressoes)} regressão(ões) acima de {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# tests/models/test_agregacao.py
+
+"""
+Este módulo contém testes para o módulo agregacao.py.
+"""
+
+import os
+import time
+
+from app.models.agregacao import OUTRAS_EXTENSOES, AgregadorUso
+from app.models.path_model import AnalisadorCaminhos
+from app.models.varredura import Varredura
+
+DIA = 24 * 60 * 60
+
+
+def _criar_arvore(raiz):
+    """Cria uma árvore com tamanhos, extensões e datas conhecidos."""
+    arquivos = {
+        "a/grande.bin": (1000, 400),
+        "a/b/medio.TXT": (300, 20),
+        "a/b/pequeno.txt": (10, 0),
+        "c/sem_extensao": (50, 3),
+        "raiz.py": (5, 0),
+    }
+    agora = time.time()
+    for nome, (tamanho, dias) in arquivos.items():
+        caminho = raiz / nome
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_bytes(b"x" * tamanho)
+        data = agora - dias * DIA - 60
+        os.utime(caminho, (data, data))
+    return raiz
+
+
+def _relatorio(raiz, **opcoes):
+    (relatorio,) = AnalisadorCaminhos().agregar_caminhos({"jsonEntrada": [str(raiz)]}, **opcoes)
+    return relatorio
+
+
+def test_totais_recursivos_e_maiores(tmp_path):
+    """
+    Testa os totais da raiz e os maiores arquivos e diretórios.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    relatorio = _relatorio(raiz, top_n=3)
+    assert (relatorio["tamanho_total"], relatorio["total_arquivos"]) == (1365, 5)
+    assert relatorio["total_diretorios"] == 3
+    assert [(item["caminho"], item["tamanho"]) for item in relatorio["maiores_arquivos"]] == [
+        (str(raiz / "a" / "grande.bin"), 1000),
+        (str(raiz / "a" / "b" / "medio.TXT"), 300),
+        (str(raiz / "c" / "sem_extensao"), 50),
+    ]
+    assert [
+        (item["caminho"], item["tamanho_total"], item["total_arquivos"])
+        for item in relatorio["maiores_diretorios"]
+    ] == [
+        (str(raiz), 1365, 5),
+        (str(raiz / "a"), 1310, 3),
+        (str(raiz / "a" / "b"), 310, 2),
+    ]
+
+
+def test_histogramas_de_extensao_e_idade(tmp_path):
+    """
+    Testa os histogramas por extensão (sem diferenciar maiúsculas, com as
+    demais somadas em "(outras)") e por faixa de idade.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    relatorio = _relatorio(raiz, top_n=2)
+    assert relatorio["extensoes"] == [
+        {"extensao": ".bin", "arquivos": 1, "tamanho": 1000},
+        {"extensao": ".txt", "arquivos": 2, "tamanho": 310},
+        {"extensao": OUTRAS_EXTENSOES, "arquivos": 2, "tamanho": 55},
+    ]
+    assert [(f["ate_dias"], f["arquivos"], f["tamanho"]) for f in relatorio["idades"]] == [
+        (1, 2, 15), (7, 1, 50), (30, 1, 300), (90, 0, 0), (365, 0, 0), (None, 1, 1000),
+    ]
+
+
+def test_agregador_igual_com_poda_de_extensoes(tmp_path):
+    """
+    Testa se a poda do histograma mantém os totais.
+    """
+    raiz = tmp_path / "raiz"
+    raiz.mkdir()
+    for indice in range(30):
+        (raiz / f"arquivo.e{indice}").write_bytes(b"x" * (indice + 1))
+    agregador = AgregadorUso(str(raiz), top_n=3, max_extensoes=4)
+    relatorio = agregador.adicionar_todos(Varredura(raiz)).resultado()
+    assert sum(item["arquivos"] for item in relatorio["extensoes"]) == 30
+    assert sum(item["tamanho"] for item in relatorio["extensoes"]) == sum(range(1, 31))
+    assert [item["extensao"] for item in relatorio["extensoes"][:3]] == [".e29", ".e28", ".e27"]
+
+
+def test_limites_arquivos_e_inexistentes(tmp_path):
+    """
+    Testa entradas que são arquivos, caminhos inexistentes e limites de varredura.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    relatorios = AnalisadorCaminhos().agregar_caminhos(
+        {"jsonEntrada": [str(raiz / "raiz.py"), str(raiz / "nada"), str(raiz)]},
+        max_entradas=2,
+    )
+    assert len(relatorios) == 2
+    assert relatorios[0]["tamanho_total"] == 5 and relatorios[0]["maiores_diretorios"] == []
+    assert relatorios[1]["truncado"] is True
+
+
+def test_links_do_mesmo_arquivo_contados_uma_vez(tmp_path):
+    """
+    Testa se, como no `du`, um arquivo com dois links só é somado uma vez.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    os.link(raiz / "a" / "grande.bin", raiz / "c" / "outro_link.bin")
+    relatorio = _relatorio(raiz)
+    assert (relatorio["tamanho_total"], relatorio["total_arquivos"]) == (1365, 5)
+    caminhos = [item["caminho"] for item in relatorio["maiores_arquivos"]]
+    links = {str(raiz / "a" / "grande.bin"), str(raiz / "c" / "outro_link.bin")}
+    assert len([caminho for caminho in caminhos if caminho in links]) == 1
+    (extensao_bin,) = [item for item in relatorio["extensoes"] if item["extensao"] == ".bin"]
+    assert (extensao_bin["arquivos"], extensao_bin["tamanho"]) == (1, 1000)
@@ -0,0 +1,72 @@
+# tests/models/test_colunar.py
+
+"""
+Este módulo contém testes para o módulo colunar.py.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from app.models.colunar import ArvoreColunar
+from app.models.path_model import Diretorio, iterar_arvore_json, montar_arvore_json
+from app.models.varredura import Varredura
+
+
+def _criar_arvore(raiz: Path) -> Path:
+    """Cria uma pequena árvore de arquivos para os testes."""
+    (raiz / "docs" / "vazio").mkdir(parents=True)
+    (raiz / "docs" / "leia.txt").write_text("conteudo")
+    (raiz / "foto.zip").write_bytes(b"\0" * 2048)
+    (raiz / "docs" / "notas.md").write_text("# notas")
+    (raiz / "docs" / "vazio" / "leia.txt").write_text("outro")
+    return raiz
+
+
+def test_para_json_igual_ao_diretorio(tmp_path):
+    """
+    Testa se a árvore colunar reconstrói o mesmo JSON que o Diretorio.
+    """
+    raiz = _criar_arvore(tmp_path)
+    arvore = ArvoreColunar(raiz)
+    assert len(arvore) == 7
+    assert arvore.para_json() == Diretorio(raiz).para_json()
+
+
+def test_para_json_igual_a_montar_arvore_com_ciclo(tmp_path):
+    """
+    Testa se ciclos de links simbólicos são marcados como em montar_arvore_json.
+    """
+    raiz = _criar_arvore(tmp_path)
+    (raiz / "docs" / "volta").symlink_to(raiz)
+    esperado = montar_arvore_json(raiz, raiz.stat(), Varredura(raiz))
+    assert ArvoreColunar(raiz).para_json() == esperado
+
+
+def test_iterar_json_igual_a_varredura(tmp_path):
+    """
+    Testa se os nós emitidos são os mesmos de iterar_arvore_json, inclusive truncados.
+    """
+    raiz = _criar_arvore(tmp_path)
+    for limites in ({}, {"max_profundidade": 1}, {"max_entradas": 3}):
+        esperado = list(iterar_arvore_json(raiz, raiz.stat(), Varredura(raiz, **limites)))
+        assert list(ArvoreColunar(raiz, **limites).iterar_json()) == esperado
+
+
+def test_nomes_internados(tmp_path):
+    """
+    Testa se nomes repetidos em diretórios diferentes compartilham o mesmo objeto.
+    """
+    arvore = ArvoreColunar(_criar_arvore(tmp_path))
+    repetidos = [nome for nome in arvore.nomes if nome == "leia.txt"]
+    assert len(repetidos) == 2 and repetidos[0] is repetidos[1]
+    assert arvore.memoria_em_bytes() > 0
+
+
+def test_rejeita_arquivo(tmp_path):
+    """
+    Testa se a árvore colunar rejeita caminhos que não são diretórios.
+    """
+    raiz = _criar_arvore(tmp_path)
+    with pytest.raises(ValueError):
+        ArvoreColunar(raiz / "foto.zip")
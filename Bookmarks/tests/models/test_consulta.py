@@ -0,0 +1,144 @@
+# tests/models/test_consulta.py
+
+"""
+Este módulo contém testes para o módulo consulta.py.
+"""
+
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+from app.models import varredura as modulo_varredura
+from app.models.colunar import ArvoreColunar
+from app.models.consulta import Consulta
+from app.models.path_model import AnalisadorCaminhos, Diretorio
+from app.models.varredura import Varredura
+from app.services.cache import ResultCache
+
+
+def _criar_arvore(raiz: Path) -> Path:
+    """Cria uma árvore com um repositório e dependências a podar."""
+    (raiz / ".git" / "objects").mkdir(parents=True)
+    (raiz / ".git" / "config").write_text("[core]")
+    (raiz / "node_modules" / "pacote").mkdir(parents=True)
+    (raiz / "node_modules" / "pacote" / "index.py").write_text("x = 1")
+    (raiz / "src").mkdir()
+    (raiz / "src" / "main.py").write_text("print('ola')")
+    (raiz / "src" / "LEIA.MD").write_text("# leia")
+    (raiz / "src" / "grande.py").write_bytes(b"#" * 4096)
+    (raiz / "foto.png").write_bytes(b"\0" * 10)
+    return raiz
+
+
+def _nomes(varredura: Varredura) -> set:
+    """Nomes das entradas emitidas pela varredura."""
+    return {no.entrada.nome for no in varredura}
+
+
+def test_sem_criterios_aceita_tudo(tmp_path):
+    """
+    Testa se uma consulta vazia produz a mesma varredura que nenhuma consulta.
+    """
+    raiz = _criar_arvore(tmp_path)
+    assert _nomes(Varredura(raiz, consulta=Consulta())) == _nomes(Varredura(raiz))
+
+
+def test_extensoes_sem_diferenciar_maiusculas(tmp_path):
+    """
+    Testa se as extensões são normalizadas e os diretórios continuam sendo percorridos.
+    """
+    raiz = _criar_arvore(tmp_path)
+    consulta = Consulta(extensoes=["PY", ".md"], podar=[".git", "node_modules"])
+    assert _nomes(Varredura(raiz, consulta=consulta)) == {
+        "src", "main.py", "LEIA.MD", "grande.py",
+    }
+
+
+def test_glob_regex_e_tamanho(tmp_path):
+    """
+    Testa se glob, regex e faixa de tamanho são combinados.
+    """
+    raiz = _criar_arvore(tmp_path)
+    consulta = Consulta(nomes=["*.py"], regex="^[a-m]", tamanho_max=1024, podar=["node_*"])
+    arquivos = {
+        no.entrada.nome for no in Varredura(raiz, consulta=consulta) if no.entrada.e_arquivo
+    }
+    assert arquivos == {"main.py"}
+
+
+def test_faixa_de_modificacao(tmp_path):
+    """
+    Testa se a faixa de `st_mtime` é inclusiva nas duas pontas.
+    """
+    (tmp_path / "velho.txt").write_text("v")
+    (tmp_path / "novo.txt").write_text("n")
+    os.utime(tmp_path / "velho.txt", (1000, 1000))
+    os.utime(tmp_path / "novo.txt", (2000, 2000))
+    assert _nomes(Varredura(tmp_path, consulta=Consulta(modificado_desde=2000))) == {"novo.txt"}
+    assert _nomes(Varredura(tmp_path, consulta=Consulta(modificado_ate=1000))) == {"velho.txt"}
+
+
+def test_diretorio_podado_nao_e_aberto(tmp_path, monkeypatch):
+    """
+    Testa se diretórios podados nunca são listados e arquivos recusados nunca têm `stat`.
+    """
+    raiz = _criar_arvore(tmp_path)
+    listados = []
+    scandir = os.scandir
+
+    def scandir_registrando(caminho):
+        listados.append(os.path.basename(caminho))
+        return scandir(caminho)
+
+    monkeypatch.setattr(modulo_varredura.os, "scandir", scandir_registrando)
+    consulta = Consulta(extensoes=["md"], podar=[".git", "node_modules"])
+    assert _nomes(Varredura(raiz, consulta=consulta)) == {"src", "LEIA.MD"}
+    assert sorted(listados) == sorted([raiz.name, "src"])
+
+
+def test_totais_respeitam_a_consulta(tmp_path):
+    """
+    Testa se Diretorio e ArvoreColunar somam apenas os arquivos aceitos.
+    """
+    raiz = _criar_arvore(tmp_path)
+    consulta = Consulta(extensoes=["py"], podar=["node_modules"])
+    dados = Diretorio(raiz, consulta=consulta).para_json()
+    assert dados["total_arquivos"] == 2
+    assert dados["tamanho_total"] == len("print('ola')") + 4096
+    assert ArvoreColunar(raiz, consulta=consulta).para_json() == dados
+
+
+def test_analisador_usa_consulta_na_chave_do_cache(tmp_path):
+    """
+    Testa se o analisador aplica a consulta e distingue consultas diferentes no cache.
+    """
+    raiz = _criar_arvore(tmp_path)
+    analisador = AnalisadorCaminhos(cache=ResultCache(ttl=60))
+    entrada = {"jsonEntrada": [str(raiz)]}
+    (completo,) = analisador.processar_caminhos(entrada)
+    (filtrado,) = analisador.processar_caminhos(
+        entrada, consulta=Consulta(extensoes=["png"], podar=["*"])
+    )
+    assert completo["total_arquivos"] == 6
+    assert filtrado["total_arquivos"] == 1
+    assert filtrado["sub_pastas"] == []
+
+
+def test_consulta_pode_ser_enviada_a_processos():
+    """
+    Testa se a consulta sobrevive ao `pickle` usado pelos processos de trabalho.
+    """
+    consulta = Consulta(extensoes=["py"], nomes=["a*"], regex="b", tamanho_min=1, podar=[".git"])
+    copia = pickle.loads(pickle.dumps(consulta))
+    assert copia.chave() == consulta.chave()
+    assert copia.nome_aceito("ab.py") and not copia.nome_aceito("ab.txt")
+
+
+def test_regex_invalida():
+    """
+    Testa se uma expressão regular inválida gera ValueError.
+    """
+    with pytest.raises(ValueError):
+        Consulta(regex="(")
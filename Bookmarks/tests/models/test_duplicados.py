@@ -0,0 +1,119 @@
+# tests/models/test_duplicados.py
+
+"""
+Este módulo contém testes para o módulo duplicados.py.
+"""
+
+import os
+
+from app.models.duplicados import LocalizadorDuplicados, hash_completo, hash_parcial
+from app.models.indice import IndiceMetadados
+from app.models.varredura import Varredura
+
+
+def _criar_arquivos(raiz):
+    """Cria duplicados pequenos, grandes e arquivos que só empatam no tamanho ou nas pontas."""
+    (raiz / "sub").mkdir()
+    (raiz / "a.txt").write_bytes(b"conteudo")
+    (raiz / "sub" / "b.txt").write_bytes(b"conteudo")
+    (raiz / "c.txt").write_bytes(b"CONTEUDO")
+    grande = b"x" * 10_000 + b"meio" + b"y" * 10_000
+    (raiz / "g1.bin").write_bytes(grande)
+    (raiz / "sub" / "g2.bin").write_bytes(grande)
+    (raiz / "g3.bin").write_bytes(b"x" * 10_000 + b"MEIO" + b"y" * 10_000)
+    (raiz / "vazio1").write_bytes(b"")
+    (raiz / "vazio2").write_bytes(b"")
+
+
+def test_encontra_grupos_por_conteudo(tmp_path):
+    """
+    Testa se só arquivos com o mesmo conteúdo são agrupados, do maior desperdício ao menor.
+    """
+    _criar_arquivos(tmp_path)
+    localizador = LocalizadorDuplicados(bloco=1024, limiar_mmap=4096)
+    grupos = localizador.encontrar([tmp_path])
+    assert [grupo.caminhos for grupo in grupos] == [
+        [str(tmp_path / "g1.bin"), str(tmp_path / "sub" / "g2.bin")],
+        [str(tmp_path / "a.txt"), str(tmp_path / "sub" / "b.txt")],
+    ]
+    assert grupos[0].desperdicio == 20_004
+    assert grupos[0].para_json()["tamanho"] == 20_004
+
+
+def test_hash_parcial_distingue_pontas_e_completo_le_o_meio(tmp_path):
+    """
+    Testa se o hash parcial ignora o meio do arquivo e o completo (com mmap ou não) não.
+    """
+    _criar_arquivos(tmp_path)
+    g1, g3 = str(tmp_path / "g1.bin"), str(tmp_path / "g3.bin")
+    assert hash_parcial(g1, 20_004, 1024) == hash_parcial(g3, 20_004, 1024)
+    assert hash_completo(g1, 20_004, 1024, 4096) != hash_completo(g3, 20_004, 1024, 4096)
+    assert hash_completo(g1, 20_004, 1024, 4096) == hash_completo(g1, 20_004, 1024, 10**9)
+
+
+def test_links_fisicos_contam_uma_vez(tmp_path):
+    """
+    Testa se um link físico não é reportado como duplicado.
+    """
+    (tmp_path / "a.txt").write_bytes(b"abc")
+    os.link(tmp_path / "a.txt", tmp_path / "b.txt")
+    assert LocalizadorDuplicados().encontrar([tmp_path]) == []
+
+
+def test_agrupar_entradas_de_uma_varredura(tmp_path):
+    """
+    Testa se os grupos podem ser montados a partir das entradas já varridas.
+    """
+    _criar_arquivos(tmp_path)
+    entradas = [no.entrada for no in Varredura(tmp_path) if no.entrada.e_arquivo]
+    grupos = LocalizadorDuplicados(bloco=1024).agrupar(entradas)
+    assert len(grupos) == 2
+
+
+def test_indice_evita_recalcular_hashes(tmp_path):
+    """
+    Testa se arquivos inalterados não têm o hash recalculado com o índice
+    e se um arquivo alterado volta a ser lido.
+    """
+    _criar_arquivos(tmp_path)
+    indice = IndiceMetadados()
+    primeiro = LocalizadorDuplicados(indice=indice, bloco=1024)
+    esperado = primeiro.encontrar([tmp_path])
+    assert primeiro.hashes_calculados > 0
+
+    segundo = LocalizadorDuplicados(indice=indice, bloco=1024)
+    assert segundo.encontrar([tmp_path]) == esperado
+    assert segundo.hashes_calculados == 0
+
+    (tmp_path / "sub" / "b.txt").write_bytes(b"CONTEUDO")
+    terceiro = LocalizadorDuplicados(indice=indice, bloco=1024)
+    grupos = terceiro.encontrar([tmp_path])
+    assert terceiro.hashes_calculados == 1
+    assert [str(tmp_path / "c.txt"), str(tmp_path / "sub" / "b.txt")] in [
+        grupo.caminhos for grupo in grupos
+    ]
+
+
+def test_indice_ignora_hash_parcial_de_outro_bloco(tmp_path):
+    """
+    Testa se o hash parcial guardado com outro tamanho de bloco não é
+    reaproveitado, e se o hash completo continua valendo.
+    """
+    conteudo = bytes(range(256)) * 16
+    (tmp_path / "a.bin").write_bytes(conteudo)
+    (tmp_path / "c.bin").write_bytes(conteudo[::-1])
+    indice = IndiceMetadados()
+    assert LocalizadorDuplicados(indice=indice, bloco=1024).encontrar([tmp_path]) == []
+
+    (tmp_path / "b.bin").write_bytes(conteudo)
+    localizador = LocalizadorDuplicados(indice=indice, bloco=512)
+    grupos = localizador.encontrar([tmp_path])
+    assert [grupo.caminhos for grupo in grupos] == [
+        [str(tmp_path / "a.bin"), str(tmp_path / "b.bin")]
+    ]
+    assert localizador.hashes_reaproveitados == 0
+
+    outro = LocalizadorDuplicados(indice=indice, bloco=1024)
+    assert outro.encontrar([tmp_path]) == grupos
+    assert outro.hashes_calculados == 3
+    assert outro.hashes_reaproveitados == 2
@@ -0,0 +1,156 @@
+# tests/models/test_indice.py
+
+"""
+Este módulo contém testes para o módulo indice.py.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.models.indice import IndiceMetadados, caminho_do_sqlite
+from app.models.path_model import AnalisadorCaminhos
+
+
+def _envelhecer(raiz):
+    """Recua as datas de toda a árvore para fora da janela de datas ambíguas."""
+    passado = time.time() - 60
+    for pasta, subpastas, arquivos in os.walk(raiz):
+        for nome in subpastas + arquivos:
+            os.utime(os.path.join(pasta, nome), (passado, passado))
+    os.utime(raiz, (passado, passado))
+
+
+def _criar_arvore(raiz):
+    """Cria uma árvore pequena, com datas fora da janela ambígua."""
+    (raiz / "a" / "b").mkdir(parents=True)
+    (raiz / "c").mkdir()
+    (raiz / "a" / "um.txt").write_text("1")
+    (raiz / "a" / "b" / "dois.txt").write_text("22")
+    (raiz / "c" / "tres.txt").write_text("333")
+    _envelhecer(raiz)
+    return raiz
+
+
+def _processar(raiz, indice=None):
+    """Processa a raiz com o AnalisadorCaminhos, com ou sem índice."""
+    entrada = json.dumps({"jsonEntrada": [str(raiz)]})
+    return AnalisadorCaminhos(indice=indice).processar_caminhos(entrada)
+
+
+def test_caminho_do_sqlite():
+    """
+    Testa a conversão de URIs do SQLAlchemy em caminhos de banco do sqlite3.
+    """
+    assert caminho_do_sqlite("sqlite:///dev.db") == "dev.db"
+    assert caminho_do_sqlite("sqlite:////tmp/dev.db") == "/tmp/dev.db"
+    assert caminho_do_sqlite("sqlite://") == ":memory:"
+
+
+def test_varredura_incremental_reaproveita_diretorios_inalterados(tmp_path):
+    """
+    Testa se uma nova varredura sem alterações não lista nenhum diretório de novo.
+    """
+    raiz = _criar_arvore(tmp_path)
+    indice = IndiceMetadados()
+    assert _processar(raiz, indice) == _processar(raiz)
+    varredura = indice.varredura(raiz)
+    list(varredura)
+    assert varredura.diretorios_listados == 0
+    assert varredura.diretorios_reaproveitados == 4
+
+
+def test_varredura_incremental_igual_a_completa_apos_alteracoes(tmp_path):
+    """
+    Testa se o resultado incremental é igual ao de uma varredura completa
+    após criar, remover e alterar entradas em vários níveis.
+    """
+    raiz = _criar_arvore(tmp_path)
+    indice = IndiceMetadados()
+    _processar(raiz, indice)
+
+    (raiz / "a" / "b" / "novo.md").write_text("novo")
+    (raiz / "c" / "tres.txt").write_text("conteudo maior")
+    os.remove(raiz / "a" / "um.txt")
+    (raiz / "a" / "b").rename(raiz / "a" / "bb")
+    assert _processar(raiz, indice) == _processar(raiz)
+
+    varredura = indice.varredura(raiz)
+    list(varredura)
+    assert varredura.diretorios_reaproveitados >= 1
+
+
+def test_indice_persistente_entre_conexoes(tmp_path):
+    """
+    Testa se o índice gravado em arquivo é reaproveitado por uma nova conexão.
+    """
+    raiz = _criar_arvore(tmp_path / "arvore")
+    banco = str(tmp_path / "indice.db")
+    indice = IndiceMetadados.de_uri(f"sqlite:///{banco}")
+    _processar(raiz, indice)
+    indice.fechar()
+
+    novo = IndiceMetadados(banco)
+    varredura = novo.varredura(raiz)
+    list(varredura)
+    assert varredura.diretorios_listados == 0
+
+
+def test_varreduras_intercaladas_nao_prendem_a_trava(tmp_path):
+    """
+    Testa se duas varreduras do mesmo índice podem ser intercaladas e se uma
+    varredura interrompida no meio não impede as seguintes.
+    """
+    raiz = _criar_arvore(tmp_path / "arvore")
+    indice = IndiceMetadados()
+    resultado = {}
+
+    def intercalar():
+        interrompida = iter(indice.varredura(raiz))
+        next(interrompida)
+        primeira = iter(indice.varredura(raiz))
+        segunda = iter(indice.varredura(raiz))
+        nomes = []
+        for no_primeira, no_segunda in zip(primeira, segunda):
+            nomes.append((no_primeira.entrada.nome, no_segunda.entrada.nome))
+        resultado["nomes"] = nomes
+
+    tarefa = threading.Thread(target=intercalar, daemon=True)
+    tarefa.start()
+    tarefa.join(timeout=10)
+    assert not tarefa.is_alive()
+    assert len(resultado["nomes"]) == 6
+    assert all(a == b for a, b in resultado["nomes"])
+
+
+def test_banco_antigo_ganha_coluna_bloco(tmp_path):
+    """
+    Testa se um banco criado sem a coluna `bloco` é migrado e se o hash
+    parcial antigo é ignorado, mantendo o completo.
+    """
+    arquivo = tmp_path / "a.bin"
+    arquivo.write_bytes(b"abc")
+    info = os.stat(arquivo)
+    banco = str(tmp_path / "indice.db")
+    conexao = sqlite3.connect(banco)
+    with conexao:
+        conexao.execute(
+            "CREATE TABLE hashes (caminho TEXT PRIMARY KEY, tamanho INTEGER NOT NULL,"
+            " dispositivo INTEGER NOT NULL, inode INTEGER NOT NULL,"
+            " ctime_ns INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, parcial TEXT, completo TEXT)"
+        )
+        conexao.execute(
+            "INSERT INTO hashes VALUES (?, ?, ?, ?, ?, ?, 'p', 'c')",
+            (str(arquivo), info.st_size, info.st_dev, info.st_ino,
+             info.st_ctime_ns, info.st_mtime_ns),
+        )
+    conexao.close()
+
+    indice = IndiceMetadados(banco)
+    assert indice.hashes_guardados([(str(arquivo), info)], 1024) == {str(arquivo): (None, "c")}
+    indice.guardar_hashes([(str(arquivo), info, "p2", None)], 1024)
+    assert indice.hashes_guardados([(str(arquivo), info)], 1024) == {str(arquivo): ("p2", "c")}
+    assert indice.hashes_guardados([(str(arquivo), info)], 512) == {str(arquivo): (None, "c")}
+    indice.fechar()
@@ -0,0 +1,137 @@
+# tests/models/test_instantaneo.py
+
+"""
+Este módulo contém testes para o módulo instantaneo.py.
+"""
+
+import os
+
+import pytest
+
+from app.models.consulta import Consulta
+from app.models.instantaneo import (
+    LeitorInstantaneo,
+    comparar_instantaneos,
+    gravar_instantaneo,
+)
+
+
+def _criar_arvore(raiz):
+    """Cria uma árvore pequena, com nomes que testam a ordem das chaves."""
+    for pasta in ("a/b", "a-b", "c"):
+        (raiz / pasta).mkdir(parents=True)
+    for arquivo in ("a/b/um.txt", "a/dois.py", "a-b/tres.txt", "c/quatro.md", "ação.txt"):
+        (raiz / arquivo).write_text(arquivo)
+    return raiz
+
+
+def _mudancas(antes, depois, **opcoes):
+    """Mudanças ordenadas por tipo e caminho (a ordem de saída pode variar)."""
+    return sorted(
+        (
+            (m["mudanca"], m["caminho"], m.get("origem"))
+            for m in comparar_instantaneos(antes, depois, **opcoes)
+        ),
+    )
+
+
+def test_instantaneo_ordenado_e_completo(tmp_path):
+    """
+    Testa se o instantâneo guarda todas as entradas, em ordem de chave, com
+    o tamanho e o inode de cada uma.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    destino = tmp_path / "um.snap"
+    cabecalho = gravar_instantaneo(raiz, destino)
+    assert cabecalho["entradas"] == 9
+    leitor = LeitorInstantaneo(destino)
+    assert leitor.cabecalho["raiz"] == str(raiz)
+    registros = list(leitor)
+    chaves = [registro.chave for registro in registros]
+    assert chaves == sorted(chaves)
+    assert [registro.caminho for registro in registros][:4] == [
+        "a", os.path.join("a", "b"), os.path.join("a", "b", "um.txt"), os.path.join("a", "dois.py"),
+    ]
+    informacao = os.stat(raiz / "ação.txt")
+    (ultimo,) = [registro for registro in registros if registro.caminho == "ação.txt"]
+    assert (ultimo.tamanho, ultimo.inode) == (informacao.st_size, informacao.st_ino)
+    assert not ultimo.e_diretorio and registros[0].e_diretorio
+
+
+def test_instantaneo_com_profundidade_e_consulta(tmp_path):
+    """
+    Testa se os limites e a consulta são aplicados na gravação.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    destino = tmp_path / "um.snap"
+    gravar_instantaneo(raiz, destino, max_profundidade=1, consulta=Consulta(podar=["c"]))
+    assert [r.caminho for r in LeitorInstantaneo(destino)] == ["a", "a-b", "ação.txt"]
+    with pytest.raises(ValueError):
+        gravar_instantaneo(raiz / "ação.txt", destino)
+
+
+def test_comparar_adicionados_removidos_modificados_e_movidos(tmp_path):
+    """
+    Testa se a comparação encontra cada tipo de mudança, incluindo
+    movimentações pelo inode.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    gravar_instantaneo(raiz, tmp_path / "antes.snap")
+    (raiz / "a" / "dois.py").write_text("outro conteúdo")
+    (raiz / "c" / "quatro.md").unlink()
+    (raiz / "novo.txt").write_text("novo")
+    os.rename(raiz / "a-b" / "tres.txt", raiz / "c" / "tres.txt")
+    gravar_instantaneo(raiz, tmp_path / "depois.snap")
+
+    assert _mudancas(tmp_path / "antes.snap", tmp_path / "depois.snap") == [
+        ("adicionado", "novo.txt", None),
+        ("modificado", os.path.join("a", "dois.py"), None),
+        ("movido", os.path.join("c", "tres.txt"), os.path.join("a-b", "tres.txt")),
+        ("removido", os.path.join("c", "quatro.md"), None),
+    ]
+    modificado = next(
+        m for m in comparar_instantaneos(tmp_path / "antes.snap", tmp_path / "depois.snap")
+        if m["mudanca"] == "modificado"
+    )
+    assert (modificado["tamanho_anterior"], modificado["tamanho"]) == (
+        len("a/dois.py"), len("outro conteúdo".encode("utf-8")),
+    )
+    assert list(comparar_instantaneos(tmp_path / "antes.snap", tmp_path / "antes.snap")) == []
+
+
+def test_pendencias_limitadas(tmp_path):
+    """
+    Testa se, sem espaço para esperar o par, a movimentação sai como
+    remoção e adição.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    for indice in range(5):
+        (raiz / "c" / f"z{indice}.txt").write_text("z")
+    gravar_instantaneo(raiz, tmp_path / "antes.snap")
+    os.rename(raiz / "a" / "dois.py", raiz / "c" / "zz.py")
+    for indice in range(5):
+        (raiz / "c" / f"z{indice}.txt").unlink()
+    gravar_instantaneo(raiz, tmp_path / "depois.snap")
+
+    mudancas = _mudancas(tmp_path / "antes.snap", tmp_path / "depois.snap", max_pendentes=2)
+    assert ("removido", os.path.join("a", "dois.py"), None) in mudancas
+    assert ("adicionado", os.path.join("c", "zz.py"), None) in mudancas
+    mudancas = _mudancas(tmp_path / "antes.snap", tmp_path / "depois.snap")
+    assert ("movido", os.path.join("c", "zz.py"), os.path.join("a", "dois.py")) in mudancas
+
+
+def test_instantaneo_incompleto(tmp_path):
+    """
+    Testa se arquivos truncados ou que não são instantâneos são recusados.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    destino = tmp_path / "um.snap"
+    gravar_instantaneo(raiz, destino)
+    dados = destino.read_bytes()
+    destino.write_bytes(dados[:-20])
+    with pytest.raises(ValueError):
+        list(LeitorInstantaneo(destino))
+    destino.write_bytes(b"{}")
+    with pytest.raises(ValueError):
+        LeitorInstantaneo(destino)
+    assert not (tmp_path / "um.snap.part").exists()
@@ -5,9 +5,15 @@
 Este módulo contém testes para o módulo json_do_frontend.py.
 """
 
+import random
+import re
+import time
+
 from app.models.json_do_frontend import (
+    ResultadoValidacao,
     filtrar_caminhos_validos,
     formatar_caminhos_para_json,
+    validar_lote,
     validar_regex_caminho,
     validar_caminho,
 )
@@ -72,12 +78,13 @@ def test_filtrar_caminhos_validos_empty_list():
     Testa se a função filtrar_caminhos_validos retorna
     uma lista vazia quando não há caminhos válidos.
     """
-    assert filtrar_caminhos_validos([]) is []
+    assert filtrar_caminhos_validos([]) == []
 
 def test_filtrar_caminhos_validos_mixed_cases():
     """
     Testa se a função filtrar_caminhos_validos filtra
-    corretamente caminhos válidos e inválidos.
+    corretamente caminhos válidos e inválidos. Caminhos com letra de unidade
+    (`C:`) são recusados, pois `:` está entre os caracteres inválidos.
     """
     caminhos_teste = [
         "  /home/user/Documents/Photos.zip",
@@ -88,7 +95,6 @@ def test_filtrar_caminhos_validos_mixed_cases():
     ]
     assert filtrar_caminhos_validos(caminhos_teste) == [
         "/home/user/Documents/Photos.zip",
-        "C:\\Users\\Valid\\file.txt",
         "../relative/path",
     ]
 
@@ -98,7 +104,7 @@ def test_filtrar_caminhos_validos_no_valid_paths():
     uma lista vazia quando não há caminhos válidos.
     """
     caminhos_teste = ["invalid_path<>", "<>"]
-    assert filtrar_caminhos_validos(caminhos_teste) is []
+    assert filtrar_caminhos_validos(caminhos_teste) == []
 
 def test_formatar_caminhos_para_json_empty():
     """
@@ -110,18 +116,20 @@ def test_formatar_caminhos_para_json_empty():
 def test_formatar_caminhos_para_json_no_valid_paths():
     """
     Testa se a função formatar_caminhos_para_json retorna
-    um JSON vazio quando não há caminhos válidos.
+    um JSON vazio quando não há caminhos válidos. Um nome sem separadores
+    (como `another_invalid_path`) é um caminho relativo válido.
     """
-    caminhos_teste = ["invalid_path<>", "another_invalid_path"]
+    caminhos_teste = ["invalid_path<>", "another_invalid_path<>"]
     assert formatar_caminhos_para_json(caminhos_teste) == '{"jsonEntrada": []}'
 
 def test_formatar_caminhos_para_json_with_valid_and_invalid_paths():
     """
     Testa se a função formatar_caminhos_para_json formata
-    corretamente uma lista de caminhos válidos e inválidos.
+    corretamente uma lista de caminhos válidos e inválidos. O caminho com
+    letra de unidade é recusado (`:` é um caractere inválido).
     """
     caminhos = ["  /valid/path  ", "invalid_path<>", "C:\\Valid\\Path\\file.txt"]
-    expected_json = '{"jsonEntrada": ["/valid/path", "C:\\Valid\\Path\\file.txt"]}'
+    expected_json = '{"jsonEntrada": ["/valid/path"]}'
     assert formatar_caminhos_para_json(caminhos) == expected_json
 
 def test_formatar_caminhos_para_json_large_list():
@@ -129,14 +137,16 @@ def test_formatar_caminhos_para_json_large_list():
     Testa se a função formatar_caminhos_para_json formata
     corretamente uma lista grande de caminhos.
     """
-    caminhos = [f"/valid/path/{i}" for i in range(100)] + ["invalid<>", "another_invalid"]
+    caminhos = [f"/valid/path/{i}" for i in range(100)] + ["invalid<>", "another_invalid|"]
     expected_json = '{"jsonEntrada": [' + ", ".join(f'"/valid/path/{i}"' for i in range(100)) + ']}'
     assert formatar_caminhos_para_json(caminhos) == expected_json
 
 def test_each_caminho_in_lista():
     """
-    Testa se a função formatar_caminhos_para_json formata
-    corretamente cada caminho da lista.
+    Testa se a função validar_regex_caminho reconhece cada caminho da
+    lista. Só o formato é verificado: `C:/...` (unidade com `/`) e UNC
+    terminado em `\\` não casam com nenhum padrão, e `..` é um segmento
+    como outro qualquer.
     """
     caminhos_frontend = [
         "  /home/pedro-pm-dias/Documentos/Photos.zip",
@@ -162,9 +172,77 @@ def test_each_caminho_in_lista():
     ]
 
     resultados_esperados = [
-        True, True, True, True, True, True, True, True, True, True,
-        True, True, True, True, False, False, False, False, False, True
+        True, True, True, True, True, True, True, True, False, True,
+        False, True, True, True, False, False, False, False, True, True
     ]
 
     for caminho, esperado in zip(caminhos_frontend, resultados_esperados):
         assert validar_regex_caminho(caminho) == esperado
+
+
+# Versão original (regex recompilada a cada chamada), usada como referência.
+_PADRAO_ORIGINAL = r"""
+    ^(
+        (/[\w\s.-]+)+/?$
+        |
+        [a-zA-Z]:\\([\w\s.-]+\\?)+$
+        |
+        ([\w\s.-]+(/|\\)?)+$
+        |
+        \\\\[\w\s.-]+(\\[\w\s.-]+)+$
+    )$
+"""
+
+
+def _aceito_originalmente(caminho):
+    """Decisão de `filtrar_caminhos_validos` na implementação original."""
+    caminho = caminho.strip()
+    if not caminho:
+        return False
+    if not re.compile(_PADRAO_ORIGINAL, re.VERBOSE).match(caminho):
+        return False
+    return not re.search(r'[<>:"|?*\x00-\x1f]', caminho) and len(caminho) >= 2
+
+
+def test_validar_lote_equivale_as_validacoes_originais():
+    """
+    Testa se validar_lote, filtrar_caminhos_validos e validar_regex_caminho
+    aceitam exatamente o que a implementação original aceitava.
+    """
+    gerador = random.Random(8)
+    alfabeto = "aZ_é .-/\\:C<|\n\t\x1f@"
+    amostras = [
+        "".join(gerador.choice(alfabeto) for _ in range(gerador.randint(0, 9)))
+        for _ in range(5000)
+    ]
+    original = re.compile(_PADRAO_ORIGINAL, re.VERBOSE)
+    for caminho in amostras:
+        assert validar_regex_caminho(caminho) == bool(original.match(caminho)), repr(caminho)
+    resultados = validar_lote(amostras)
+    assert [r.valido for r in resultados] == [_aceito_originalmente(c) for c in amostras]
+    assert filtrar_caminhos_validos(amostras) == [r.caminho for r in resultados if r.valido]
+
+
+def test_validar_lote_informa_motivo():
+    """
+    Testa se validar_lote informa o motivo de cada rejeição.
+    """
+    resultados = validar_lote(["  /valid/path ", "   ", "a", "/invalid/path<>", "//x", 42])
+    assert resultados == [
+        ResultadoValidacao("/valid/path", True),
+        ResultadoValidacao("", False, "vazio"),
+        ResultadoValidacao("a", False, "muito_curto"),
+        ResultadoValidacao("/invalid/path<>", False, "caractere_invalido"),
+        ResultadoValidacao("//x", False, "formato_invalido"),
+        ResultadoValidacao(None, False, "nao_e_texto"),
+    ]
+
+
+def test_validar_regex_caminho_entrada_longa_sem_retrocesso():
+    """
+    Testa se entradas longas que não casam são rejeitadas sem retrocesso exponencial.
+    """
+    inicio = time.perf_counter()
+    assert validar_regex_caminho("a" * 5000 + "!") is False
+    assert validar_lote(["a b" * 2000 + "@"])[0].motivo == "formato_invalido"
+    assert time.perf_counter() - inicio < 1
@@ -0,0 +1,243 @@
+# tests/models/test_observador.py
+
+"""
+Este módulo contém testes para o módulo observador.py.
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from app.models.consulta import Consulta
+from app.models.observador import Inotify, ObservadorArvores, VarreduraMemoria
+from app.models.path_model import AnalisadorCaminhos
+
+
+def _envelhecer(raiz):
+    """Recua as datas de toda a árvore para fora da janela de datas ambíguas."""
+    passado = time.time() - 60
+    for pasta, subpastas, arquivos in os.walk(raiz):
+        for nome in subpastas + arquivos:
+            os.utime(os.path.join(pasta, nome), (passado, passado))
+    os.utime(raiz, (passado, passado))
+
+
+def _criar_arvore(raiz):
+    """Cria uma árvore pequena, com datas fora da janela ambígua."""
+    (raiz / "a" / "b").mkdir(parents=True)
+    (raiz / "c").mkdir()
+    (raiz / "a" / "um.txt").write_text("1")
+    (raiz / "a" / "b" / "dois.py").write_text("22")
+    (raiz / "c" / "tres.txt").write_text("333")
+    _envelhecer(raiz)
+    return raiz
+
+
+def _processar(raiz, observador=None, **opcoes):
+    """Processa a raiz com o AnalisadorCaminhos, com ou sem observador."""
+    entrada = json.dumps({"jsonEntrada": [str(raiz)]})
+    return AnalisadorCaminhos(observador=observador).processar_caminhos(entrada, **opcoes)
+
+
+def _ordenar(no):
+    """Ordena os filhos pelo nome (a ordem dos irmãos pode variar)."""
+    for chave in ("sub_pastas", "sub_arquivos"):
+        if chave in no:
+            no[chave] = sorted((_ordenar(filho) for filho in no[chave]), key=lambda f: f["nome"])
+    return no
+
+
+@pytest.fixture
+def observador():
+    """Observador em modo de polling, encerrado ao final do teste."""
+    instancia = ObservadorArvores(backend="polling")
+    yield instancia
+    instancia.parar()
+
+
+def test_arvore_em_memoria_igual_a_do_disco(tmp_path, observador, monkeypatch):
+    """
+    Testa se a árvore servida da memória, com e sem limites e consultas, é
+    igual à do disco, e se nenhum diretório é listado de novo.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz").resolve()
+    observador.registrar(raiz)
+    opcoes = [
+        {},
+        {"max_profundidade": 1},
+        {"max_entradas": 2},
+        {"consulta": Consulta(extensoes=["py"], podar=["c"])},
+    ]
+    esperados = [_processar(raiz, **opcao) for opcao in opcoes]
+
+    def proibido(*_args):
+        raise AssertionError("scandir não deveria ser chamado")
+
+    monkeypatch.setattr(os, "scandir", proibido)
+    for opcao, esperado in zip(opcoes, esperados):
+        assert _processar(raiz, observador, **opcao) == esperado
+    assert observador.varredura(str(raiz / "a")) is not None
+    assert isinstance(observador.varredura(str(raiz)), VarreduraMemoria)
+
+
+def test_caminhos_fora_das_raizes_usam_o_disco(tmp_path, observador):
+    """
+    Testa se caminhos fora das raízes ou não normalizados não usam a memória.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz").resolve()
+    outra = _criar_arvore(tmp_path / "outra").resolve()
+    observador.registrar(raiz)
+    assert observador.varredura(str(outra)) is None
+    assert observador.varredura(str(raiz / "a" / ".." / "c")) is None
+    assert _processar(outra, observador) == _processar(outra)
+
+
+def test_polling_aplica_alteracoes(tmp_path, observador):
+    """
+    Testa se o polling vê arquivos criados, alterados e removidos, além de
+    diretórios novos e removidos.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz").resolve()
+    arvore = observador.registrar(raiz)
+    versao = arvore.versao
+
+    (raiz / "a" / "um.txt").write_text("um")
+    (raiz / "c" / "tres.txt").unlink()
+    (raiz / "novo" / "interno").mkdir(parents=True)
+    (raiz / "novo" / "interno" / "x.md").write_text("x")
+    (raiz / "a" / "b" / "dois.py").unlink()
+    (raiz / "a" / "b").rmdir()
+    assert observador.verificar() > 0
+    assert arvore.versao > versao
+    assert _ordenar(_processar(raiz, observador)[0]) == _ordenar(_processar(raiz)[0])
+    assert arvore.filhos(str(raiz / "a" / "b")) is None
+
+    _envelhecer(raiz)
+    observador.verificar()
+    assert observador.verificar() == 0
+    assert _ordenar(_processar(raiz, observador)[0]) == _ordenar(_processar(raiz)[0])
+
+
+def test_versao_do_resultado_sem_varrer(tmp_path, observador, monkeypatch):
+    """
+    Testa se a versão do resultado vem das árvores em memória, sem listar
+    diretórios, e muda quando uma alteração é aplicada.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz").resolve()
+    entrada = {"jsonEntrada": [str(raiz), str(raiz / "a" / "um.txt")]}
+    assert AnalisadorCaminhos().versao_resultado(entrada) is None
+    assert AnalisadorCaminhos(observador=observador).versao_resultado(entrada) is None
+    observador.registrar(raiz)
+    analisador = AnalisadorCaminhos(observador=observador)
+
+    def proibido(*_args):
+        raise AssertionError("scandir não deveria ser chamado")
+
+    with monkeypatch.context() as contexto:
+        contexto.setattr(os, "scandir", proibido)
+        versao = analisador.versao_resultado(entrada)
+        assert versao is not None
+        assert analisador.versao_resultado(entrada) == versao
+        assert analisador.versao_resultado(entrada, max_profundidade=1) != versao
+        assert analisador.versao_resultado(entrada, formatar_tamanhos=True) != versao
+
+    (raiz / "c" / "novo.txt").write_text("novo")
+    observador.verificar()
+    assert analisador.versao_resultado(entrada) != versao
+
+
+def test_versao_do_resultado_com_subdiretorio_fora_da_arvore(tmp_path, observador):
+    """
+    Testa se a versão não é calculada pela árvore quando um subdiretório
+    ficou sem observação (e é lido do disco), para não ficar desatualizada.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz").resolve()
+    arvore = observador.registrar(raiz)
+    arvore.ao_abrir = lambda caminho: caminho != str(raiz / "a" / "b")
+    arvore.carregar()
+    assert not arvore.completo(str(raiz)) and arvore.completo(str(raiz / "c"))
+    analisador = AnalisadorCaminhos(observador=observador)
+    entrada = {"jsonEntrada": [str(raiz)]}
+    versao = analisador.versao_resultado(entrada)
+    assert versao is None
+    assert analisador.versao_resultado({"jsonEntrada": [str(raiz / "c")]}) is not None
+
+    (raiz / "a" / "b" / "dois.py").write_text("mais linhas")
+    observador.verificar()
+    assert analisador.versao_resultado(entrada) is None
+    arvore.ao_abrir = None
+    arvore.carregar()
+    assert arvore.completo(str(raiz))
+    assert analisador.versao_resultado(entrada) is not None
+
+
+def test_raizes_sobrepostas_sao_recusadas(tmp_path, observador):
+    """
+    Testa se uma raiz dentro de outra (ou que contém outra) é recusada, para
+    que nenhuma árvore deixe de receber as alterações.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz").resolve()
+    observador.registrar(raiz)
+    with pytest.raises(ValueError):
+        observador.registrar(raiz / "a" / "b")
+    with pytest.raises(ValueError):
+        observador.registrar(tmp_path)
+    irma = _criar_arvore(tmp_path / "raiz2").resolve()
+    assert observador.registrar(irma).raiz == str(irma)
+    assert observador.registrar(raiz).raiz == str(raiz)
+    assert observador.raizes == [str(raiz), str(irma)]
+
+
+def test_inotify_aplica_eventos(tmp_path):
+    """
+    Testa se os eventos inotify atualizam a árvore antes de cada resposta.
+    """
+    try:
+        observador = ObservadorArvores(backend="inotify")
+    except OSError:
+        pytest.skip("inotify indisponível")
+    try:
+        raiz = _criar_arvore(tmp_path / "raiz").resolve()
+        observador.registrar(raiz)
+        (raiz / "c" / "tres.txt").write_text("trezentos")
+        (raiz / "a" / "um.txt").unlink()
+        (raiz / "nova" / "sub").mkdir(parents=True)
+        (raiz / "nova" / "sub" / "y.txt").write_text("y")
+        os.rename(raiz / "a" / "b", raiz / "c" / "b")
+        (raiz / "c" / "b" / "depois.txt").write_text("d")
+        assert _ordenar(_processar(raiz, observador)[0]) == _ordenar(_processar(raiz)[0])
+        estado = observador.estado()
+        assert estado["backend"] == "inotify"
+        assert estado["raizes"][0]["entradas"] == 9
+    finally:
+        observador.parar()
+
+
+def test_backend_invalido():
+    """
+    Testa se um backend desconhecido é recusado.
+    """
+    with pytest.raises(ValueError):
+        ObservadorArvores(backend="fsevents")
+
+
+def test_inotify_ler_sem_eventos(tmp_path):
+    """
+    Testa a ligação com o inotify: leitura sem bloquear e nomes dos eventos.
+    """
+    try:
+        inotify = Inotify()
+    except OSError:
+        pytest.skip("inotify indisponível")
+    try:
+        descritor = inotify.adicionar(str(tmp_path))
+        assert inotify.ler() == []
+        (tmp_path / "ação.txt").write_text("a")
+        assert inotify.esperar(1)
+        eventos = inotify.ler()
+        assert {evento[0] for evento in eventos} == {descritor}
+        assert "ação.txt" in {evento[3] for evento in eventos}
+    finally:
+        inotify.fechar()
@@ -0,0 +1,121 @@
+# tests/models/test_paginacao.py
+
+"""
+Este módulo contém testes para o módulo paginacao.py.
+"""
+
+import os
+
+import pytest
+
+from app.models.consulta import Consulta
+from app.models.paginacao import VarreduraOrdenada, codificar_cursor, decodificar_cursor
+from app.models.path_model import AnalisadorCaminhos
+
+
+def _criar_arvore(raiz):
+    """Cria uma árvore com alguns níveis e irmãos fora de ordem."""
+    for pasta in ("b/y", "b/x", "a", "c/z/w"):
+        (raiz / pasta).mkdir(parents=True)
+    for arquivo in ("b/y/2.txt", "b/y/1.py", "b/0.txt", "a/9.md", "c/z/w/f.txt", "raiz.txt"):
+        (raiz / arquivo).write_text(arquivo)
+    return raiz
+
+
+def _todas_as_paginas(entrada, limite, **opcoes):
+    """Junta os itens de todas as páginas, seguindo os cursores."""
+    analisador = AnalisadorCaminhos()
+    itens, cursor, paginas = [], None, 0
+    while True:
+        pagina, cursor = analisador.paginar_caminhos(entrada, cursor, limite, **opcoes)
+        assert len(pagina) <= limite
+        itens.extend(pagina)
+        paginas += 1
+        if cursor is None:
+            return itens, paginas
+
+
+def _relativos(raiz, itens):
+    return [os.path.relpath(item["caminho"], raiz) for item in itens]
+
+
+@pytest.mark.parametrize("limite", [1, 2, 3, 100])
+def test_paginas_em_pre_ordem_por_nome(tmp_path, limite):
+    """
+    Testa se as páginas juntas trazem a árvore inteira em pré-ordem por nome.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    itens, paginas = _todas_as_paginas({"jsonEntrada": [str(raiz)]}, limite)
+    esperado = [
+        ".", "a", "a/9.md", "b", "b/0.txt", "b/x", "b/y", "b/y/1.py", "b/y/2.txt",
+        "c", "c/z", "c/z/w", "c/z/w/f.txt", "raiz.txt",
+    ]
+    assert _relativos(raiz, itens) == esperado
+    assert paginas == -(-len(esperado) // limite)
+    assert itens[0]["tipo"] == "diretorio" and itens[0]["profundidade"] == 0
+    assert itens[2]["tamanho"] == len("a/9.md")
+
+
+def test_cursor_estavel_com_alteracoes_entre_paginas(tmp_path):
+    """
+    Testa se entradas criadas e removidas entre as páginas não repetem nem
+    pulam as demais.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    entrada = {"jsonEntrada": [str(raiz)]}
+    analisador = AnalisadorCaminhos()
+    primeira, cursor = analisador.paginar_caminhos(entrada, limite=5)
+    assert _relativos(raiz, primeira)[-1] == "b/0.txt"
+    (raiz / "b" / "0.txt").unlink()
+    (raiz / "a" / "9.md").unlink()
+    (raiz / "b" / "w.txt").write_text("novo")
+    resto, cursor = analisador.paginar_caminhos(entrada, cursor, limite=100)
+    assert cursor is None
+    assert _relativos(raiz, resto) == [
+        "b/w.txt", "b/x", "b/y", "b/y/1.py", "b/y/2.txt", "c", "c/z", "c/z/w",
+        "c/z/w/f.txt", "raiz.txt",
+    ]
+
+
+def test_retomada_lista_so_o_caminho_do_cursor(tmp_path):
+    """
+    Testa se a retomada lista só os diretórios do caminho do cursor.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    varredura = VarreduraOrdenada(raiz, apos=("b", "y", "1.py"))
+    componentes, no = next(iter(varredura))
+    assert componentes == ("b", "y", "2.txt")
+    assert no.profundidade == 3
+    assert varredura.diretorios_listados == 3
+
+    varredura = VarreduraOrdenada(raiz, apos=("b", "sumiu", "x.txt"))
+    assert [c for c, _ in varredura][:2] == [("b", "x"), ("b", "y")]
+
+
+def test_varias_entradas_com_limites_e_filtros(tmp_path):
+    """
+    Testa a paginação de várias entradas (arquivo, inexistente e diretório)
+    com profundidade máxima e consulta.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    entrada = {"jsonEntrada": [str(raiz / "raiz.txt"), str(raiz / "nada"), str(raiz)]}
+    itens, _ = _todas_as_paginas(
+        entrada, 2, max_profundidade=2, consulta=Consulta(extensoes=["txt"], podar=["c"])
+    )
+    assert _relativos(raiz, itens) == [
+        "raiz.txt", ".", "a", "b", "b/0.txt", "b/x", "b/y", "raiz.txt",
+    ]
+
+
+def test_cursor_invalido_ou_de_outra_entrada(tmp_path):
+    """
+    Testa se cursores adulterados ou de outra entrada são recusados.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    analisador = AnalisadorCaminhos()
+    _, cursor = analisador.paginar_caminhos({"jsonEntrada": [str(raiz)]}, limite=1)
+    with pytest.raises(ValueError):
+        analisador.paginar_caminhos({"jsonEntrada": [str(raiz / "b")]}, cursor)
+    with pytest.raises(ValueError):
+        analisador.paginar_caminhos({"jsonEntrada": [str(raiz)]}, "nao-e-um-cursor")
+    assert decodificar_cursor(codificar_cursor("x", 2, ("á", "b")), "x") == (2, ("á", "b"))
@@ -0,0 +1,37 @@
+# tests/models/test_particionamento.py
+
+"""
+Este módulo contém testes para o módulo particionamento.py.
+"""
+
+import json
+
+from app.models.particionamento import varrer_fragmento, varrer_em_processos
+
+
+def test_varrer_fragmento_adia_diretorios_acima_do_limiar(tmp_path):
+    """
+    Testa se o fragmento devolve JSON compacto e adia subárvores acima do limiar.
+    """
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "c").mkdir()
+    (tmp_path / "c" / "f.txt").write_text("f")
+    serializado = varrer_fragmento(str(tmp_path), None, None, 1)
+    assert ", " not in serializado and ": " not in serializado
+    fragmento = json.loads(serializado)
+    assert len(fragmento["adiados"]) == 1
+    rota, ancestrais = fragmento["adiados"][0]
+    adiado = fragmento["arvore"]["sub_pastas"][rota[0]]
+    assert adiado["sub_pastas"] == [] and adiado["sub_arquivos"] == []
+    assert ancestrais == [[tmp_path.stat().st_dev, tmp_path.stat().st_ino]]
+
+
+def test_varrer_em_processos_respeita_max_profundidade(tmp_path):
+    """
+    Testa se a profundidade máxima continua relativa à raiz nos fragmentos.
+    """
+    (tmp_path / "a" / "b" / "c").mkdir(parents=True)
+    (arvore,) = varrer_em_processos([tmp_path], 2, 0, max_profundidade=2)
+    b = arvore["sub_pastas"][0]["sub_pastas"][0]
+    assert b["nome"] == "b" and b["sub_pastas"] == []
+    assert arvore["truncado"] is True
@@ -1 +1,324 @@
 # Telescope/tests/test_path_model.py
+
+"""
+Este módulo contém testes para o módulo path_model.py.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import traceback
+from pathlib import Path
+
+import pytest
+
+from app.models.path_model import AnalisadorCaminhos, Arquivo, Diretorio
+
+
+def _criar_arvore(raiz: Path) -> Path:
+    """Cria uma pequena árvore de arquivos para os testes."""
+    (raiz / "docs" / "vazio").mkdir(parents=True)
+    (raiz / "docs" / "leia.txt").write_text("conteudo")
+    (raiz / "foto.zip").write_bytes(b"\0" * 2048)
+    (raiz / "docs" / "notas.md").write_text("# notas")
+    return raiz
+
+
+def _json_por_pathlib(caminho: Path) -> dict:
+    """Referência do formato de `para_json`, calculada somente com pathlib."""
+    dados = {
+        "caminho": str(caminho),
+        "nome": caminho.name,
+        "data_criacao": caminho.stat().st_ctime,
+        "data_modificacao": caminho.stat().st_mtime,
+    }
+    if caminho.is_file():
+        dados.update({
+            "extensao": caminho.suffix,
+            "tamanho": caminho.stat().st_size,
+        })
+        return dados
+    itens = list(caminho.iterdir())
+    sub_arquivos = [_json_por_pathlib(item) for item in itens if item.is_file()]
+    sub_pastas = [_json_por_pathlib(item) for item in itens if item.is_dir()]
+    dados.update({
+        "tamanho_total": sum(item["tamanho"] for item in sub_arquivos)
+        + sum(pasta["tamanho_total"] for pasta in sub_pastas),
+        "total_arquivos": len(sub_arquivos)
+        + sum(pasta["total_arquivos"] for pasta in sub_pastas),
+        "sub_arquivos": sub_arquivos,
+        "sub_pastas": sub_pastas,
+    })
+    return dados
+
+
+def test_diretorio_para_json_igual_ao_pathlib(tmp_path):
+    """
+    Testa se a varredura com scandir produz o mesmo JSON que a versão com pathlib.
+    """
+    raiz = _criar_arvore(tmp_path)
+    assert Diretorio(raiz).para_json() == _json_por_pathlib(raiz)
+
+
+def test_arquivo_tamanho_formatado(tmp_path):
+    """
+    Testa se o Arquivo guarda o tamanho em bytes e só o formata quando pedido.
+    """
+    raiz = _criar_arvore(tmp_path)
+    arquivo = Arquivo(raiz / "foto.zip")
+    assert arquivo.para_json()["tamanho"] == 2048
+    assert arquivo.tamanho_formatado == "2.00 KB"
+
+
+def test_diretorio_totais_recursivos(tmp_path):
+    """
+    Testa se cada diretório traz o tamanho total e o número de arquivos da subárvore.
+    """
+    raiz = _criar_arvore(tmp_path)
+    diretorio = Diretorio(raiz)
+    assert (diretorio.tamanho_total, diretorio.total_arquivos) == (2048 + 8 + 7, 3)
+    (docs,) = diretorio.subdiretorios
+    assert (docs.tamanho_total, docs.total_arquivos) == (15, 2)
+
+
+def test_processar_caminhos_formatar_tamanhos(tmp_path):
+    """
+    Testa se a formatação dos tamanhos é opcional e mantém os valores numéricos.
+    """
+    raiz = _criar_arvore(tmp_path)
+    entrada = json.dumps({"jsonEntrada": [str(raiz)]})
+    (simples,) = AnalisadorCaminhos().processar_caminhos(entrada)
+    assert "tamanho_total_formatado" not in simples
+    (resultado,) = AnalisadorCaminhos().processar_caminhos(entrada, formatar_tamanhos=True)
+    assert resultado["tamanho_total"] == 2063
+    assert resultado["tamanho_total_formatado"] == "2.01 KB"
+    (foto,) = resultado["sub_arquivos"]
+    assert (foto["tamanho"], foto["tamanho_formatado"]) == (2048, "2.00 KB")
+
+
+def test_arquivo_rejeita_diretorio(tmp_path):
+    """
+    Testa se o Arquivo rejeita caminhos que não são arquivos.
+    """
+    with pytest.raises(ValueError):
+        Arquivo(tmp_path)
+
+
+def test_diretorio_rejeita_inexistente(tmp_path):
+    """
+    Testa se o Diretorio rejeita caminhos inexistentes.
+    """
+    with pytest.raises(ValueError):
+        Diretorio(tmp_path / "nao_existe")
+
+
+def test_diretorio_ignora_link_quebrado(tmp_path):
+    """
+    Testa se links simbólicos quebrados são ignorados, como em pathlib.
+    """
+    raiz = _criar_arvore(tmp_path)
+    (raiz / "quebrado").symlink_to(raiz / "nao_existe")
+    assert Diretorio(raiz).para_json() == _json_por_pathlib(raiz)
+
+
+def test_processar_caminhos_arquivo_e_diretorio(tmp_path):
+    """
+    Testa se processar_caminhos descreve arquivos e diretórios existentes.
+    """
+    raiz = _criar_arvore(tmp_path)
+    entrada = json.dumps({"jsonEntrada": [str(raiz / "foto.zip"), str(raiz / "docs")]})
+    resultados = AnalisadorCaminhos().processar_caminhos(entrada)
+    assert resultados == [
+        _json_por_pathlib(raiz / "foto.zip"),
+        _json_por_pathlib(raiz / "docs"),
+    ]
+
+
+def test_processar_caminhos_igual_ao_diretorio(tmp_path):
+    """
+    Testa se a árvore montada durante a varredura é igual ao Diretorio.para_json.
+    """
+    raiz = _criar_arvore(tmp_path)
+    entrada = json.dumps({"jsonEntrada": [str(raiz)]})
+    assert AnalisadorCaminhos().processar_caminhos(entrada) == [Diretorio(raiz).para_json()]
+
+
+def test_diretorio_profundo_sem_recursao(tmp_path):
+    """
+    Testa se árvores mais profundas que o limite de recursão são processadas.
+    """
+    profundidade = 100
+    caminho = tmp_path
+    for _ in range(profundidade):
+        caminho = caminho / "d"
+        caminho.mkdir()
+    limite_original = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(traceback.extract_stack()) + 40)
+    try:
+        dados = Diretorio(tmp_path).para_json()
+    finally:
+        sys.setrecursionlimit(limite_original)
+    niveis = 0
+    while dados["sub_pastas"]:
+        dados = dados["sub_pastas"][0]
+        niveis += 1
+    assert niveis == profundidade
+
+
+def test_processar_caminhos_max_profundidade(tmp_path):
+    """
+    Testa se max_profundidade interrompe a descida e marca o resultado como truncado.
+    """
+    raiz = _criar_arvore(tmp_path)
+    entrada = json.dumps({"jsonEntrada": [str(raiz)]})
+    (resultado,) = AnalisadorCaminhos().processar_caminhos(entrada, max_profundidade=1)
+    assert resultado["truncado"] is True
+    assert resultado["motivo_truncamento"] == "max_profundidade"
+    (docs,) = resultado["sub_pastas"]
+    assert docs["sub_arquivos"] == [] and docs["sub_pastas"] == []
+
+
+def test_processar_caminhos_max_entradas(tmp_path):
+    """
+    Testa se max_entradas devolve um resultado parcial em vez de percorrer tudo.
+    """
+    raiz = _criar_arvore(tmp_path)
+    entrada = json.dumps({"jsonEntrada": [str(raiz)]})
+    (resultado,) = AnalisadorCaminhos().processar_caminhos(entrada, max_entradas=2)
+    assert resultado["truncado"] is True
+    assert resultado["motivo_truncamento"] == "max_entradas"
+    (completo,) = AnalisadorCaminhos().processar_caminhos(entrada)
+    assert "truncado" not in completo
+
+
+def test_diretorio_detecta_ciclo_de_link(tmp_path):
+    """
+    Testa se um link simbólico para um ancestral não é percorrido novamente.
+    """
+    raiz = _criar_arvore(tmp_path)
+    (raiz / "docs" / "volta").symlink_to(raiz)
+    entrada = json.dumps({"jsonEntrada": [str(raiz)]})
+    (resultado,) = AnalisadorCaminhos().processar_caminhos(entrada)
+    (docs,) = resultado["sub_pastas"]
+    (volta,) = [pasta for pasta in docs["sub_pastas"] if pasta["nome"] == "volta"]
+    assert volta["ciclo"] is True
+    assert volta["sub_pastas"] == [] and volta["sub_arquivos"] == []
+
+
+def test_diretorio_marca_ciclo_e_erro_como_processar_caminhos(tmp_path):
+    """
+    Testa se o Diretorio marca `ciclo` e `erro` nos subdiretórios, como o
+    processar_caminhos.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    (raiz / "docs" / "volta").symlink_to(raiz)
+    fechado = raiz / "fechado"
+    fechado.mkdir()
+    fechado.chmod(0)
+    try:
+        entrada = json.dumps({"jsonEntrada": [str(raiz)]})
+        (esperado,) = AnalisadorCaminhos().processar_caminhos(entrada)
+        diretorio = Diretorio(raiz)
+        assert diretorio.para_json() == esperado
+        nos = {no["nome"]: no for no in diretorio.iterar_json()}
+    finally:
+        fechado.chmod(0o755)
+    assert nos["volta"]["ciclo"] is True
+    if os.geteuid() != 0:
+        assert nos["fechado"]["erro"]
+
+
+def test_iterar_json_reconstroi_para_json(tmp_path):
+    """
+    Testa se os nós emitidos por iterar_json permitem reconstruir o para_json.
+    """
+    raiz = _criar_arvore(tmp_path)
+    diretorio = Diretorio(raiz)
+    nos = list(diretorio.iterar_json())
+    assert [no["profundidade"] for no in nos if no["tipo"] == "diretorio"] == [0, 1, 2]
+    reconstruido, *descendentes = nos
+    del reconstruido["tipo"], reconstruido["profundidade"]
+    reconstruido.update({"sub_arquivos": [], "sub_pastas": []})
+    pilha = [reconstruido]
+    for no in descendentes:
+        del pilha[no.pop("profundidade"):]
+        if no.pop("tipo") == "arquivo":
+            pilha[-1]["sub_arquivos"].append(no)
+        else:
+            no.update({"sub_arquivos": [], "sub_pastas": []})
+            pilha[-1]["sub_pastas"].append(no)
+            pilha.append(no)
+    assert reconstruido == diretorio.para_json()
+
+
+def test_processar_caminhos_em_processos_igual_ao_serial(tmp_path):
+    """
+    Testa se o modo com processos (com divisão de subárvores) produz o mesmo resultado.
+    """
+    raizes = []
+    for nome in ("r1", "r2"):
+        raiz = _criar_arvore(tmp_path / nome)
+        for indice in range(3):
+            (raiz / "docs" / "vazio" / f"n{indice}").mkdir()
+            (raiz / "docs" / "vazio" / f"n{indice}" / "f.txt").write_text("x" * indice)
+        raizes.append(str(raiz))
+    (tmp_path / "r1" / "docs" / "volta").symlink_to(tmp_path / "r1")
+    entrada = json.dumps({"jsonEntrada": raizes + [str(tmp_path / "r1" / "foto.zip")]})
+    serial = AnalisadorCaminhos().processar_caminhos(entrada)
+    paralelo = AnalisadorCaminhos(processos=2, limiar_divisao=1).processar_caminhos(entrada)
+    assert paralelo == serial
+
+
+def test_processar_caminhos_em_processos_com_max_entradas(tmp_path):
+    """
+    Testa se o limite de entradas vale para a raiz inteira também no modo
+    com processos (e não para cada fragmento).
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    for indice in range(4):
+        (raiz / f"p{indice}").mkdir()
+        (raiz / f"p{indice}" / "f.txt").write_text("x")
+    entrada = json.dumps({"jsonEntrada": [str(raiz)]})
+    serial = AnalisadorCaminhos().processar_caminhos(entrada, max_entradas=5)
+    paralelo = AnalisadorCaminhos(processos=2, limiar_divisao=1).processar_caminhos(
+        entrada, max_entradas=5
+    )
+    assert paralelo == serial
+    assert serial[0]["truncado"] is True
+    assert asyncio.run(
+        AnalisadorCaminhos(processos=2, limiar_divisao=1).processar_caminhos_async(
+            entrada, max_entradas=5
+        )
+    ) == serial
+
+
+def test_processar_caminhos_async_igual_ao_sincrono(tmp_path):
+    """
+    Testa se a versão assíncrona devolve os mesmos resultados, na ordem de entrada.
+    """
+    raiz = _criar_arvore(tmp_path)
+    entrada = json.dumps({"jsonEntrada": [str(raiz / "docs"), str(raiz / "nao_existe"), str(raiz)]})
+    analisador = AnalisadorCaminhos()
+    resultados = asyncio.run(analisador.processar_caminhos_async(entrada, concorrencia=2))
+    assert resultados == analisador.processar_caminhos(entrada)
+
+
+def test_processar_caminhos_async_resolve_a_lista_em_lote(tmp_path):
+    """
+    Testa se a versão assíncrona resolve a lista de entrada uma única vez,
+    em lote (com as repetições), e só depois varre os diretórios.
+    """
+    raiz = _criar_arvore(tmp_path)
+    caminhos = [str(raiz / "docs"), str(raiz / "foto.zip"), str(raiz / "docs"), str(raiz)]
+    lotes = []
+
+    class Analisador(AnalisadorCaminhos):
+        def resolver_caminhos(self, lista_caminhos):
+            lotes.append(list(lista_caminhos))
+            return super().resolver_caminhos(lista_caminhos)
+
+    entrada = json.dumps({"jsonEntrada": caminhos})
+    resultados = asyncio.run(Analisador().processar_caminhos_async(entrada, concorrencia=2))
+    assert lotes == [caminhos]
+    assert resultados == AnalisadorCaminhos().processar_caminhos(entrada)
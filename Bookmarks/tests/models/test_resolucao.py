@@ -0,0 +1,83 @@
+# tests/models/test_resolucao.py
+
+"""
+Este módulo contém testes para o módulo resolucao.py.
+"""
+
+from app.models.path_model import AnalisadorCaminhos
+from app.models.resolucao import ResolvedorCaminhos
+
+
+def test_caminho_existente_na_primeira_tentativa(tmp_path, monkeypatch):
+    """
+    Testa se um caminho existente é resolvido sem novas tentativas.
+    """
+    (tmp_path / "a.txt").write_text("a")
+    monkeypatch.chdir(tmp_path)
+    (resolvido,) = ResolvedorCaminhos().resolver_lote(["a.txt"])
+    assert resolvido.caminho == (tmp_path / "a.txt").resolve()
+    assert resolvido.tentativa == 0
+    assert resolvido.info.st_size == 1
+
+
+def test_prefixos_extras_de_pai(tmp_path, monkeypatch):
+    """
+    Testa se `../x` inexistente é encontrado com mais `../`, informando a tentativa.
+    """
+    (tmp_path / "dados").mkdir()
+    (tmp_path / "dados" / "x.txt").write_text("x")
+    trabalho = tmp_path / "um" / "dois" / "tres"
+    trabalho.mkdir(parents=True)
+    monkeypatch.chdir(trabalho)
+    (resolvido,) = ResolvedorCaminhos().resolver_lote(["../dados/x.txt"])
+    assert resolvido.encontrado
+    assert resolvido.tentativa == 2
+    assert resolvido.candidato == str(tmp_path / "dados" / "x.txt")
+
+
+def test_limite_de_tentativas(tmp_path, monkeypatch):
+    """
+    Testa se as tentativas param em `max_tentativas`.
+    """
+    (tmp_path / "dados").mkdir()
+    trabalho = tmp_path / "um" / "dois" / "tres"
+    trabalho.mkdir(parents=True)
+    monkeypatch.chdir(trabalho)
+    (resolvido,) = ResolvedorCaminhos(max_tentativas=1).resolver_lote(["../dados"])
+    assert not resolvido.encontrado
+    assert resolvido.tentativa is None
+
+
+def test_memoria_de_ancestrais_ausentes(tmp_path, monkeypatch):
+    """
+    Testa se caminhos sob um diretório ausente não fazem novas chamadas e
+    se entradas repetidas são resolvidas uma única vez.
+    """
+    monkeypatch.chdir(tmp_path)
+    resolvedor = ResolvedorCaminhos(max_tentativas=0)
+    resolvedor.resolver_lote(["ausente/a.txt"])
+    chamadas = resolvedor.chamadas_stat
+    resultados = resolvedor.resolver_lote([f"ausente/{i}.txt" for i in range(50)])
+    assert not any(resultado.encontrado for resultado in resultados)
+    assert resolvedor.chamadas_stat == chamadas
+
+    (tmp_path / "b.txt").write_text("b")
+    antes = resolvedor.chamadas_stat
+    resultados = resolvedor.resolver_lote(["b.txt"] * 20)
+    assert all(resultado.encontrado for resultado in resultados)
+    assert resolvedor.chamadas_stat == antes + 1
+
+
+def test_analisador_usa_candidato_escolhido(tmp_path, monkeypatch):
+    """
+    Testa se o analisador descreve o caminho encontrado com `../` extras.
+    """
+    (tmp_path / "dados").mkdir()
+    (tmp_path / "dados" / "x.txt").write_text("xyz")
+    trabalho = tmp_path / "um" / "dois"
+    trabalho.mkdir(parents=True)
+    monkeypatch.chdir(trabalho)
+    analisador = AnalisadorCaminhos()
+    (resultado,) = analisador.processar_caminhos({"jsonEntrada": ["../dados/x.txt", "../nada"]})
+    assert resultado["caminho"] == str(tmp_path / "dados" / "x.txt")
+    assert resultado["tamanho"] == 3
@@ -0,0 +1,414 @@
+# tests/routes/test_analysis_routes.py
+
+"""
+Este módulo contém testes para as rotas do blueprint `analysis`.
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+
+import pytest
+
+from app.config import TestingConfig
+from app.main import close_app, create_app
+from app.routes import analysis_routes
+from app.services.jobs import JobManager
+
+
+@pytest.fixture
+def client():
+    """Cliente de testes da aplicação Flask, com os recursos encerrados no final."""
+    aplicacao = create_app(TestingConfig)
+    yield aplicacao.test_client()
+    close_app(aplicacao)
+
+
+@pytest.fixture
+def criar_app():
+    """Cria aplicações com a configuração dada, encerradas no final do teste."""
+    aplicacoes = []
+
+    def criar(config=TestingConfig):
+        aplicacoes.append(create_app(config))
+        return aplicacoes[-1]
+
+    yield criar
+    for aplicacao in aplicacoes:
+        close_app(aplicacao)
+
+
+def test_analyze_text_corpo_em_fluxo(client):
+    """
+    Testa se o corpo `text/plain` é analisado em fluxo e devolvido em JSON.
+    """
+    resposta = client.post(
+        "/analysis/analyze_text?format=json&top_k=1",
+        data="um dois dois\ntrês".encode("utf-8"),
+        content_type="text/plain; charset=utf-8",
+    )
+    assert resposta.status_code == 200
+    resultado = resposta.get_json()
+    assert resultado["word_count"] == 4
+    assert resultado["line_count"] == 2
+    assert resultado["top_words"] == [{"word": "dois", "count": 2}]
+    assert "original_text" not in resultado
+    resposta = client.post("/analysis/analyze_text?format=json&echo=0", data={"text": "a b"})
+    assert "words" not in resposta.get_json()
+    resposta = client.post("/analysis/analyze_text", data="", content_type="text/plain")
+    assert resposta.status_code == 400
+
+
+def test_analyze_paths_ndjson(client, tmp_path):
+    """
+    Testa se a rota envia um objeto JSON por linha no modo NDJSON.
+    """
+    (tmp_path / "a.txt").write_text("abc")
+    resposta = client.post(
+        "/analysis/analyze_paths?stream=ndjson",
+        data={"paths": [str(tmp_path / "a.txt"), str(tmp_path / "nao_existe")]},
+    )
+    assert resposta.status_code == 200
+    assert resposta.mimetype == "application/x-ndjson"
+    linhas = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+    assert [linha["exists"] for linha in linhas] == [True, False]
+
+
+def test_analyze_paths_ndjson_recursivo_pelo_accept(client, tmp_path):
+    """
+    Testa se o cabeçalho Accept ativa o fluxo e se a árvore é enviada nó a nó.
+    """
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.md").write_text("b")
+    resposta = client.post(
+        "/analysis/analyze_paths",
+        data={"paths": [str(tmp_path)], "recursive": "1", "max_depth": "1"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    linhas = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+    assert [linha.get("nome") for linha in linhas[1:3]] == [tmp_path.name, "sub"]
+    assert linhas[-1]["truncado"] is True
+
+
+def test_analyze_paths_sem_caminhos(client):
+    """
+    Testa se a rota rejeita requisições sem caminhos.
+    """
+    resposta = client.post("/analysis/analyze_paths?stream=ndjson", data={})
+    assert resposta.status_code == 400
+
+
+def test_analyze_paths_respeita_analysis_workers(criar_app, monkeypatch, tmp_path):
+    """
+    Testa se `ANALYSIS_WORKERS` limita os `stat` simultâneos também fora do
+    modo NDJSON.
+    """
+    chamadas = []
+
+    async def analisar(paths, executor=None, concurrency=16, cache=None):
+        chamadas.append(concurrency)
+        return [{"path": path} for path in paths]
+
+    monkeypatch.setattr(analysis_routes, "analyze_paths_async", analisar)
+    monkeypatch.setattr(analysis_routes, "render_template", lambda _nome, result: str(result))
+
+    class Config(TestingConfig):
+        ANALYSIS_WORKERS = 3
+
+    for config in (TestingConfig, Config):
+        resposta = criar_app(config).test_client().post(
+            "/analysis/analyze_paths", data={"paths": [str(tmp_path)]}
+        )
+        assert resposta.status_code == 200
+    assert chamadas == [TestingConfig.ANALYSIS_ASYNC_CONCURRENCY, 3]
+
+
+def test_process_paths_assincrono(client, tmp_path):
+    """
+    Testa se a view assíncrona devolve a árvore em JSON e rejeita entradas inválidas.
+    """
+    (tmp_path / "a.txt").write_text("abc")
+    resposta = client.post(
+        "/analysis/process_paths?human_sizes=1",
+        data=json.dumps({"jsonEntrada": [str(tmp_path)]}),
+    )
+    assert resposta.status_code == 200
+    (arvore,) = resposta.get_json()
+    assert arvore["total_arquivos"] == 1
+    assert arvore["sub_arquivos"][0]["tamanho_formatado"] == "3.00 bytes"
+    assert client.post("/analysis/process_paths", data="{").status_code == 400
+
+
+def test_process_paths_com_filtros(client, tmp_path):
+    """
+    Testa se os filtros da query string são aplicados durante a varredura.
+    """
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "b.txt").write_text("b")
+    (tmp_path / "a.txt").write_text("abc")
+    (tmp_path / "c.md").write_text("c")
+    resposta = client.post(
+        "/analysis/process_paths?ext=txt&prune=node_modules",
+        data=json.dumps({"jsonEntrada": [str(tmp_path)]}),
+    )
+    (arvore,) = resposta.get_json()
+    assert [item["nome"] for item in arvore["sub_arquivos"]] == ["a.txt"]
+    assert arvore["sub_pastas"] == []
+    resposta = client.post(
+        "/analysis/process_paths?regex=(",
+        data=json.dumps({"jsonEntrada": [str(tmp_path)]}),
+    )
+    assert resposta.status_code == 400
+
+
+def test_process_paths_etag_e_compressao(criar_app, tmp_path):
+    """
+    Testa se o GET responde 304 para o ETag já enviado (sem varrer de novo,
+    com o cache ligado), se o ETag muda com a árvore e se o corpo é
+    comprimido quando o cliente aceita gzip.
+    """
+    for indice in range(50):
+        (tmp_path / f"arquivo_{indice}.txt").write_text("abc")
+
+    class Config(TestingConfig):
+        ANALYSIS_CACHE_TTL = 60
+
+    aplicacao = criar_app(Config)
+    cliente = aplicacao.test_client()
+    url = f"/analysis/process_paths?path={tmp_path}"
+    resposta = cliente.get(url, headers={"Accept-Encoding": "gzip"})
+    assert resposta.status_code == 200
+    assert resposta.headers["Content-Encoding"] == "gzip"
+    (arvore,) = json.loads(gzip.decompress(resposta.get_data()))
+    assert arvore["total_arquivos"] == 50
+    etag = resposta.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    aplicacao.extensions["analysis_cache"].hits = 0
+    resposta = cliente.get(url, headers={"If-None-Match": etag})
+    assert resposta.status_code == 304
+    assert resposta.get_data() == b""
+    assert aplicacao.extensions["analysis_cache"].stats()["hits"] == 1
+
+    aplicacao.extensions["analysis_cache"].clear()
+    (tmp_path / "novo.txt").write_text("novo")
+    resposta = cliente.get(url, headers={"If-None-Match": etag})
+    assert resposta.status_code == 200 and resposta.headers["ETag"] != etag
+    resposta = cliente.post(
+        "/analysis/process_paths",
+        data=json.dumps({"jsonEntrada": [str(tmp_path)]}),
+        headers={"If-None-Match": resposta.headers["ETag"]},
+    )
+    assert resposta.status_code == 200
+    assert cliente.get("/analysis/process_paths").status_code == 400
+
+
+def test_nome_de_arquivo_que_nao_e_utf8(criar_app, tmp_path):
+    """
+    Testa se um nome de arquivo com bytes que não são UTF-8 não derruba as
+    respostas JSON e NDJSON nem o cache.
+    """
+    (tmp_path / "dados").mkdir()
+    with open(os.path.join(os.fsencode(tmp_path / "dados"), b"ruim\xff.txt"), "wb") as arquivo:
+        arquivo.write(b"abc")
+    nome = os.fsdecode(b"ruim\xff.txt")
+
+    class Config(TestingConfig):
+        ANALYSIS_CACHE_TTL = 60
+
+    cliente = criar_app(Config).test_client()
+    url = f"/analysis/process_paths?path={tmp_path / 'dados'}"
+    for _ in range(2):
+        resposta = cliente.get(url)
+        assert resposta.status_code == 200
+        assert resposta.get_json()[0]["sub_arquivos"][0]["nome"] == nome
+    resposta = cliente.post(
+        "/analysis/analyze_paths",
+        data={"paths": [str(tmp_path / "dados")], "recursive": "1"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert resposta.status_code == 200
+    linhas = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+    assert nome in [linha.get("nome") for linha in linhas]
+    resposta = cliente.get(f"/analysis/disk_usage?path={tmp_path / 'dados'}")
+    assert resposta.get_json()[0]["tamanho_total"] == 3
+
+
+def test_uso_de_disco(client, tmp_path):
+    """
+    Testa se a rota devolve só o relatório agregado, pelo GET e pelo POST.
+    """
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.txt").write_text("abcdef")
+    (tmp_path / "b.md").write_text("b")
+    resposta = client.get(f"/analysis/disk_usage?path={tmp_path}&top_n=1")
+    assert resposta.status_code == 200
+    (relatorio,) = resposta.get_json()
+    assert relatorio["tamanho_total"] == 7
+    assert relatorio["maiores_arquivos"] == [
+        {"caminho": str(tmp_path / "sub" / "a.txt"), "tamanho": 6}
+    ]
+    assert "sub_pastas" not in relatorio
+    resposta = client.post(
+        "/analysis/disk_usage?ext=md", data=json.dumps({"jsonEntrada": [str(tmp_path)]})
+    )
+    assert resposta.get_json()[0]["total_arquivos"] == 1
+    assert client.post("/analysis/disk_usage", data="{").status_code == 400
+
+
+def test_api_de_caminhos_paginada(client, tmp_path):
+    """
+    Testa se a API JSON pagina a árvore seguindo `next_cursor`.
+    """
+    (tmp_path / "sub").mkdir()
+    for nome in ("a.txt", "b.txt", "sub/c.txt"):
+        (tmp_path / nome).write_text(nome)
+    corpo = json.dumps({"jsonEntrada": [str(tmp_path)]})
+    nomes, cursor = [], ""
+    while True:
+        resposta = client.post(f"/analysis/api/paths?limit=2&cursor={cursor}", data=corpo)
+        assert resposta.status_code == 200
+        pagina = resposta.get_json()
+        assert pagina["count"] == len(pagina["items"]) <= 2
+        nomes.extend(item["nome"] for item in pagina["items"])
+        cursor = pagina["next_cursor"]
+        if cursor is None:
+            break
+    assert nomes == [tmp_path.name, "a.txt", "b.txt", "sub", "c.txt"]
+    resposta = client.post("/analysis/api/paths?cursor=xyz", data=corpo)
+    assert resposta.status_code == 400
+    assert "error" in resposta.get_json()
+
+
+def test_process_paths_com_indice_configurado(criar_app, tmp_path):
+    """
+    Testa se, com `ANALYSIS_INDEX_URI`, as varreduras passam pelo índice e
+    o resultado é o mesmo de sem índice.
+    """
+    (tmp_path / "dados" / "sub").mkdir(parents=True)
+    (tmp_path / "dados" / "sub" / "a.txt").write_text("abc")
+    banco = tmp_path / "indice.db"
+
+    class Config(TestingConfig):
+        ANALYSIS_INDEX_URI = f"sqlite:///{banco}"
+
+    aplicacao = criar_app(Config)
+    assert "analysis_index" in aplicacao.extensions
+    assert "analysis_index" not in criar_app().extensions
+    url = f"/analysis/process_paths?path={tmp_path / 'dados'}"
+    resposta = aplicacao.test_client().get(url)
+    assert resposta.get_json() == criar_app().test_client().get(url).get_json()
+    with sqlite3.connect(banco) as conexao:
+        (total,) = conexao.execute("SELECT COUNT(*) FROM entradas").fetchone()
+    assert total >= 2
+    close_app(aplicacao)
+    assert "analysis_index" not in aplicacao.extensions
+
+
+def test_instantaneos_e_comparacao(criar_app, tmp_path):
+    """
+    Testa a gravação, a listagem e a comparação de instantâneos pelas rotas.
+    """
+
+    class Config(TestingConfig):
+        ANALYSIS_SNAPSHOT_DIR = str(tmp_path / "instantaneos")
+
+    cliente = criar_app(Config).test_client()
+    (tmp_path / "dados").mkdir()
+    (tmp_path / "dados" / "a.txt").write_text("abc")
+    antes = cliente.post("/analysis/snapshots", data={"path": str(tmp_path / "dados")})
+    assert antes.status_code == 201
+    assert antes.get_json()["entries"] == 1
+    (tmp_path / "dados" / "b.txt").write_text("b")
+    depois = cliente.post("/analysis/snapshots", data={"path": str(tmp_path / "dados")})
+    ids = [antes.get_json()["id"], depois.get_json()["id"]]
+    assert [item["id"] for item in cliente.get("/analysis/snapshots").get_json()] == ids
+
+    resposta = cliente.get(f"/analysis/snapshots/{ids[0]}/diff/{ids[1]}")
+    assert resposta.mimetype == "application/x-ndjson"
+    linhas = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+    assert linhas[0]["mudanca"] == "adicionado" and linhas[0]["caminho"] == "b.txt"
+    assert linhas[-1]["resumo"]["adicionado"] == 1
+    repetida = cliente.get(
+        f"/analysis/snapshots/{ids[0]}/diff/{ids[1]}",
+        headers={"If-None-Match": resposta.headers["ETag"]},
+    )
+    assert repetida.status_code == 304
+    assert cliente.get(f"/analysis/snapshots/{ids[0]}/diff/nao_existe").status_code == 404
+    resposta = cliente.post("/analysis/snapshots", data={"path": str(tmp_path / "x")})
+    assert resposta.status_code == 400
+
+
+def test_metricas_prometheus(client, tmp_path):
+    """
+    Testa se a rota de métricas expõe as fases no formato do Prometheus.
+    """
+    (tmp_path / "a.txt").write_text("abc")
+    client.post("/analysis/process_paths", data=json.dumps({"jsonEntrada": [str(tmp_path)]}))
+    resposta = client.get("/analysis/metrics")
+    assert resposta.status_code == 200
+    assert resposta.mimetype == "text/plain"
+    assert 'analysis_phase_seconds_count{phase="scan"}' in resposta.get_data(as_text=True)
+
+
+def test_observador_de_raizes(client, tmp_path):
+    """
+    Testa se a rota do observador responde 404 quando desligado, se as
+    raízes configuradas são servidas da memória e se `close_app` encerra o
+    observador (mais de uma chamada não faz nada).
+    """
+    assert client.get("/analysis/watcher").status_code == 404
+
+    (tmp_path / "a.txt").write_text("abc")
+
+    class Config(TestingConfig):
+        ANALYSIS_WATCH_ROOTS = [str(tmp_path)]
+        ANALYSIS_WATCH_BACKEND = "polling"
+
+    aplicacao = create_app(Config)
+    try:
+        cliente = aplicacao.test_client()
+        estado = cliente.get("/analysis/watcher").get_json()
+        assert estado["backend"] == "polling"
+        assert estado["raizes"][0]["entradas"] == 1
+        resposta = cliente.post(
+            "/analysis/process_paths",
+            data=json.dumps({"jsonEntrada": [str(tmp_path.resolve())]}),
+        )
+        assert resposta.get_json()[0]["tamanho_total"] == 3
+    finally:
+        close_app(aplicacao)
+    assert "analysis_watcher" not in aplicacao.extensions
+    close_app(aplicacao)
+
+
+def test_tarefas_enviar_consultar_e_baixar(criar_app, tmp_path):
+    """
+    Testa o ciclo de uma tarefa pelas rotas: envio, estado, resultado e cancelamento.
+    """
+    aplicacao = criar_app()
+    aplicacao.extensions["analysis_jobs"] = JobManager(spool_dir=str(tmp_path / "spool"))
+    cliente = aplicacao.test_client()
+    (tmp_path / "dados").mkdir()
+    (tmp_path / "dados" / "a.txt").write_text("abc")
+
+    resposta = cliente.post("/analysis/jobs", data={"paths": [str(tmp_path / "dados")]})
+    assert resposta.status_code == 202
+    tarefa = resposta.get_json()
+    aplicacao.extensions["analysis_jobs"].get(tarefa["id"]).wait(5)
+
+    estado = cliente.get(f"/analysis/jobs/{tarefa['id']}").get_json()
+    assert estado["status"] == "done" and estado["bytes_scanned"] == 3
+    resultado = cliente.get(f"/analysis/jobs/{tarefa['id']}/result")
+    assert resultado.mimetype == "application/x-ndjson"
+    linhas = [json.loads(linha) for linha in resultado.get_data(as_text=True).splitlines()]
+    assert linhas[-1]["nome"] == "a.txt"
+    repetido = cliente.get(
+        f"/analysis/jobs/{tarefa['id']}/result",
+        headers={"If-None-Match": resultado.headers["ETag"]},
+    )
+    assert repetido.status_code == 304
+    cancelada = cliente.post(f"/analysis/jobs/{tarefa['id']}/cancel").get_json()
+    assert cancelada["status"] == "done"
+    assert cliente.get("/analysis/jobs/nao_existe").status_code == 404
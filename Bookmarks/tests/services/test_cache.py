@@ -0,0 +1,147 @@
+# tests/services/test_cache.py
+
+"""
+Este módulo contém testes para o módulo cache.py.
+"""
+
+import json
+
+from app.models.path_model import AnalisadorCaminhos
+from app.services import cache as modulo_cache
+from app.services.cache import ResultCache
+from app.services.file_manager import analyze_paths
+
+
+class _Relogio:
+    """Relógio manual para controlar o tempo de vida das entradas."""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_cache_expira_apos_ttl():
+    """
+    Testa se as entradas expiram depois do ttl.
+    """
+    relogio = _Relogio()
+    cache = ResultCache(ttl=5, clock=relogio)
+    cache.put("chave", [1, 2])
+    relogio.agora = 4.9
+    assert cache.get("chave") == [1, 2]
+    relogio.agora = 5.0
+    assert cache.get("chave") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_descarta_menos_usado_por_entradas_e_bytes():
+    """
+    Testa se o descarte LRU respeita os limites de entradas e de bytes.
+    """
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", "xxxx")
+    cache.put("b", "yyyy")
+    assert cache.get("a") is None and cache.get("b") == "yyyy"
+    cache.put("grande", "z" * 20)
+    assert cache.get("grande") is None
+    assert cache.stats()["bytes"] == len('"yyyy"')
+
+
+def test_cache_devolve_copia():
+    """
+    Testa se alterar o valor devolvido não altera o que está guardado.
+    """
+    cache = ResultCache()
+    cache.put("chave", {"lista": [1]})
+    cache.get("chave")["lista"].append(2)
+    assert cache.get("chave") == {"lista": [1]}
+
+
+def test_cache_invalida_quando_raiz_muda(tmp_path):
+    """
+    Testa se validate_mtime descarta a entrada quando a raiz é alterada.
+    """
+    cache = ResultCache(validate_mtime=True)
+    primeiro = analyze_paths([str(tmp_path)], cache=cache)
+    assert analyze_paths([str(tmp_path)], cache=cache) == primeiro
+    assert cache.stats()["hits"] == 1
+    (tmp_path / "novo.txt").write_text("x")
+    analyze_paths([str(tmp_path)], cache=cache)
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_cache_valida_raizes_fora_da_trava(tmp_path, monkeypatch):
+    """
+    Testa se o `stat` das raízes num acerto é feito sem a trava do cache.
+    """
+    cache = ResultCache(validate_mtime=True)
+    cache.put("chave", [1], [str(tmp_path)])
+    assinatura = modulo_cache._root_signature  # pylint: disable=W0212
+
+    def sem_trava(raizes):
+        assert not cache._lock.locked()  # pylint: disable=W0212
+        return assinatura(raizes)
+
+    monkeypatch.setattr(modulo_cache, "_root_signature", sem_trava)
+    assert cache.get("chave") == [1]
+    (tmp_path / "novo.txt").write_text("x")
+    assert cache.get("chave") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_versao_guardada_com_o_valor():
+    """
+    Testa se as versões ficam na entrada do valor e são descartadas com ela.
+    """
+    cache = ResultCache(max_entries=1)
+    assert not cache.set_version("chave", "v0")
+    cache.put("chave", [1])
+    assert cache.set_version("chave", "v1") and cache.set_version("chave", "v2", True)
+    assert (cache.get_version("chave"), cache.get_version("chave", True)) == ("v1", "v2")
+    assert cache.stats()["entries"] == 1
+    cache.put("chave", [2])
+    assert cache.get_version("chave") is None
+    cache.set_version("chave", "v3")
+    cache.put("outra", [3])
+    assert cache.get_version("chave") is None
+
+
+def test_analyze_paths_com_cache_preserva_caminho_informado(tmp_path):
+    """
+    Testa se um acerto por caminho equivalente devolve o caminho como foi informado.
+    """
+    cache = ResultCache()
+    analyze_paths([str(tmp_path)], cache=cache)
+    equivalente = str(tmp_path / "." / "sub" / "..")
+    (tmp_path / "sub").mkdir()
+    (resultado,) = analyze_paths([equivalente], cache=cache)
+    assert cache.stats()["hits"] == 1
+    assert resultado["path"] == equivalente
+
+
+def test_processar_caminhos_com_cache(tmp_path):
+    """
+    Testa se o AnalisadorCaminhos reaproveita o resultado e separa as opções.
+    """
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.txt").write_text("abc")
+    cache = ResultCache()
+    analisador = AnalisadorCaminhos(cache=cache)
+    entrada = json.dumps({"jsonEntrada": [str(tmp_path)]})
+    primeiro = analisador.processar_caminhos(entrada)
+    assert analisador.processar_caminhos(entrada) == primeiro
+    assert cache.stats()["hits"] == 1
+    analisador.processar_caminhos(entrada, max_profundidade=0)
+    assert cache.stats()["misses"] == 2
+    assert primeiro == AnalisadorCaminhos().processar_caminhos(entrada)
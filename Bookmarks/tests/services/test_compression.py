@@ -0,0 +1,78 @@
+# tests/services/test_compression.py
+
+"""
+Este módulo contém testes para o módulo compression.py.
+"""
+
+import gzip
+import zlib
+
+from flask import Response
+from werkzeug.datastructures import Accept
+
+from app.services.compression import (
+    GzipCodec,
+    available_codecs,
+    choose_codec,
+    compress_response,
+)
+
+GZIP = Accept([("gzip", 1)])
+
+
+def test_gzip_corpo_pronto_acima_do_minimo():
+    """
+    Testa se corpos prontos são comprimidos a partir do tamanho mínimo.
+    """
+    corpo = b'{"caminho":"/a"},' * 200
+    resposta = compress_response(Response(corpo, mimetype="application/json"), GZIP)
+    assert resposta.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resposta.vary
+    assert int(resposta.headers["Content-Length"]) < len(corpo)
+    assert gzip.decompress(resposta.get_data()) == corpo
+
+    pequena = compress_response(Response(b"[]", mimetype="application/json"), GZIP)
+    assert "Content-Encoding" not in pequena.headers
+    assert pequena.get_data() == b"[]"
+
+
+def test_resposta_nao_comprimida_sem_codec_aceito_ou_tipo():
+    """
+    Testa se o tipo, o status e o Accept-Encoding do cliente são respeitados.
+    """
+    corpo = b"x" * 4096
+    sem_codec = compress_response(Response(corpo, mimetype="application/json"), Accept())
+    assert "Content-Encoding" not in sem_codec.headers
+    assert "Accept-Encoding" in sem_codec.vary
+    binario = compress_response(Response(corpo, mimetype="image/png"), GZIP)
+    assert "Content-Encoding" not in binario.headers
+    erro = compress_response(Response(corpo, status=404, mimetype="text/html"), GZIP)
+    assert "Content-Encoding" not in erro.headers
+    assert choose_codec(Accept([("gzip", 0)])) is None
+
+
+def test_fluxo_comprimido_bloco_a_bloco():
+    """
+    Testa se cada bloco do fluxo já pode ser descomprimido ao chegar.
+    """
+    linhas = [b'{"n":%d}\n' % indice for indice in range(3)]
+    resposta = compress_response(
+        Response(iter(linhas), mimetype="application/x-ndjson"), GZIP, min_size=10**6
+    )
+    assert resposta.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in resposta.headers
+    descompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    blocos = list(resposta.response)
+    assert [descompressor.decompress(bloco) for bloco in blocos[:3]] == linhas
+    assert gzip.decompress(b"".join(blocos)) == b"".join(linhas)
+
+
+def test_codecs_disponiveis(monkeypatch):
+    """
+    Testa se `RESPONSE_CODECS` limita os codecs e se os ausentes são ignorados.
+    """
+    monkeypatch.setenv("RESPONSE_CODECS", "zstd,gzip")
+    assert "gzip" in available_codecs()
+    assert isinstance(choose_codec(Accept([("zstd", 1), ("gzip", 0.5)])), GzipCodec)
+    monkeypatch.setenv("RESPONSE_CODECS", "gzip")
+    assert list(available_codecs()) == ["gzip"]
@@ -0,0 +1,93 @@
+# tests/services/test_file_manager.py
+
+"""
+Este módulo contém testes para o módulo file_manager.py.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.services import file_manager
+from app.services.file_manager import analyze_paths, analyze_paths_async, iter_analyze_paths
+
+
+def test_analyze_paths_arquivo_diretorio_e_inexistente(tmp_path):
+    """
+    Testa se analyze_paths descreve arquivos, diretórios e caminhos inexistentes.
+    """
+    arquivo = tmp_path / "a.txt"
+    arquivo.write_text("abc")
+    resultados = analyze_paths([str(arquivo), str(tmp_path), str(tmp_path / "nao_existe")])
+    assert resultados == [
+        {"path": str(arquivo), "exists": True, "is_file": True, "is_dir": False, "size": 3},
+        {"path": str(tmp_path), "exists": True, "is_file": False, "is_dir": True},
+        {"path": str(tmp_path / "nao_existe"), "exists": False},
+    ]
+
+
+def test_iter_analyze_paths_e_preguicoso(tmp_path):
+    """
+    Testa se o gerador só analisa o próximo caminho quando ele é pedido.
+    """
+    resultados = iter_analyze_paths([str(tmp_path), str(tmp_path / "nao_existe")])
+    assert next(resultados)["exists"] is True
+    assert next(resultados)["exists"] is False
+
+
+def test_iter_analyze_paths_recursivo(tmp_path):
+    """
+    Testa se o modo recursivo emite os nós da árvore logo após o diretório.
+    """
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.md").write_text("b")
+    resultados = list(iter_analyze_paths([str(tmp_path)], recursive=True))
+    assert resultados[0]["is_dir"] is True
+    assert [(no["nome"], no["tipo"], no["profundidade"]) for no in resultados[1:]] == [
+        (tmp_path.name, "diretorio", 0),
+        ("sub", "diretorio", 1),
+        ("b.md", "arquivo", 2),
+    ]
+
+
+def test_analyze_paths_com_threads_mantem_ordem(tmp_path):
+    """
+    Testa se o modo com threads devolve os mesmos resultados, na ordem de entrada.
+    """
+    caminhos = []
+    for indice in range(50):
+        caminho = tmp_path / f"{indice}.txt"
+        if indice % 3:
+            caminho.write_text("x" * indice)
+        caminhos.append(str(caminho))
+    assert analyze_paths(caminhos, workers=8) == analyze_paths(caminhos)
+    assert [r["path"] for r in analyze_paths(caminhos, workers=8)] == caminhos
+
+
+def test_analyze_paths_um_stat_por_caminho(tmp_path, monkeypatch):
+    """
+    Testa se cada caminho é analisado com uma única chamada de os.stat.
+    """
+    (tmp_path / "a.txt").write_text("abc")
+    chamadas = []
+    stat_original = file_manager.os.stat
+
+    def stat_contado(caminho, *args, **kwargs):
+        chamadas.append(caminho)
+        return stat_original(caminho, *args, **kwargs)
+
+    monkeypatch.setattr(file_manager.os, "stat", stat_contado)
+    analyze_paths([str(tmp_path / "a.txt"), str(tmp_path), str(tmp_path / "nao_existe")])
+    assert len(chamadas) == 3
+
+
+def test_analyze_paths_async_igual_ao_sincrono(tmp_path):
+    """
+    Testa se a versão assíncrona, com executor limitado, dá o mesmo resultado em ordem.
+    """
+    caminhos = [str(tmp_path / f"a{indice}.txt") for indice in range(20)]
+    for caminho in caminhos[::2]:
+        Path(caminho).write_text("abc")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        resultados = asyncio.run(analyze_paths_async(caminhos, executor=executor, concurrency=3))
+    assert resultados == analyze_paths(caminhos)
@@ -0,0 +1,98 @@
+# tests/services/test_jobs.py
+
+"""
+Este módulo contém testes para o módulo jobs.py.
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.jobs import CANCELLED, DONE, FAILED, JobManager
+
+
+def _criar_arvore(raiz):
+    """Cria uma pequena árvore com 3 arquivos (10 bytes no total)."""
+    (raiz / "docs").mkdir(parents=True)
+    (raiz / "docs" / "a.txt").write_text("abc")
+    (raiz / "docs" / "b.txt").write_text("defg")
+    (raiz / "c.txt").write_text("hij")
+    return raiz
+
+
+def test_tarefa_grava_resultado_e_progresso(tmp_path):
+    """
+    Testa se a tarefa grava cada nó no spool e conta entradas e bytes.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    gerenciador = JobManager(spool_dir=str(tmp_path / "spool"))
+    tarefa = gerenciador.submit([str(raiz), str(raiz / "c.txt")])
+    assert tarefa.wait(5)
+    assert tarefa.status == DONE
+    with open(tarefa.result_path, encoding="utf-8") as spool:
+        linhas = [json.loads(linha) for linha in spool]
+    assert linhas[0]["path"] == str(raiz)
+    assert [linha.get("nome") for linha in linhas if "tipo" in linha][0] == "raiz"
+    assert tarefa.entries_scanned == 6
+    assert tarefa.bytes_scanned == 13
+    gerenciador.shutdown()
+
+
+def test_cancelar_tarefa_na_fila(tmp_path):
+    """
+    Testa se uma tarefa cancelada antes de começar não é executada.
+    """
+    liberar = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.submit(liberar.wait)
+    gerenciador = JobManager(spool_dir=str(tmp_path / "spool"), executor=executor)
+    try:
+        tarefa = gerenciador.submit([str(_criar_arvore(tmp_path / "raiz"))])
+        assert gerenciador.cancel(tarefa.id).status == CANCELLED
+    finally:
+        liberar.set()
+    assert tarefa.wait(5)
+    assert tarefa.status == CANCELLED and tarefa.entries_scanned == 0
+    assert list((tmp_path / "spool").iterdir()) == []
+    gerenciador.shutdown()
+
+
+def test_tarefas_antigas_sao_descartadas(tmp_path):
+    """
+    Testa se só as tarefas concluídas mais recentes ficam guardadas.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    gerenciador = JobManager(spool_dir=str(tmp_path / "spool"), max_workers=1, max_finished=2)
+    tarefas = [gerenciador.submit([str(raiz)]) for _ in range(3)]
+    for tarefa in tarefas:
+        tarefa.wait(5)
+    assert gerenciador.get(tarefas[0].id) is None
+    assert len(list((tmp_path / "spool").iterdir())) == 2
+    gerenciador.shutdown()
+
+
+def test_tarefa_com_falha(tmp_path):
+    """
+    Testa se um erro durante a varredura marca a tarefa como falha.
+    """
+    gerenciador = JobManager(spool_dir=str(tmp_path / "spool"))
+    tarefa = gerenciador.submit([str(tmp_path)], max_depth="x")
+    assert tarefa.wait(5)
+    assert tarefa.status == FAILED and tarefa.error
+    gerenciador.shutdown()
+
+
+def test_shutdown_apaga_resultados_parciais(tmp_path):
+    """
+    Testa se o shutdown apaga os resultados parciais das tarefas e mantém os
+    concluídos.
+    """
+    raiz = _criar_arvore(tmp_path / "raiz")
+    gerenciador = JobManager(spool_dir=str(tmp_path / "spool"))
+    tarefa = gerenciador.submit([str(raiz)])
+    assert tarefa.wait(5)
+    parcial = tmp_path / "spool" / f"{tarefa.id}.ndjson.part"
+    parcial.write_text("{}")
+    gerenciador.shutdown()
+    assert not parcial.exists()
+    assert (tmp_path / "spool" / f"{tarefa.id}.ndjson").exists()
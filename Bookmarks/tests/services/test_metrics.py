@@ -0,0 +1,90 @@
+# tests/services/test_metrics.py
+
+"""
+Este módulo contém testes para o módulo metrics.py.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.models.json_do_frontend import validar_lote
+from app.models.path_model import Diretorio
+from app.services import metrics
+from app.services.file_manager import analyze_paths
+
+RAIZ_PROJETO = Path(__file__).resolve().parents[2]
+
+pytestmark = pytest.mark.skipif(not metrics.ENABLED, reason="métricas desligadas")
+
+
+@pytest.fixture(autouse=True)
+def registro_limpo():
+    """Zera as métricas antes de cada teste."""
+    metrics.REGISTRY.reset()
+
+
+def test_varredura_registra_chamadas_entradas_e_bytes(tmp_path):
+    """
+    Testa se a varredura do Diretorio conta scandir, stat, entradas e bytes.
+    """
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.txt").write_bytes(b"a" * 10)
+    (tmp_path / "b.txt").write_bytes(b"b" * 5)
+    Diretorio(tmp_path).para_json()
+    snapshot = metrics.REGISTRY.snapshot()
+    assert snapshot["counters"][("entries", "scan")] == 3
+    assert snapshot["counters"][("bytes", "scan")] == 15
+    assert snapshot["counters"][("syscalls", "scan")] == 2 + 3
+    assert snapshot["durations"]["to_json"][1] == 1
+
+
+def test_analyze_paths_e_validacao(tmp_path):
+    """
+    Testa se analyze_paths e os validadores registram suas fases.
+    """
+    (tmp_path / "a.txt").write_bytes(b"abc")
+    analyze_paths([str(tmp_path / "a.txt"), str(tmp_path / "nao_existe")])
+    validar_lote(["/tmp/a", "<inválido>"])
+    counters = metrics.REGISTRY.snapshot()["counters"]
+    assert counters[("syscalls", "stat")] == 2
+    assert counters[("entries", "analyze_paths")] == 2
+    assert counters[("bytes", "analyze_paths")] == 3
+    assert counters[("entries", "validate")] == 2
+
+
+def test_formato_prometheus():
+    """
+    Testa se o texto gerado segue o formato de exposição do Prometheus.
+    """
+    metrics.REGISTRY.observe("scan", 0.5, {"entries": 4})
+    metrics.REGISTRY.observe("scan", 0.25)
+    texto = metrics.render()
+    assert "# TYPE analysis_phase_seconds summary" in texto
+    assert 'analysis_phase_seconds_sum{phase="scan"} 0.750000000' in texto
+    assert 'analysis_phase_seconds_count{phase="scan"} 2' in texto
+    assert 'analysis_entries_total{phase="scan"} 4' in texto
+    assert texto.endswith("\n")
+
+
+def test_desligadas_sem_involucro():
+    """
+    Testa se, com ANALYSIS_METRICS=0, as funções não recebem nenhum invólucro.
+    """
+    codigo = (
+        "from app.models.path_model import Diretorio; "
+        "from app.services.file_manager import analyze_paths; "
+        "print(hasattr(Diretorio._atualizar_conteudo, '__wrapped__'), "
+        "hasattr(analyze_paths, '__wrapped__'))"
+    )
+    resultado = subprocess.run(
+        [sys.executable, "-c", codigo],
+        cwd=RAIZ_PROJETO,
+        env={"ANALYSIS_METRICS": "0", "PATH": ""},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert resultado.stdout.split() == ["False", "False"]
@@ -0,0 +1,79 @@
+# tests/services/test_serializer.py
+
+"""
+Este módulo contém testes para o módulo serializer.py.
+"""
+
+import io
+import json
+
+import pytest
+
+from app.services.serializer import BACKENDS, get_serializer
+
+
+def _backends_instalados():
+    """Backends disponíveis neste ambiente."""
+    instalados = []
+    for nome in BACKENDS:
+        try:
+            get_serializer(nome)
+        except ImportError:
+            continue
+        instalados.append(nome)
+    return instalados
+
+
+DADOS = [{"caminho": "/tmp/ação", "tamanho": 2048, "data": 1.5, "sub": [None, True]}]
+
+
+@pytest.mark.parametrize("backend", _backends_instalados())
+def test_saida_compacta_e_equivalente(backend):
+    """
+    Testa se cada backend produz JSON compacto, em UTF-8, equivalente ao da biblioteca padrão.
+    """
+    serializador = get_serializer(backend)
+    texto = serializador.dumps(DADOS)
+    assert texto == json.dumps(DADOS, ensure_ascii=False, separators=(",", ":"))
+    assert serializador.loads(texto.encode("utf-8")) == DADOS
+    assert json.loads(serializador.dumps(DADOS, pretty=True)) == DADOS
+    with pytest.raises(ValueError):
+        serializador.loads(b"{")
+
+
+@pytest.mark.parametrize("backend", _backends_instalados())
+def test_escrita_em_fluxo(backend):
+    """
+    Testa se arrays e NDJSON são escritos item a item com o mesmo conteúdo.
+    """
+    serializador = get_serializer(backend)
+    itens = ({"n": indice} for indice in range(3))
+    assert list(serializador.iter_array(itens)) == [b'[{"n":0}', b',{"n":1}', b',{"n":2}', b"]"]
+    assert b"".join(serializador.iter_array([])) == b"[]"
+    saida = io.BytesIO()
+    serializador.write_lines(saida, DADOS * 2)
+    assert [json.loads(linha) for linha in saida.getvalue().splitlines()] == DADOS * 2
+
+
+@pytest.mark.parametrize("backend", _backends_instalados())
+def test_nome_que_nao_e_utf8(backend):
+    """
+    Testa se nomes com substitutos isolados (bytes que não são UTF-8 no
+    nome do arquivo) são escapados e voltam iguais.
+    """
+    serializador = get_serializer(backend)
+    dados = [{"nome": "ruim\udcff.txt", "caminho": "/tmp/ação"}]
+    for pretty in (False, True):
+        saida = serializador.dumps_bytes(dados, pretty)
+        assert b"\\udcff" in saida
+        assert serializador.loads(saida) == dados
+    assert serializador.loads(serializador.dumps(dados)) == dados
+    assert [serializador.loads(linha) for linha in serializador.iter_lines(dados)] == dados
+
+
+def test_backend_invalido():
+    """
+    Testa se um nome de backend desconhecido é rejeitado.
+    """
+    with pytest.raises(ValueError):
+        get_serializer("yaml")
@@ -0,0 +1,105 @@
+# tests/services/test_text_analysis.py
+
+"""
+Este módulo contém testes para o módulo text_analysis.py.
+"""
+
+import io
+from collections import Counter
+
+import pytest
+
+from app.services.text_analysis import (
+    DistinctCounter,
+    TextAnalyzer,
+    analyze_stream,
+    analyze_text,
+)
+
+TEXTO = "Olá mundo\nO mundo  gira\n\tE gira o\nmundo ação"
+
+
+def test_analyze_text_mantem_o_formato_anterior():
+    """
+    Testa se o resultado mantém o texto, as palavras e as contagens de antes.
+    """
+    resultado = analyze_text(TEXTO)
+    assert resultado["original_text"] == TEXTO
+    assert resultado["words"] == TEXTO.split()
+    assert resultado["char_count"] == len(TEXTO)
+    assert resultado["word_count"] == len(TEXTO.split())
+    assert resultado["line_count"] == 4
+    assert resultado["top_words"][:2] == [
+        {"word": "mundo", "count": 3},
+        {"word": "gira", "count": 2},
+    ]
+    assert resultado["unique_words"] == 6
+    assert resultado["unique_words_exact"] is True
+
+
+def test_analyze_text_sem_echo():
+    """
+    Testa se `echo=False` omite o texto e a lista de palavras.
+    """
+    resultado = analyze_text(TEXTO, echo=False, top_k=1)
+    assert "original_text" not in resultado
+    assert "words" not in resultado
+    assert resultado["top_words"] == [{"word": "mundo", "count": 3}]
+
+
+@pytest.mark.parametrize("tamanho", [1, 2, 3, 5, 7, 64])
+def test_partes_de_qualquer_tamanho(tamanho):
+    """
+    Testa se palavras divididas entre partes são contadas uma única vez.
+    """
+    analisador = TextAnalyzer(top_k=20, keep_words=True)
+    for inicio in range(0, len(TEXTO), tamanho):
+        analisador.feed(TEXTO[inicio:inicio + tamanho])
+    resultado = analisador.result()
+    esperado = analyze_text(TEXTO, echo=False, top_k=20)
+    assert resultado["words"] == TEXTO.split()
+    del resultado["words"]
+    assert resultado == esperado
+
+
+def test_analyze_stream_decodifica_em_blocos():
+    """
+    Testa se caracteres de vários bytes divididos entre blocos são decodificados.
+    """
+    dados = io.BytesIO(TEXTO.encode("utf-8"))
+    resultado = analyze_stream(dados, chunk_size=3, top_k=20)
+    assert resultado == analyze_text(TEXTO, echo=False, top_k=20)
+    assert analyze_stream(io.StringIO(""))["char_count"] == 0
+
+
+def test_contador_limitado_marca_top_aproximado():
+    """
+    Testa se o contador é podado ao passar do limite e mantém as mais frequentes.
+    """
+    palavras = ["comum"] * 50 + [f"rara{indice}" for indice in range(100)]
+    resultado = analyze_text(" ".join(palavras), echo=False, top_k=1, max_tracked=10)
+    assert resultado["top_words"] == [{"word": "comum", "count": 50}]
+    assert resultado["top_words_exact"] is False
+    assert resultado["unique_words"] == 101
+
+
+def test_estimativa_de_distintas():
+    """
+    Testa se a estimativa KMV fica próxima do valor real acima de `k`.
+    """
+    contador = DistinctCounter(k=256)
+    for indice in range(20000):
+        contador.add_hash(hash(f"palavra{indice}") & ((1 << 64) - 1))
+    assert not contador.exact
+    assert abs(contador.estimate() - 20000) / 20000 < 0.25
+
+
+def test_frequencias_iguais_as_do_counter():
+    """
+    Testa se o top-K sem poda é igual ao do `Counter`.
+    """
+    texto = " ".join(f"p{indice % 37} P{indice % 11}" for indice in range(500))
+    resultado = analyze_text(texto, echo=False, top_k=5)
+    esperado = Counter(texto.casefold().split()).most_common()
+    esperado.sort(key=lambda item: (-item[1], item[0]))
+    assert [(item["word"], item["count"]) for item in resultado["top_words"]] == esperado[:5]
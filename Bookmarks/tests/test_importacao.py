@@ -0,0 +1,75 @@
+# tests/test_importacao.py
+
+"""
+Este módulo verifica o custo de importar os pacotes `app` e `app.models`.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ_PROJETO = Path(__file__).resolve().parents[1]
+
+# Orçamento do tempo cumulativo de importação (`python -X importtime`), em ms.
+ORCAMENTO_MS = float(os.environ.get("IMPORT_BUDGET_MS", "30"))
+
+
+def _importar(codigo):
+    """Executa o código num interpretador novo com `-X importtime`."""
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ_PROJETO,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _tempo_cumulativo_ms(stderr, modulo):
+    """Lê o tempo cumulativo do módulo na saída de `-X importtime`."""
+    padrao = re.compile(rf"^import time:\s+\d+ \|\s+(\d+) \| {re.escape(modulo)}$", re.M)
+    return int(padrao.search(stderr).group(1)) / 1000
+
+
+@pytest.mark.parametrize("pacote", ["app", "app.models"])
+def test_importar_pacote_sem_efeitos_colaterais(pacote):
+    """
+    Testa se importar o pacote não imprime nada nem carrega submódulos pesados.
+    """
+    codigo = (
+        f"import sys, {pacote}; "
+        "print(sorted(m for m in sys.modules "
+        f"if m.startswith('app.') and m != '{pacote}' "
+        "or m in ('flask', 'sqlite3', 'typing')))"
+    )
+    resultado = _importar(codigo)
+    assert resultado.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("pacote", ["app", "app.models"])
+def test_importar_pacote_dentro_do_orcamento(pacote):
+    """
+    Testa se o tempo cumulativo de importação fica dentro do orçamento
+    (melhor de 3 execuções; ajustável por `IMPORT_BUDGET_MS`).
+    """
+    tempos = [
+        _tempo_cumulativo_ms(_importar(f"import {pacote}").stderr, pacote)
+        for _ in range(3)
+    ]
+    assert min(tempos) <= ORCAMENTO_MS, tempos
+
+
+def test_exportacoes_carregadas_sob_demanda():
+    """
+    Testa se os nomes exportados continuam acessíveis pelo pacote.
+    """
+    import app.models  # pylint: disable=C0415
+
+    assert app.models.AnalisadorCaminhos.__name__ == "AnalisadorCaminhos"
+    assert '"jsonEntrada"' in app.models.json_frontend
+    with pytest.raises(AttributeError):
+        getattr(app.models, "nao_existe")